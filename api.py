@@ -0,0 +1,128 @@
+import json
+
+import numpy as np
+from flask import Response, jsonify, request, stream_with_context
+
+from nucleo import PARAMETROS, filas_resultado, resolver_columnas
+
+# ----- API JSON de resolución por lotes -----
+#
+# POST /api/resolver con una lista de circuitos (o {"circuitos": [...]}), o bien
+# NDJSON (un circuito por línea). Cada circuito lleva "config" y los seis
+# parámetros en la misma notación que los campos de la interfaz ("2.2k", "4k7"...).
+# Las peticiones grandes, las NDJSON y las que piden ?formato=ndjson se responden
+# como NDJSON por bloques, así la memoria no crece con el tamaño del lote.
+
+TAMANO_BLOQUE = 10_000
+LIMITE_JSON = 10_000
+TIPO_NDJSON = "application/x-ndjson"
+
+# Nombres alternativos aceptados en la entrada
+ALIAS = {"beta": "β", "Beta": "β", "VCC": "Vcc", "VBE": "Vbe"}
+
+
+class EntradaInvalida(ValueError):
+    pass
+
+
+def _validar(circuito, donde):
+    # Solo valores escalares: una lista se repartiría entre los circuitos del bloque
+    # (o rompería la columna) sin avisar
+    for clave, valor in circuito.items():
+        clave = ALIAS.get(clave, clave)
+        if clave != "config" and clave not in PARAMETROS or valor is None:
+            continue
+        if isinstance(valor, bool) or not isinstance(valor, (str, int, float)):
+            raise EntradaInvalida(f"{donde}: {clave} debe ser un número o un texto")
+    return circuito
+
+def resolver_bloque(circuitos):
+    # Resuelve una lista de circuitos (dicts) con una sola llamada vectorizada
+    n = len(circuitos)
+    normalizados = [{ALIAS.get(k, k): v for k, v in c.items()} for c in circuitos]
+    config = np.array([c.get("config") for c in normalizados], dtype=object)
+    columnas = {p: [c.get(p) for c in normalizados] for p in PARAMETROS}
+    valores, asumidos, res = resolver_columnas(config, columnas, n)
+    return filas_resultado(config, valores, asumidos, res)
+
+def _bloques(circuitos, tamano=TAMANO_BLOQUE):
+    bloque = []
+    try:
+        for circuito in circuitos:
+            bloque.append(circuito)
+            if len(bloque) >= tamano:
+                yield bloque
+                bloque = []
+    except EntradaInvalida:
+        # Lo leído antes del error se resuelve igual
+        if bloque:
+            yield bloque
+        raise
+    if bloque:
+        yield bloque
+
+def _lineas(flujo, tamano=1 << 20):
+    # Lee el cuerpo en trozos grandes; iterar línea a línea sobre el flujo es lento
+    resto = b""
+    while True:
+        trozo = flujo.read(tamano)
+        if not trozo:
+            break
+        lineas = (resto + trozo).split(b"\n")
+        resto = lineas.pop()
+        yield from lineas
+    if resto:
+        yield resto
+
+def _leer_ndjson(flujo):
+    for numero, linea in enumerate(_lineas(flujo), start=1):
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            circuito = json.loads(linea)
+        except ValueError:
+            raise EntradaInvalida(f"Línea {numero}: JSON inválido")
+        if not isinstance(circuito, dict):
+            raise EntradaInvalida(f"Línea {numero}: se esperaba un objeto")
+        yield _validar(circuito, f"Línea {numero}")
+
+def _leer_json():
+    datos = request.get_json(silent=True)
+    if isinstance(datos, dict):
+        datos = datos.get("circuitos")
+    if not isinstance(datos, list) or not all(isinstance(c, dict) for c in datos):
+        raise EntradaInvalida("Se esperaba una lista de circuitos o {\"circuitos\": [...]}")
+    for i, circuito in enumerate(datos):
+        _validar(circuito, f"Circuito {i}")
+    return datos
+
+def _ndjson(circuitos):
+    try:
+        for bloque in _bloques(circuitos):
+            yield "".join(json.dumps(f, ensure_ascii=False) + "\n" for f in resolver_bloque(bloque))
+    except EntradaInvalida as e:
+        # La respuesta ya empezó: el error viaja como última línea
+        yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+def registrar_api(server):
+
+    @server.route("/api/resolver", methods=["POST"])
+    def api_resolver():
+        quiere_ndjson = (
+            request.args.get("formato") == "ndjson"
+            or TIPO_NDJSON in request.headers.get("Accept", "")
+        )
+        if request.mimetype == TIPO_NDJSON:
+            # Entrada por flujo: se lee y resuelve bloque a bloque
+            circuitos = _leer_ndjson(request.stream)
+            return Response(stream_with_context(_ndjson(circuitos)), mimetype=TIPO_NDJSON)
+        try:
+            circuitos = _leer_json()
+        except EntradaInvalida as e:
+            return jsonify({"error": str(e)}), 400
+        if quiere_ndjson or len(circuitos) > LIMITE_JSON:
+            return Response(stream_with_context(_ndjson(circuitos)), mimetype=TIPO_NDJSON)
+        resultados = list(resolver_bloque(circuitos)) if circuitos else []
+        # json.dumps conserva el orden de las columnas (jsonify las ordenaría)
+        return Response(json.dumps({"resultados": resultados}, ensure_ascii=False), mimetype="application/json")
@@ -1,25 +1,41 @@
 import dash
-from dash import html, dcc, Input, Output, State, ctx
+from dash import html, dcc, dash_table, Input, Output, State, ALL, ClientsideFunction, callback, clientside_callback, ctx
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-import plotly.graph_objs as go
 import numpy as np
-from docx import Document
 import base64
-import io
-import pandas as pd
 import os
-
-
-app = dash.Dash(
-    __name__,
-    external_stylesheets=[dbc.themes.SLATE],
-    title="Analizador BJT"
+import tempfile
+import time
+
+from nucleo import (
+    CONFIGURACIONES, ESTADOS, PARAMETROS, VALORES_DEFECTO, VCE_SAT, TOLERANCIAS_RESISTENCIA,
+    VA_DEFECTO, pasos_base, familia_curvas, T_REFERENCIA, T_MIN, T_MAX,
+    PASO_T, CERO_ABSOLUTO, MAX_TEMPERATURAS, numero_temperaturas, temperaturas, barrido_temperatura,
+    limites_activa
+)
+from cache import CacheLRU
+from unidades import formatear_resistencia, interpretar_valor
+from historial_db import Historial, HistorialSesiones
+from api import registrar_api
+from diseno import SERIES, disenar
+from reportes import exportar_a_pdf, exportar_a_word
+from resultado import PuntoOperacion, filas_texto, formatear_valor
+from trabajos import (
+    CANCELADO, LISTO, PENDIENTE, TERMINADOS, GestorTrabajos, tarea_lote, tarea_montecarlo, tarea_reporte,
+    tarea_temperatura_historial
 )
+import metricas
+from metricas import etapa
 
-app.title = "Analizador BJT - Transistores"
+# Arranque en frío: plotly.graph_objects, pandas, python-docx y fpdf se importan
+# dentro de las funciones que los usan, no al cargar el módulo (ver arranque.py).
+# Hay una sola app por proceso (más abajo): los callbacks se declaran con
+# dash.callback, que Dash vacía al enlazarlos a la primera app que crea, y el
+# historial, los trabajos y las cachés son estado del módulo.
 
-# ----- Estilos personalizados -----
-app.index_string = '''
+
+INDICE_HTML = '''
 <!DOCTYPE html>
 <html>
     <head>
@@ -60,436 +76,155 @@ app.index_string = '''
 
 # ----- Funciones de utilidad -----
 
-def interpretar_valor(valor_str):
-    prefijos = {
-        "E": 1e18, "P": 1e15, "T": 1e12, "G": 1e9, "M": 1e6, "k": 1e3,
-        "h": 1e2, "da": 1e1, "d": 1e-1, "c": 1e-2, "m": 1e-3,
-        "u": 1e-6, "µ": 1e-6, "n": 1e-9, "p": 1e-12, "f": 1e-15, "a": 1e-18
-    }
-    valor_str = valor_str.strip()
-    if not valor_str:
-        return None
-    for p in sorted(prefijos, key=lambda x: -len(x)):
-        if valor_str.lower().endswith(p.lower()):
-            try:
-                num = float(valor_str[:-len(p)])
-                return num * prefijos[p]
-            except:
-                raise ValueError("Error al interpretar valor con prefijo")
-    return float(valor_str)
-
-def formatear_valor(valor):
-    if abs(valor) >= 1:
-        return f"{valor:.3f} A"
-    elif abs(valor) >= 1e-3:
-        return f"{valor*1e3:.3f} mA"
-    elif abs(valor) >= 1e-6:
-        return f"{valor*1e6:.3f} µA"
-    else:
-        return f"{valor*1e9:.3f} nA"
-
-def exportar_a_word(resultados_dict):
-    import io, base64
-    from docx import Document
-    from docx.shared import Pt
-    from docx.oxml.ns import qn
-    doc = Document()
-    # Título
-    doc.add_heading('Reporte de Análisis de Transistor BJT', 0)
-    # Introducción
-    doc.add_paragraph(
-        "Este reporte presenta el análisis de un transistor BJT en distintas configuraciones. "
-        "Se detallan los parámetros utilizados, los procesos de cálculo y los resultados obtenidos. "
-        "Los valores deducidos o asumidos se indican con el símbolo '≅'."
-    )
-    # Procesos de cálculo
-    def get_val(key):
-        v = resultados_dict.get(key)
-        if hasattr(v, 'children'):
-            if isinstance(v.children, list):
-                return ''.join(str(c) for c in v.children)
-            else:
-                return str(v.children)
-        return str(v)
-
-    procesos = [
-        ("Cálculo de Ib", "Ib = (Vcc - Vbe) / (Rb + (β+1)·Re)",
-         f"Ib = ({get_val('Vcc') if 'Vcc' in resultados_dict else '?'} - {get_val('Vbe') if 'Vbe' in resultados_dict else '?'}) / (" +
-         f"{get_val('Rb') if 'Rb' in resultados_dict else '?'} + (" +
-         f"{get_val('β') if 'β' in resultados_dict else '?'}+1)·{get_val('Re') if 'Re' in resultados_dict else '?'}) = {get_val('Ib')}") ,
-        ("Cálculo de Ic", "Ic = β · Ib", f"Ic = {get_val('β')} · {get_val('Ib')} = {get_val('Ic')}") ,
-        ("Cálculo de Ie", "Ie = Ic + Ib", f"Ie = {get_val('Ic')} + {get_val('Ib')} = {get_val('Ie')}") ,
-        ("Cálculo de Ve", "Ve = Ie · Re", f"Ve = {get_val('Ie')} · {get_val('Re') if 'Re' in resultados_dict else '?'} = {get_val('Ve')}") ,
-        ("Cálculo de Vb", "Vb = Ve + Vbe", f"Vb = {get_val('Ve')} + {get_val('Vbe') if 'Vbe' in resultados_dict else '?'} = {get_val('Vb')}") ,
-        ("Cálculo de Vc", "Vc = Vcc - Ic · Rc (o Vcc si es colector común)", f"Vc = {get_val('Vc')}") ,
-        ("Cálculo de Vce", "Vce = Vc - Ve", f"Vce = {get_val('Vc')} - {get_val('Ve')} = {get_val('Vce')}") ,
-        ("Cálculo de Vbc", "Vbc = Vb - Vc", f"Vbc = {get_val('Vb')} - {get_val('Vc')} = {get_val('Vbc')}") ,
-        ("Cálculo de Ic(sat)", "Ic(sat) = Vcc / Rc", f"Ic(sat) = {get_val('Vcc') if 'Vcc' in resultados_dict else '?'} / {get_val('Rc') if 'Rc' in resultados_dict else '?'} = {get_val('Ic(sat)')}") ,
-        ("Cálculo de Pmax", "Pmax = Vce(sat) · Ic(sat)", f"Pmax = {get_val('Vce(sat)')} · {get_val('Ic(sat)')} = {get_val('Pmax')}")
-    ]
-    doc.add_heading('Procesos de cálculo', level=1)
-    for nombre, formula, desarrollo in procesos:
-        doc.add_paragraph(nombre, style='List Bullet')
-        p = doc.add_paragraph()
-        p.add_run(formula + "\n").bold = True
-        p.add_run(desarrollo)
-    # Tabla de resultados
-    doc.add_heading('Resultados', level=1)
-    table = doc.add_table(rows=1, cols=2)
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Parámetro'
-    hdr_cells[1].text = 'Valor'
-    for clave, valor in resultados_dict.items():
-        if hasattr(valor, 'children'):
-            if isinstance(valor.children, list):
-                val = ''.join(str(c) for c in valor.children)
-            else:
-                val = str(valor.children)
-        else:
-            val = str(valor)
-        row_cells = table.add_row().cells
-        row_cells[0].text = clave
-        row_cells[1].text = val
-    buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
-    b64 = base64.b64encode(buffer.read()).decode('utf-8')
-    return f"data:application/vnd.openxmlformats-officedocument.wordprocessingml.document;base64,{b64}"
+# Reportes ya construidos, por configuración y parámetros efectivos
+cache_reportes = CacheLRU(capacidad=32)
 
-# ----- Lógica principal -----
+def reporte_circuito(formato, config, valores_efectivos, usados_por_defecto):
+    # Los asumidos forman parte de la clave: el reporte los marca con '≅'
+    clave = (formato, config, tuple(valores_efectivos.values()), tuple(usados_por_defecto))
+    exportar = exportar_a_pdf if formato == "pdf" else exportar_a_word
 
-def calcular_y_graficar(config, Vcc, Rc, Rb, Re, beta, Vbe):
-    # (Se mueve la creación de valores_efectivos más abajo, después de definir *_val)
-
-    # Valores típicos
-    valores_defecto = {
-        "Vcc": 12.0,   # Voltios
-        "Rc": 1000.0,  # Ohms
-        "Rb": 100000.0, # Ohms
-        "Re": 1000.0,  # Ohms
-        "β": 100.0,    # Sin unidad
-        "Vbe": 0.7     # Voltios
-    }
+    def construir():
+        punto = calcular_efectivo(config, valores_efectivos, usados_por_defecto)[2]
+        with etapa(formato):
+            return exportar(punto)
 
-    deducidos = []
-    usados_por_defecto = []
+    return cache_reportes.obtener(clave, construir)
 
-    # Intentar deducir cada parámetro si es posible
-    # 1. Vcc
-    try:
-        Vcc_val = interpretar_valor(Vcc)
-        if Vcc_val is None:
-            raise ValueError()
-        Vcc_src = 'directo'
-    except:
-        Vcc_val = None
-        Vcc_src = None
-    # 2. Rc
-    try:
-        Rc_val = interpretar_valor(Rc)
-        if Rc_val is None:
-            raise ValueError()
-        Rc_src = 'directo'
-    except:
-        Rc_val = None
-        Rc_src = None
-    # 3. Rb
-    try:
-        Rb_val = interpretar_valor(Rb)
-        if Rb_val is None:
-            raise ValueError()
-        Rb_src = 'directo'
-    except:
-        Rb_val = None
-        Rb_src = None
-    # 4. Re
-    try:
-        Re_val = interpretar_valor(Re)
-        if Re_val is None:
-            raise ValueError()
-        Re_src = 'directo'
-    except:
-        Re_val = None
-        Re_src = None
-    # 5. β
-    try:
-        beta_val = float(beta)
-        if beta_val is None:
-            raise ValueError()
-        beta_src = 'directo'
-    except:
-        beta_val = None
-        beta_src = None
-    # 6. Vbe
-    try:
-        Vbe_val = interpretar_valor(Vbe)
-        if Vbe_val is None:
-            raise ValueError()
-        Vbe_src = 'directo'
-    except:
-        Vbe_val = None
-        Vbe_src = None
-
-    # Deducción básica para parámetros faltantes
-    # Solo deducir si hay datos suficientes
-    # Deducir β si Ic e Ib están disponibles
-    Ic_deducido = None
-    Ib_deducido = None
-    Ie_deducido = None
-    # Primero, intentar deducir β
-    if beta_val is None:
-        # Si Ic e Ib están disponibles, deducir β
-        try:
-            Ic_test = float(interpretar_valor(Rc))  # No hay campo Ic directo, así que no se puede deducir
-        except:
-            Ic_test = None
-        try:
-            Ib_test = float(interpretar_valor(Rb))  # No hay campo Ib directo, así que no se puede deducir
-        except:
-            Ib_test = None
-        # No hay campo Ic ni Ib directo, así que no se puede deducir β
-        pass
-    # Deducir Ib si Ic y β están disponibles
-    if (Rb_val is None) and (beta_val is not None):
-        # Si el usuario ingresó Ic (no hay campo), no se puede deducir Ib
-        pass
-    # Deducir Ic si Ib y β están disponibles
-    if (Rc_val is None) and (beta_val is not None):
-        # Si el usuario ingresó Ib (no hay campo), no se puede deducir Ic
-        pass
-    # Deducir Vcc si Rc, Ic y Vc están disponibles
-    # No hay campo Vc ni Ic directo
-    # Deducir Rc si Vcc, Ic y Vc están disponibles
-    # No hay campo Vc ni Ic directo
-    # Deducir Vbe si Vb y Ve están disponibles
-    # No hay campo Vb ni Ve directo
-
-    # Si no se pudo deducir, usar valor típico
-    if Vcc_val is None:
-        Vcc_val = valores_defecto["Vcc"]
-        usados_por_defecto.append("Vcc")
-    if Rc_val is None:
-        Rc_val = valores_defecto["Rc"]
-        usados_por_defecto.append("Rc")
-    if Rb_val is None:
-        Rb_val = valores_defecto["Rb"]
-        usados_por_defecto.append("Rb")
-    if Re_val is None:
-        Re_val = valores_defecto["Re"]
-        usados_por_defecto.append("Re")
-    if beta_val is None:
-        beta_val = valores_defecto["β"]
-        usados_por_defecto.append("β")
-    if Vbe_val is None:
-        Vbe_val = valores_defecto["Vbe"]
-        usados_por_defecto.append("Vbe")
-
-    # Ahora sí, guardar los valores efectivos usados para historial y curvas dinámicas
-    valores_efectivos = {
-        "Vcc": Vcc_val,
-        "Rc": Rc_val,
-        "Rb": Rb_val,
-        "Re": Re_val,
-        "β": beta_val,
-        "Vbe": Vbe_val
-    }
-
-    # Realizar cálculo con los valores (originales, deducidos o por defecto)
-    Ib = Ic = Ie = Vb = Ve = Vc = Vce = Vbc = 0
-
-    if config == "Emisor común":
-        divisor = Rb_val + (beta_val + 1) * Re_val if (Rb_val or Re_val) else 1
-        Ib = (Vcc_val - Vbe_val) / divisor
-        Ic = beta_val * Ib
-        Ie = Ic + Ib
-
-    elif config == "Base común":
-        Ie = (Vcc_val - Vbe_val) / (Re_val + Rc_val)
-        Ic = (beta_val / (beta_val + 1)) * Ie
-        Ib = Ie - Ic
-
-    elif config == "Colector común":
-        divisor = Rb_val + (beta_val + 1) * Re_val if (Rb_val or Re_val) else 1
-        Ib = (Vcc_val - Vbe_val) / divisor
-        Ie = (beta_val + 1) * Ib
-        Ic = beta_val * Ib
-
-    Ve = Ie * Re_val
-    Vb = Ve + Vbe_val
-    Vc = Vcc_val if config == "Colector común" else Vcc_val - Ic * Rc_val
-    Vce = Vc - Ve
-    Vbc = Vb - Vc
-
-    Vce_sat = 0.2
-    Ic_sat = Vcc_val / Rc_val if Rc_val else 0
-    Pmax = Vce_sat * Ic_sat
+# ----- Lógica principal -----
 
-    estado = "SATURACIÓN" if Vce < 0.2 else "ACTIVA" if Ic > 0 else "CORTE"
+def obtener_valores_efectivos(Vcc, Rc, Rb, Re, beta, Vbe):
+    # Interpreta los seis campos; los vacíos o inválidos toman el valor típico
+    valores_efectivos = {}
+    usados_por_defecto = []
+    for nombre, valor in zip(PARAMETROS, (Vcc, Rc, Rb, Re, beta, Vbe)):
+        try:
+            val = float(valor) if nombre == "β" else interpretar_valor(valor)
+        except (TypeError, ValueError, AttributeError):
+            val = None
+        if val is None:
+            val = VALORES_DEFECTO[nombre]
+            usados_por_defecto.append(nombre)
+        valores_efectivos[nombre] = val
+    return valores_efectivos, usados_por_defecto
+
+# Resultados y figuras ya calculados, por configuración y valores efectivos
+cache_calculos = CacheLRU(capacidad=256)
+metricas.registro.registrar_cache("calculos", cache_calculos)
+metricas.registro.registrar_cache("reportes", cache_reportes)
 
+def calcular_y_graficar(config, Vcc, Rc, Rb, Re, beta, Vbe):
+    # (tabla html, figura, PuntoOperacion)
+    valores_efectivos, usados_por_defecto = obtener_valores_efectivos(Vcc, Rc, Rb, Re, beta, Vbe)
+    return calcular_efectivo(config, valores_efectivos, usados_por_defecto)
+
+def calcular_efectivo(config, valores_efectivos, usados_por_defecto):
+    clave = (config, tuple(valores_efectivos.values()), tuple(usados_por_defecto))
+    return cache_calculos.obtener(
+        clave, lambda: resolver_y_graficar(config, valores_efectivos, usados_por_defecto)
+    )
 
-    # Badge visual para el estado
-    estado_color = {
-        "ACTIVA": "success",
-        "SATURACIÓN": "warning",
-        "CORTE": "danger"
-    }
-    # Emoji visual para el estado
-    emoji_estado = {
-        "ACTIVA": "🟢",
-        "SATURACIÓN": "🟡",
-        "CORTE": "🔴"
-    }
+# Badge visual para el estado
+COLOR_ESTADO = {
+    "ACTIVA": "success",
+    "SATURACIÓN": "warning",
+    "CORTE": "danger",
+    "INVÁLIDO": "secondary"
+}
+# Emoji visual para el estado
+EMOJI_ESTADO = {
+    "ACTIVA": "🟢",
+    "SATURACIÓN": "🟡",
+    "CORTE": "🔴",
+    "INVÁLIDO": "⚪"
+}
+
+def tabla_resultados(punto, deducidos=()):
+    # Render HTML de un PuntoOperacion: el formato sale de filas_texto, igual que en los reportes
+    estado = punto.region.nombre
     badge_estado = html.Span([
         estado,
-        html.Span(f" {emoji_estado.get(estado, '')}", style={"fontSize": "1.2em"})
-    ], className=f"badge bg-{estado_color.get(estado, 'secondary')} mx-2", style={"fontSize": "1em"})
+        html.Span(f" {EMOJI_ESTADO.get(estado, '')}", style={"fontSize": "1.2em"})
+    ], className=f"badge bg-{COLOR_ESTADO.get(estado, 'secondary')} mx-2", style={"fontSize": "1em"})
 
     # Mostrar ≅ para los parámetros deducidos o asumidos, con fondo amarillo suave e ícono
-    def approx(val, nombre):
-        if nombre in usados_por_defecto:
-            # Siempre mostrar la unidad usando formatear_valor
+    def celda(clave, texto, asumido):
+        if clave == "Estado del transistor":
+            return badge_estado
+        if asumido:
             return html.Span([
                 html.Span("⚠️", style={"marginRight": "3px", "fontSize": "1em"}),
-                f"≅ {formatear_valor(val)}"
+                texto
             ], style={"background": "#fff3cd", "color": "#856404", "padding": "2px 6px", "borderRadius": "6px", "fontWeight": "bold"})
-        return formatear_valor(val) if nombre not in ['Vcc','Rc','Rb','Re','β','Vbe'] else val
-
-    resultados_dict = {
-        "Estado del transistor": badge_estado,
-        "Ib": approx(Ib, "Rb"),
-        "Ic": approx(Ic, "Rc"),
-        "Ie": approx(Ie, "Re"),
-        "Vb": f"{Vb:.2f} V",
-        "Ve": f"{Ve:.2f} V",
-        "Vc": f"{Vc:.2f} V",
-        "Vce": f"{Vce:.2f} V",
-        "Vbc": f"{Vbc:.2f} V",
-        "Ic(sat)": approx(Ic_sat, "Rc"),
-        "Vce(sat)": f"{Vce_sat:.2f} V",
-        "Pmax": f"{Pmax:.3f} W"
-    }
+        return texto
 
     # Aviso de deducidos y asumidos
     aviso = None
-    if usados_por_defecto or deducidos:
+    if punto.asumidos or deducidos:
         items = []
         if deducidos:
             items += [html.Li([
                 html.Span("🧮", style={"marginRight": "4px"}),
                 f"{p} deducido"
             ]) for p in deducidos]
-        if usados_por_defecto:
+        if punto.asumidos:
             items += [html.Li([
                 html.Span("⚠️", style={"marginRight": "4px"}),
-                f"{p} ≅ {valores_defecto[p] if p != 'β' else int(valores_defecto[p])}"
-            ]) for p in usados_por_defecto]
+                f"{p} ≅ {VALORES_DEFECTO[p] if p != 'β' else int(VALORES_DEFECTO[p])}"
+            ]) for p in punto.asumidos]
         aviso = html.Div([
             html.B("Parámetros deducidos o asumidos automáticamente:"),
             html.Ul(items, style={"color": "#856404"})
         ], style={"marginBottom": "10px", "background": "#fff3cd", "borderRadius": "8px", "padding": "8px 12px"})
 
-    resultados = html.Div([
+    return html.Div([
         aviso if aviso else None,
         html.Table([
             html.Thead(html.Tr([html.Th("Parámetro"), html.Th("Valor")])),
             html.Tbody([
                 html.Tr([
-                    html.Td(k),
-                    html.Td(v)
-                ]) for k, v in resultados_dict.items()
+                    html.Td(clave),
+                    html.Td(celda(clave, texto, asumido))
+                ]) for clave, texto, asumido in filas_texto(punto)
             ])
         ], className="table table-dark table-striped soft-box")
     ])
 
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=[0, Vcc_val], y=[Ic_sat, 0], mode='lines', name='Recta de carga'))
-    fig.add_trace(go.Scatter(x=[Vce], y=[Ic], mode='markers', name='Punto Q', marker=dict(size=10, color='red')))
-    fig.update_layout(title="Recta de carga y punto Q", xaxis_title="VCE (V)", yaxis_title="IC (A)", template="plotly_dark")
-
-    return resultados, fig, resultados_dict, valores_efectivos
-
-    Ib = Ic = Ie = Vb = Ve = Vc = Vce = Vbc = 0
-
-    if config == "Emisor común":
-        divisor = Rb + (beta + 1) * Re if (Rb or Re) else 1
-        Ib = (Vcc - Vbe) / divisor
-        Ic = beta * Ib
-        Ie = Ic + Ib
-
-    elif config == "Base común":
-        Ie = (Vcc - Vbe) / (Re + Rc)
-        Ic = (beta / (beta + 1)) * Ie
-        Ib = Ie - Ic
-
-    elif config == "Colector común":
-        divisor = Rb + (beta + 1) * Re if (Rb or Re) else 1
-        Ib = (Vcc - Vbe) / divisor
-        Ie = (beta + 1) * Ib
-        Ic = beta * Ib
-
-    Ve = Ie * Re
-    Vb = Ve + Vbe
-    Vc = Vcc if config == "Colector común" else Vcc - Ic * Rc
-    Vce = Vc - Ve
-    Vbc = Vb - Vc
-
-    Vce_sat = 0.2
-    Ic_sat = Vcc / Rc if Rc else 0
-    Pmax = Vce_sat * Ic_sat
-
-    estado = "SATURACIÓN" if Vce < 0.2 else "ACTIVA" if Ic > 0 else "CORTE"
-
-    resultados_dict = {
-        "Estado del transistor": estado,
-        "Ib": formatear_valor(Ib),
-        "Ic": formatear_valor(Ic),
-        "Ie": formatear_valor(Ie),
-        "Vb": f"{Vb:.2f} V",
-        "Ve": f"{Ve:.2f} V",
-        "Vc": f"{Vc:.2f} V",
-        "Vce": f"{Vce:.2f} V",
-        "Vbc": f"{Vbc:.2f} V",
-        "Ic(sat)": formatear_valor(Ic_sat),
-        "Vce(sat)": f"{Vce_sat:.2f} V",
-        "Pmax": f"{Pmax:.3f} W"
-    }
+def resolver_y_graficar(config, valores_efectivos, usados_por_defecto):
+    # No hay campos directos de Ic, Ib, Vc ni Vb, así que por ahora no se deduce nada:
+    # los parámetros faltantes toman su valor típico.
+    with etapa("resolver"):
+        punto = PuntoOperacion.resolver(config, valores_efectivos, usados_por_defecto)
 
-    resultados = html.Table([
-        html.Thead(html.Tr([html.Th("Parámetro"), html.Th("Valor")])),
-        html.Tbody([
-            html.Tr([html.Td(k), html.Td(v)]) for k, v in resultados_dict.items()
-        ])
-    ], className="table table-dark table-striped soft-box")
+    resultados = tabla_resultados(punto)
 
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=[0, Vcc], y=[Ic_sat, 0], mode='lines', name='Recta de carga'))
-    fig.add_trace(go.Scatter(x=[Vce], y=[Ic], mode='markers', name='Punto Q', marker=dict(size=10, color='red')))
-    fig.update_layout(title="Recta de carga y punto Q", xaxis_title="VCE (V)", yaxis_title="IC (A)", template="plotly_dark")
+    with etapa("figura"):
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=[0, punto.Vcc], y=[punto.Ic_sat, 0], mode='lines', name='Recta de carga'))
+        fig.add_trace(go.Scatter(x=[punto.Vce], y=[punto.Ic], mode='markers', name='Punto Q', marker=dict(size=10, color='red')))
+        fig.update_layout(title="Recta de carga y punto Q", xaxis_title="VCE (V)", yaxis_title="IC (A)", template="plotly_dark")
 
-    return resultados, fig, resultados_dict
+    return resultados, fig, punto
 
 # ----- Diseño principal -----
 
-import json
-import os
+# Historial en SQLite (modo WAL); el antiguo historial.json se importa la primera vez
 HISTORIAL_PATH = "historial.json"
-def cargar_historial():
-    if os.path.exists(HISTORIAL_PATH):
-        try:
-            with open(HISTORIAL_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
-
-def guardar_historial(historial):
-    try:
-        with open(HISTORIAL_PATH, "w", encoding="utf-8") as f:
-            json.dump(historial, f, ensure_ascii=False, indent=2)
-    except:
-        pass
-
-historial = cargar_historial()
+HISTORIAL_DB = os.environ.get("HISTORIAL_DB", "historial.db")
+FILAS_POR_PAGINA = 25
+
+# Trabajos en segundo plano y sus resultados (compartidos entre workers de la misma máquina)
+RESULTADOS_DIR = os.environ.get("RESULTADOS_DIR", os.path.join(tempfile.gettempdir(), "bjt-resultados"))
+
+historial = Historial(HISTORIAL_DB, ruta_json=HISTORIAL_PATH)
+# Cada navegador ve solo sus cálculos (id en el Store "sesion", en localStorage:
+# sobrevive a cerrar la pestaña y lo comparten todas las del mismo navegador)
+historial_sesiones = HistorialSesiones(historial)
+metricas.registro.registrar_cache("historial_sesiones", historial_sesiones.cache)
+gestor_trabajos = GestorTrabajos(
+    os.path.join(RESULTADOS_DIR, "trabajos"), procesos=int(os.environ.get("TRABAJOS_PROCESOS", 2))
+)
 
 def ayuda_parametro(param):
     ayudas = {
@@ -519,61 +254,357 @@ def input_with_help(campo):
         dbc.Input(id=campo, placeholder=campo, type="text", className="mb-2", value="")
     ])
 
-app.layout = dbc.Container([
-    html.H2("Analizador de Transistor BJT", className="my-3 text-center text-light"),
+# A partir de este número de puntos las curvas se dibujan con WebGL
+UMBRAL_WEBGL = 5000
+
+def trazas_familia(valores_efectivos, punto, n_curvas, n_puntos, Va):
+    # Traza de la familia IC vs VCE y la de sus etiquetas de Ib
+    n_curvas = min(max(n_curvas, 1), 100)
+    n_puntos = min(max(n_puntos, 10), 20000)
+    Vcc = valores_efectivos["Vcc"]
+    Vce = np.linspace(0, Vcc, n_puntos)
+    Ib = pasos_base(punto["Ib"], n_curvas)
+    Ic = familia_curvas(Ib, Vce, valores_efectivos["β"], Va=Va)
+
+    # Toda la familia en una sola traza, separando las curvas con NaN.
+    # float32 basta para dibujar y reduce a la mitad lo que viaja al navegador.
+    x = np.tile(np.append(Vce, np.nan), n_curvas).astype(np.float32)
+    y = np.hstack([Ic, np.full((n_curvas, 1), np.nan)]).ravel().astype(np.float32)
+    import plotly.graph_objects as go
+    Traza = go.Scattergl if x.size > UMBRAL_WEBGL else go.Scatter
+    familia = Traza(x=x, y=y, mode='lines', name='Familia IC vs VCE', line=dict(width=1, color="#00bfff"))
+    etiquetas = go.Scatter(
+        x=np.full(n_curvas, Vcc), y=Ic[:, -1], mode='text', textposition="middle left",
+        text=[f"Ib = {formatear_valor(ib)}" for ib in Ib], showlegend=False, hoverinfo="skip"
+    )
+    return familia, etiquetas
 
-    dbc.Row([
+def figura_curvas(valores_efectivos, punto, n_curvas, n_puntos, Va):
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    fig.add_traces(trazas_familia(valores_efectivos, punto, n_curvas, n_puntos, Va))
+    fig.add_trace(go.Scatter(x=[0, valores_efectivos["Vcc"]], y=[punto["Ic(sat)"], 0], mode='lines', name='Recta de carga'))
+    fig.add_trace(go.Scatter(x=[punto["Vce"]], y=[punto["Ic"]], mode='markers', name='Punto Q', marker=dict(size=10, color='red')))
+    fig.update_layout(title="Curvas características IC vs VCE", xaxis_title="VCE (V)", yaxis_title="IC (A)", template="plotly_dark")
+    return fig
+
+# ----- Actualizaciones parciales de las gráficas -----
+#
+# Las figuras de Gráfica y Curvas Dinámicas quedan en el navegador; tras el primer
+# dibujo solo viajan las trazas que cambiaron (dash.Patch). Lo que hay dibujado se
+# resume en una firma guardada en un Store pequeño, para no subir la figura entera.
+
+# Posición de cada traza en las figuras
+TRAZAS_CARGA = {"recta": 0, "q": 1}
+TRAZAS_CURVAS = {"familia": 0, "etiquetas": 1, "recta": 2, "q": 3}
+
+def firma_carga(valores_efectivos, punto):
+    return {"recta": [valores_efectivos["Vcc"], punto["Ic(sat)"]], "q": [punto["Vce"], punto["Ic"]]}
+
+def parchear_recta_q(parche, firma, anterior, trazas):
+    # Mueve la recta de carga y el punto Q solo si cambiaron; devuelve si hubo cambios
+    cambios = False
+    if firma["recta"] != anterior.get("recta"):
+        Vcc, Ic_sat = firma["recta"]
+        parche["data"][trazas["recta"]]["x"] = [0, Vcc]
+        parche["data"][trazas["recta"]]["y"] = [Ic_sat, 0]
+        cambios = True
+    if firma["q"] != anterior.get("q"):
+        Vce, Ic = firma["q"]
+        parche["data"][trazas["q"]]["x"] = [Vce]
+        parche["data"][trazas["q"]]["y"] = [Ic]
+        cambios = True
+    return cambios
+
+def panel_curvas():
+    return dbc.Row([
         dbc.Col([
-            html.Div([
-                dbc.Label("Configuración"),
-                dcc.Dropdown(
-                    id="config",
-                    options=[
-                        {"label": "Emisor común", "value": "Emisor común"},
-                        {"label": "Base común", "value": "Base común"},
-                        {"label": "Colector común", "value": "Colector común"}
-                    ],
-                    value="Emisor común",
-                    className="mb-3"
-                ),
-                *[input_with_help(campo) for campo in ["Vcc", "Rc", "Rb", "Re", "β", "Vbe"]],
-                dbc.Button("Calcular", id="btn-calc", className="btn btn-success mt-2"),
-                html.Br(),
-                html.A("Descargar Word", id="descarga-word", href="", download="resultado.docx", target="_blank", className="btn btn-secondary mt-2", style={"display": "none"}),
-                html.Br(),
-                html.A("Descargar PDF", id="descarga-pdf", href="", download="resultado.pdf", target="_blank", className="btn btn-secondary mt-2", style={"display": "none"}),
-                html.Div(id="validacion-campos", className="mt-2")
-            ], className="soft-box")
+            dbc.Label("Curvas (pasos de Ib)"),
+            dbc.Input(id="curvas-numero", type="number", value=10, min=1, max=100, step=1, debounce=True)
         ], md=4),
-
         dbc.Col([
-            dcc.Tabs(id="tabs", value="tab1", children=[
-                dcc.Tab(label='Resultados', value='tab1'),
-                dcc.Tab(label='Gráfica', value='tab2'),
-                dcc.Tab(label='Curvas Dinámicas', value='tab3'),
-                dcc.Tab(label='Historial', value='tab4')
-            ]),
-            html.Div(id="contenido_tab")
-        ], md=8)
-    ])
-], fluid=True)
+            dbc.Label("Puntos por curva"),
+            dbc.Input(id="curvas-puntos", type="number", value=500, min=10, max=20000, step=10, debounce=True)
+        ], md=4),
+        dbc.Col([
+            dbc.Label("Voltaje de Early (V)"),
+            dbc.Input(id="curvas-early", type="number", value=VA_DEFECTO, min=1, step=1, debounce=True)
+        ], md=4)
+    ], className="mt-2 mb-2")
+
+def panel_trabajo(prefijo):
+    # Avance y cancelación de un trabajo en segundo plano. El id del trabajo vive en la
+    # sesión del navegador: al recargar se retoma el sondeo o se muestra el resultado.
+    return html.Div([
+        dbc.Progress(id=f"{prefijo}-progreso", value=0, striped=True, animated=True, style={"display": "none"}),
+        html.Div([
+            html.Span(id=f"{prefijo}-mensaje", className="small text-muted me-2"),
+            dbc.Button("Cancelar", id=f"{prefijo}-cancelar", size="sm", color="danger", outline=True,
+                       style={"display": "none"})
+        ], className="mt-1"),
+        dcc.Interval(id=f"{prefijo}-intervalo", interval=500, disabled=True),
+        dcc.Store(id=f"{prefijo}-trabajo", storage_type="session")
+    ], className="mb-2")
+
+def panel_lote():
+    return html.Div([
+        html.H5("Resolución masiva desde CSV / Excel", style={"color": "#00bfff"}),
+        html.P(
+            "Columnas: config, Vcc, Rc, Rb, Re, β (o beta), Vbe. Las celdas vacías usan el valor "
+            "típico y las filas sin config usan la configuración seleccionada.",
+            className="text-muted"
+        ),
+        dcc.Upload(
+            html.Div(["Arrastra un archivo o ", html.A("selecciónalo", style={"color": "#00bfff"})]),
+            id="lote-archivo",
+            accept=".csv,.txt,.xlsx,.xlsm",
+            className="soft-box text-center",
+            style={"borderStyle": "dashed", "cursor": "pointer"}
+        ),
+        panel_trabajo("lote"),
+        html.Div(id="lote-resumen"),
+        dbc.Button("Descargar resultados", id="lote-descargar", className="btn btn-secondary mt-2", style={"display": "none"}),
+        dcc.Download(id="lote-descarga")
+    ], className="soft-box")
 
-@app.callback(
-    Output("contenido_tab", "children"),
-    Output("descarga-word", "href"),
-    Output("descarga-word", "style"),
-    Output("descarga-pdf", "href"),
-    Output("descarga-pdf", "style"),
-    Output("validacion-campos", "children"),
-    Input("tabs", "value"),
-    Input("btn-calc", "n_clicks"),
-    Input("config", "value"),
-    Input("Vcc", "value"), Input("Rc", "value"), Input("Rb", "value"),
-    Input("Re", "value"), Input("β", "value"), Input("Vbe", "value")
+def panel_montecarlo():
+    return html.Div([
+        html.H5("Análisis de tolerancias (Monte Carlo)", style={"color": "#00bfff"}),
+        dbc.Row([
+            dbc.Col([
+                dbc.Label("Tolerancia de resistencias"),
+                dcc.Dropdown(
+                    id="mc-tolerancia",
+                    options=[{"label": f"{t:.0%}", "value": t} for t in TOLERANCIAS_RESISTENCIA],
+                    value=0.05, clearable=False
+                )
+            ], md=3),
+            dbc.Col([
+                dbc.Label("Dispersión de β (%)"),
+                dbc.Input(id="mc-beta", type="number", value=20, min=0, step=1)
+            ], md=3),
+            dbc.Col([
+                dbc.Label("Dispersión de Vbe (mV)"),
+                dbc.Input(id="mc-vbe", type="number", value=20, min=0, step=1)
+            ], md=3),
+            dbc.Col([
+                dbc.Label("Muestras"),
+                dcc.Dropdown(
+                    id="mc-muestras",
+                    options=[{"label": f"{n:,}", "value": n} for n in (10_000, 100_000, 1_000_000, 10_000_000)],
+                    value=100_000, clearable=False
+                )
+            ], md=3)
+        ], className="mb-2"),
+        dbc.Button("Simular", id="btn-mc", className="btn btn-info mb-2"),
+        panel_trabajo("mc"),
+        html.Div(id="mc-resultados")
+    ], className="soft-box")
+
+def panel_diseno():
+    return html.Div([
+        html.H5("Diseño inverso con valores normalizados", style={"color": "#00bfff"}),
+        html.P("Usa la configuración, Vcc, β y Vbe del formulario y busca Rb, Rc y Re comerciales para el punto Q pedido. "
+               "«Usar» copia la combinación al formulario; después pulsa Calcular.",
+               className="text-muted small"),
+        dbc.Row([
+            dbc.Col([
+                dbc.Label("Ic objetivo"),
+                dbc.Input(id="diseno-ic", type="text", value="2m", placeholder="2m")
+            ], md=3),
+            dbc.Col([
+                dbc.Label("Vce objetivo"),
+                dbc.Input(id="diseno-vce", type="text", value="6", placeholder="6")
+            ], md=3),
+            dbc.Col([
+                dbc.Label("Serie"),
+                dcc.Dropdown(id="diseno-serie", options=list(SERIES), value="E24", clearable=False)
+            ], md=3),
+            dbc.Col([
+                dbc.Label("Tolerancia del punto Q"),
+                dcc.Dropdown(
+                    id="diseno-tolerancia",
+                    options=[{"label": "Mínimo error", "value": 0}] + [{"label": f"±{t:.0%}", "value": t} for t in TOLERANCIAS_RESISTENCIA],
+                    value=0, clearable=False
+                )
+            ], md=3)
+        ], className="mb-2"),
+        dbc.Button("Buscar", id="btn-diseno", className="btn btn-info mb-2"),
+        dcc.Loading(html.Div(id="diseno-resultados")),
+        dcc.Store(id="diseno-candidatos")
+    ], className="soft-box")
+
+def panel_temperatura():
+    return html.Div([
+        html.H5("Barrido de temperatura", style={"color": "#00bfff"}),
+        html.P(f"Vbe deriva −2 mV/°C y β crece como (T/T0)^1.5 desde {T_REFERENCIA:g} °C, donde valen los del formulario.",
+               className="text-muted small"),
+        dbc.Row([
+            dbc.Col([
+                dbc.Label("Circuitos"),
+                dcc.Dropdown(
+                    id="temp-alcance",
+                    options=[{"label": "Circuito actual", "value": "actual"},
+                             {"label": "Historial de la sesión", "value": "historial"}],
+                    value="actual", clearable=False
+                )
+            ], md=3),
+            dbc.Col([
+                dbc.Label("T mínima (°C)"),
+                dbc.Input(id="temp-min", type="number", value=T_MIN, step=1)
+            ], md=3),
+            dbc.Col([
+                dbc.Label("T máxima (°C)"),
+                dbc.Input(id="temp-max", type="number", value=T_MAX, step=1)
+            ], md=3),
+            dbc.Col([
+                dbc.Label("Paso (°C)"),
+                dbc.Input(id="temp-paso", type="number", value=PASO_T, min=0.01, step=0.01)
+            ], md=3)
+        ], className="mb-2"),
+        dbc.Button("Barrer", id="btn-temp", className="btn btn-info mb-2"),
+        panel_trabajo("temp"),
+        dcc.Loading(html.Div(id="temp-resultados"))
+    ], className="soft-box")
+
+# Columnas de la tabla del historial; el orden y los filtros se resuelven en SQLite
+COLUMNAS_HISTORIAL = (
+    ("fecha", "Fecha"), ("config", "Config"), ("Vcc", "Vcc"), ("Rc", "Rc"), ("Rb", "Rb"), ("Re", "Re"),
+    ("β", "β"), ("Vbe", "Vbe"), ("Ic", "Ic"), ("Vce", "Vce"), ("estado", "Estado"), ("cargar", "")
 )
-def actualizar_tabs(tab, n, config, Vcc, Rc, Rb, Re, beta, Vbe):
-    # Validación visual y de rango
 
+def panel_historial():
+    return html.Div([
+        dbc.Row([
+            dbc.Col(dcc.Dropdown(
+                id="historial-config",
+                options=[{"label": c, "value": c} for c in CONFIGURACIONES],
+                placeholder="Todas las configuraciones"
+            ), md=4),
+            dbc.Col(dcc.Dropdown(
+                id="historial-estado",
+                options=[{"label": e, "value": e} for e in ESTADOS],
+                placeholder="Todas las regiones"
+            ), md=3),
+            dbc.Col(dbc.Input(id="historial-ic-min", type="text", placeholder="Ic mínima (1m)", debounce=True), md=2),
+            dbc.Col(dbc.Input(id="historial-ic-max", type="text", placeholder="Ic máxima (10m)", debounce=True), md=2)
+        ], className="g-2 mt-2 mb-2"),
+        # Solo viaja la página visible: paginado y orden los hace el servidor
+        dash_table.DataTable(
+            id="historial-tabla",
+            columns=[{"name": nombre, "id": clave} for clave, nombre in COLUMNAS_HISTORIAL],
+            data=[],
+            page_action="custom", page_current=0, page_size=FILAS_POR_PAGINA, page_count=1,
+            sort_action="custom", sort_mode="single", sort_by=[],
+            cell_selectable=True,
+            style_table={"overflowX": "auto"},
+            style_header={"backgroundColor": "#23233a", "color": "#00bfff", "fontWeight": "bold"},
+            style_cell={"backgroundColor": "#1e1e2f", "color": "#e0e0e0", "border": "1px solid #33334d",
+                        "fontFamily": "'Segoe UI', sans-serif", "padding": "4px 8px"},
+            style_data_conditional=[
+                {"if": {"row_index": "odd"}, "backgroundColor": "#23233a"},
+                {"if": {"column_id": "cargar"}, "color": "#00bfff", "cursor": "pointer", "textDecoration": "underline"}
+            ]
+        )
+    ], className="mb-2")
+
+def panel_reporte_historial():
+    return html.Div([
+        dbc.Row([
+            dbc.Col(dcc.Dropdown(
+                id="reporte-cantidad",
+                options=[{"label": f"Últimos {n} cálculos", "value": n} for n in (10, 50, 200)],
+                value=10, clearable=False
+            ), md=5),
+            dbc.Col([
+                dbc.Button("Reporte Word", id="btn-reporte-word", className="btn btn-secondary me-2"),
+                dbc.Button("Reporte PDF", id="btn-reporte-pdf", className="btn btn-secondary")
+            ], md=7)
+        ], className="g-2 mb-2"),
+        panel_trabajo("reporte"),
+        dcc.Download(id="reporte-descarga")
+    ], className="mb-2")
+
+def histograma_figura(conteos, bordes, titulo, eje_x, limite=None):
+    # conteos y bordes vienen ya calculados (nucleo.histograma) desde el trabajo
+    import plotly.graph_objects as go
+    bordes = np.asarray(bordes)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=(bordes[:-1] + bordes[1:]) / 2, y=conteos, width=np.diff(bordes),
+        name=titulo, marker=dict(color="#00bfff")
+    ))
+    if limite is not None:
+        fig.add_vline(x=limite, line_dash="dash", line_color="orange")
+    fig.update_layout(title=titulo, xaxis_title=eje_x, yaxis_title="Muestras", template="plotly_dark", bargap=0)
+    return fig
+
+def disposicion():
+    return dbc.Container([
+        html.H2("Analizador de Transistor BJT", className="my-3 text-center text-light"),
+
+        dbc.Row([
+            dbc.Col([
+                html.Div([
+                    dbc.Label("Configuración"),
+                    dcc.Dropdown(
+                        id="config",
+                        options=[
+                            {"label": "Emisor común", "value": "Emisor común"},
+                            {"label": "Base común", "value": "Base común"},
+                            {"label": "Colector común", "value": "Colector común"}
+                        ],
+                        value="Emisor común",
+                        className="mb-3"
+                    ),
+                    *[input_with_help(campo) for campo in ["Vcc", "Rc", "Rb", "Re", "β", "Vbe"]],
+                    html.Div(id="vista-previa", className="small text-info"),
+                    dcc.Store(id="modelo-cliente", data={"defecto": VALORES_DEFECTO, "vce_sat": VCE_SAT}),
+                    dbc.Button("Calcular", id="btn-calc", className="btn btn-success mt-2"),
+                    html.Br(),
+                    dbc.Button("Descargar Word", id="descarga-word", className="btn btn-secondary mt-2", style={"display": "none"}),
+                    dcc.Download(id="archivo-word"),
+                    html.Br(),
+                    dbc.Button("Descargar PDF", id="descarga-pdf", className="btn btn-secondary mt-2", style={"display": "none"}),
+                    dcc.Download(id="archivo-pdf"),
+                    html.Div(id="validacion-campos", className="mt-2")
+                ], className="soft-box")
+            ], md=4),
+
+            dbc.Col([
+                dcc.Tabs(id="tabs", value="tab1", children=[
+                    dcc.Tab(html.Div(id="contenido-tab1"), label='Resultados', value='tab1'),
+                    dcc.Tab([
+                        html.Div(id="contenido-tab2"),
+                        dcc.Graph(id="grafica-carga", style={"display": "none"}),
+                        dcc.Store(id="firma-grafica")
+                    ], label='Gráfica', value='tab2'),
+                    dcc.Tab([
+                        panel_curvas(),
+                        html.Div(id="contenido-tab3"),
+                        dcc.Graph(id="grafica-curvas", style={"display": "none"}),
+                        dcc.Store(id="firma-curvas")
+                    ], label='Curvas Dinámicas', value='tab3'),
+                    dcc.Tab([
+                        html.Div(id="contenido-tab4"),
+                        html.Div([
+                            panel_historial(),
+                            panel_reporte_historial()
+                        ], id="controles-historial", style={"display": "none"})
+                    ], label='Historial', value='tab4'),
+                    dcc.Tab(panel_montecarlo(), label='Monte Carlo', value='tab5'),
+                    dcc.Tab(panel_lote(), label='Lote', value='tab6'),
+                    dcc.Tab(panel_diseno(), label='Diseño', value='tab7'),
+                    dcc.Tab(panel_temperatura(), label='Temperatura', value='tab8')
+                ]),
+                dcc.Store(id="estado-calculo"),
+                dcc.Store(id="sesion", storage_type="local")
+            ], md=8)
+        ])
+    ], fluid=True)
+
+def validar_campos(Vcc, Rc, Rb, Re, beta, Vbe):
+    # Validación visual y de rango
     campos = {"Vcc": Vcc, "Rc": Rc, "Rb": Rb, "Re": Re, "β": beta, "Vbe": Vbe}
     errores = []
     for k, v in campos.items():
@@ -586,122 +617,773 @@ def actualizar_tabs(tab, n, config, Vcc, Rc, Rb, Re, beta, Vbe):
                     errores.append("β fuera de rango (20-500)")
             except:
                 errores.append(f"{k} inválido")
-    validacion = html.Ul([html.Li(e, style={"color": "#ff5555"}) for e in errores]) if errores else None
+    return errores
+
+def mismo_circuito(estado, config, Vcc, Rc, Rb, Re, beta, Vbe):
+    # ¿Los campos describen el circuito que ya está resuelto en el estado?
+    if not estado or not estado.get("calculado") or estado["config"] != config:
+        return False
+    valores = obtener_valores_efectivos(Vcc, Rc, Rb, Re, beta, Vbe)[0]
+    return all(np.isclose(valores[p], estado["valores"][p], rtol=1e-9, atol=0) for p in PARAMETROS)
+
+def lista_errores(errores):
+    return html.Ul([html.Li(e, style={"color": "#ff5555"}) for e in errores]) if errores else None
+
+# El cálculo se resuelve una sola vez y se guarda en "estado-calculo";
+# cada pestaña se dibuja después a partir de ese estado con su propio callback.
+@callback(
+    Output("estado-calculo", "data"),
+    Output("descarga-word", "style"),
+    Output("descarga-pdf", "style"),
+    Output("validacion-campos", "children"),
+    Input("btn-calc", "n_clicks"),
+    Input("config", "value"),
+    # Los campos solo recalculan en el servidor al salir del campo o pulsar Enter;
+    # mientras se escribe, la vista previa se resuelve en el navegador
+    *[Input(campo, "n_blur") for campo in PARAMETROS],
+    *[Input(campo, "n_submit") for campo in PARAMETROS],
+    State("Vcc", "value"), State("Rc", "value"), State("Rb", "value"),
+    State("Re", "value"), State("β", "value"), State("Vbe", "value"),
+    State("sesion", "data"),
+    State("estado-calculo", "data")
+)
+def resolver_circuito(n, config, *args):
+    *_, Vcc, Rc, Rb, Re, beta, Vbe, sesion, anterior = args
+    # Al cargar una entrada del historial el estado llega ya resuelto junto con la
+    # configuración: no hay nada que recalcular
+    if ctx.triggered_id == "config" and mismo_circuito(anterior, config, Vcc, Rc, Rb, Re, beta, Vbe):
+        raise PreventUpdate
+    with etapa("validacion"):
+        errores = validar_campos(Vcc, Rc, Rb, Re, beta, Vbe)
 
-    global historial
-    resultados, grafico, resultados_dict, valores_efectivos = calcular_y_graficar(config, Vcc, Rc, Rb, Re, beta, Vbe)
-    href_word = exportar_a_word(resultados_dict)
+    # Mostrar resultados en tiempo real: si hay errores, no mostrar resultados
+    if errores:
+        return {"calculado": False, "errores": errores}, {"display": "none"}, {"display": "none"}, lista_errores(errores)
 
-    # Guardar historial solo si se presiona Calcular y no hay errores
-    if ctx.triggered_id == "btn-calc" and not errores:
-        hist = {"config": config}
-        for k in ["Vcc", "Rc", "Rb", "Re", "β", "Vbe"]:
+    # Si no se ha hecho cálculo y no hay cambios, limpiar todo
+    if not n and ctx.triggered_id != "btn-calc":
+        return {"calculado": False, "errores": []}, {"display": "none"}, {"display": "none"}, None
+
+    valores_efectivos, usados_por_defecto = obtener_valores_efectivos(Vcc, Rc, Rb, Re, beta, Vbe)
+    # En el estado y en el historial el punto viaja como JSON (números, no componentes)
+    punto = calcular_efectivo(config, valores_efectivos, usados_por_defecto)[2].a_json()
+
+    # Guardar historial solo si se presiona Calcular; con el punto resuelto, para
+    # filtrar por región o Ic y recargarlo sin volver a resolver
+    if ctx.triggered_id == "btn-calc":
+        hist = {"config": config, "punto": punto, "defecto": usados_por_defecto}
+        for k in PARAMETROS:
             hist[k] = valores_efectivos[k]
-        historial.append(hist)
-        guardar_historial(historial)
+        with etapa("historial"):
+            historial_sesiones.agregar(sesion, hist)
+
+    estado = {
+        "calculado": True,
+        "errores": [],
+        "config": config,
+        "valores": valores_efectivos,
+        "defecto": usados_por_defecto,
+        "punto": punto
+    }
+    return estado, {"display": "inline-block"}, {"display": "inline-block"}, None
+
+clientside_callback(
+    ClientsideFunction(namespace="bjt", function_name="sesion"),
+    Output("sesion", "data"),
+    Input("sesion", "modified_timestamp"),
+    State("sesion", "data")
+)
+
+clientside_callback(
+    ClientsideFunction(namespace="bjt", function_name="vista_previa"),
+    Output("vista-previa", "children"),
+    Input("config", "value"),
+    Input("Vcc", "value"), Input("Rc", "value"), Input("Rb", "value"),
+    Input("Re", "value"), Input("β", "value"), Input("Vbe", "value"),
+    State("modelo-cliente", "data")
+)
+
+def contenido_sin_calculo(estado):
+    # Devuelve lo que se muestra mientras no hay un cálculo válido, o None si lo hay
+    if not estado or not estado.get("calculado"):
+        return lista_errores(estado.get("errores") if estado else None) or ""
+    return None
+
+def calculo_desde_estado(estado):
+    return calcular_efectivo(estado["config"], estado["valores"], estado["defecto"])
+
+def pestana_activa(tab, esperada):
+    # Las pestañas inactivas no hacen ningún trabajo
+    if tab != esperada:
+        raise PreventUpdate
+
+@callback(
+    Output("contenido-tab1", "children"),
+    Input("estado-calculo", "data"),
+    Input("tabs", "value")
+)
+def mostrar_resultados(estado, tab):
+    pestana_activa(tab, "tab1")
+    vacio = contenido_sin_calculo(estado)
+    if vacio is not None:
+        return vacio
+    # La tabla sale del punto ya resuelto que trae el estado
+    resultados = tabla_resultados(PuntoOperacion.desde_json(estado["punto"]))
+    # Mejora visual: caja con sombra, separación, íconos
+    return html.Div([
+        html.Div([
+            html.H4("Resultados del análisis", style={"color": "#00bfff", "marginBottom": "10px"}),
+            resultados
+        ], className="soft-box", style={"background": "rgba(0,191,255,0.07)", "border": "1.5px solid #00bfff", "boxShadow": "0 2px 12px #00bfff33"})
+    ])
+
+@callback(
+    Output("grafica-carga", "figure"),
+    Output("grafica-carga", "style"),
+    Output("contenido-tab2", "children"),
+    Output("firma-grafica", "data"),
+    Input("estado-calculo", "data"),
+    Input("tabs", "value"),
+    State("firma-grafica", "data")
+)
+def mostrar_grafica(estado, tab, anterior):
+    pestana_activa(tab, "tab2")
+    vacio = contenido_sin_calculo(estado)
+    if vacio is not None:
+        return dash.no_update, {"display": "none"}, vacio, dash.no_update
+    firma = firma_carga(estado["valores"], estado["punto"])
+    if not anterior:
+        grafico = calculo_desde_estado(estado)[1]
+        return grafico, {"display": "block"}, None, firma
+    parche = dash.Patch()
+    if not parchear_recta_q(parche, firma, anterior, TRAZAS_CARGA):
+        parche = dash.no_update
+    return parche, {"display": "block"}, None, firma
+
+@callback(
+    Output("grafica-curvas", "figure"),
+    Output("grafica-curvas", "style"),
+    Output("contenido-tab3", "children"),
+    Output("firma-curvas", "data"),
+    Input("estado-calculo", "data"),
+    Input("tabs", "value"),
+    Input("curvas-numero", "value"),
+    Input("curvas-puntos", "value"),
+    Input("curvas-early", "value"),
+    State("firma-curvas", "data")
+)
+def mostrar_curvas(estado, tab, n_curvas, n_puntos, Va, anterior):
+    pestana_activa(tab, "tab3")
+    vacio = contenido_sin_calculo(estado)
+    if vacio is not None:
+        return dash.no_update, {"display": "none"}, vacio, dash.no_update
+    valores, punto = estado["valores"], estado["punto"]
+    if punto["estado"] == "INVÁLIDO":
+        # Ib, Ic y Vce llegan como None: no hay punto Q ni familia que dibujar
+        return dash.no_update, {"display": "none"}, html.Div(
+            "El circuito no tiene un punto de operación finito (por ejemplo Rc = Re = 0 en base común); "
+            "no hay curvas que dibujar."
+        ), None
+    opciones = (int(n_curvas or 10), int(n_puntos or 500), float(Va or VA_DEFECTO))
+    # La familia depende de Vcc, β y la Ib del punto Q, no de Rc: al cambiar Rc solo
+    # se mueven la recta y el punto Q. El eje VCE (y el tipo de traza) solo depende
+    # de Vcc y del número de puntos, así que al cambiar Rb o β basta con reenviar IC.
+    eje = [valores["Vcc"], *opciones[:2]]
+    firma = {**firma_carga(valores, punto), "eje": eje, "familia": [*eje, valores["β"], punto["Ib"], opciones[2]]}
+    try:
+        with etapa("curvas"):
+            if not anterior:
+                return figura_curvas(valores, punto, *opciones), {"display": "block"}, None, firma
+            parche = dash.Patch()
+            cambios = parchear_recta_q(parche, firma, anterior, TRAZAS_CURVAS)
+            if firma["familia"] != anterior.get("familia"):
+                import plotly.graph_objects as go
+                # Pasando por to_dict() los arrays viajan en binario (base64), igual que en la figura completa
+                familia, etiquetas = go.Figure(data=trazas_familia(valores, punto, *opciones)).to_dict()["data"]
+                if firma["eje"] == anterior.get("eje"):
+                    parche["data"][TRAZAS_CURVAS["familia"]]["y"] = familia["y"]
+                    parche["data"][TRAZAS_CURVAS["etiquetas"]]["y"] = etiquetas["y"]
+                    parche["data"][TRAZAS_CURVAS["etiquetas"]]["text"] = etiquetas["text"]
+                else:
+                    parche["data"][TRAZAS_CURVAS["familia"]] = familia
+                    parche["data"][TRAZAS_CURVAS["etiquetas"]] = etiquetas
+                cambios = True
+        return parche if cambios else dash.no_update, {"display": "block"}, None, firma
+    except (ValueError, ArithmeticError):
+        # Valores que el modelo no puede dibujar (Va = 0, rangos degenerados); los
+        # demás errores son fallos del código y no se esconden
+        return dash.no_update, {"display": "none"}, html.Div("Error al calcular curva dinámica. Revisa los valores."), None
+
+def texto_ic(texto):
+    # Límite del filtro de Ic; vacío o ilegible = sin límite
+    try:
+        return interpretar_valor(texto) if texto else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+def fila_historial(h):
+    resistencia = lambda v: f"{formatear_resistencia(v)}Ω"
+    return {
+        "id": h["id"],
+        "fecha": time.strftime("%Y-%m-%d %H:%M", time.localtime(h["fecha"])),
+        "config": h["config"],
+        "Vcc": f"{h['Vcc']:g} V", "Rc": resistencia(h["Rc"]), "Rb": resistencia(h["Rb"]), "Re": resistencia(h["Re"]),
+        "β": f"{h['β']:g}", "Vbe": f"{h['Vbe']:g} V",
+        # Las entradas anteriores a guardar el punto no lo tienen
+        "Ic": "—" if h["Ic"] is None else formatear_valor(h["Ic"]),
+        "Vce": "—" if h["Vce"] is None else f"{h['Vce']:.2f} V",
+        "estado": h["estado"] or "—",
+        "cargar": "Cargar"
+    }
+
+@callback(
+    Output("contenido-tab4", "children"),
+    Output("historial-tabla", "data"),
+    Output("historial-tabla", "page_count"),
+    Output("historial-tabla", "page_current"),
+    Output("controles-historial", "style"),
+    Input("estado-calculo", "data"),
+    Input("tabs", "value"),
+    Input("historial-tabla", "page_current"),
+    Input("historial-tabla", "sort_by"),
+    Input("historial-config", "value"),
+    Input("historial-estado", "value"),
+    Input("historial-ic-min", "value"),
+    Input("historial-ic-max", "value"),
+    State("sesion", "data")
+)
+def mostrar_historial(estado, tab, pagina, orden, config, region, ic_min, ic_max, sesion):
+    pestana_activa(tab, "tab4")
+    vacio = contenido_sin_calculo(estado)
+    if vacio is not None:
+        return vacio, [], 1, 0, {"display": "none"}
+    # Al cambiar un filtro o el orden se vuelve a la primera página
+    if ctx.triggered_id not in ("historial-tabla", "estado-calculo"):
+        pagina = 0
+    orden = orden[0] if orden else {"column_id": "fecha", "direction": "desc"}
+    filtros = {"config": config, "estado": region, "ic_min": texto_ic(ic_min), "ic_max": texto_ic(ic_max)}
+    with etapa("historial_lectura"):
+        total, entradas = historial_sesiones.consultar(
+            sesion, **filtros, orden=orden["column_id"], descendente=orden["direction"] == "desc",
+            numero=(pagina or 0) + 1, tamano=FILAS_POR_PAGINA
+        )
+    filtrado = any(v is not None for v in filtros.values())
+    if not total:
+        if filtrado:
+            return html.Div("Ningún cálculo cumple el filtro."), [], 1, 0, {"display": "block"}
+        return html.Div("No hay cálculos previos."), [], 1, 0, {"display": "none"}
+    paginas = -(-total // FILAS_POR_PAGINA)
+    titulo = html.H5(f"Historial de cálculos ({total})", style={"color": "#00bfff"})
+    return titulo, [fila_historial(h) for h in entradas], paginas, min(pagina or 0, paginas - 1), {"display": "block"}
+
+def texto_campo(nombre, valor):
+    # Texto para el formulario que vuelve a interpretarse como el mismo valor
+    if nombre in ("Rc", "Rb", "Re"):
+        texto = formatear_resistencia(valor)
+        if interpretar_valor(texto) == valor:
+            return texto
+    return f"{valor:.12g}"
+
+@callback(
+    Output("estado-calculo", "data", allow_duplicate=True),
+    Output("descarga-word", "style", allow_duplicate=True),
+    Output("descarga-pdf", "style", allow_duplicate=True),
+    Output("validacion-campos", "children", allow_duplicate=True),
+    Output("config", "value"),
+    *[Output(campo, "value", allow_duplicate=True) for campo in PARAMETROS],
+    Output("tabs", "value"),
+    Output("historial-tabla", "active_cell"),
+    Input("historial-tabla", "active_cell"),
+    State("sesion", "data"),
+    prevent_initial_call=True
+)
+def cargar_del_historial(celda, sesion):
+    # Un clic en "Cargar" vuelve a poner el circuito en el formulario con su punto
+    # de operación guardado, sin resolverlo de nuevo
+    if not celda or celda.get("column_id") != "cargar":
+        raise PreventUpdate
+    with etapa("historial_lectura"):
+        entrada = historial_sesiones.entrada(sesion, celda.get("row_id"))
+    if not entrada:
+        raise PreventUpdate
+    valores = {p: entrada[p] for p in PARAMETROS}
+    defecto = entrada["defecto"]
+    punto = entrada["punto"] or calcular_efectivo(entrada["config"], valores, defecto)[2].a_json()
+    estado = {
+        "calculado": True,
+        "errores": [],
+        "config": entrada["config"],
+        "valores": valores,
+        "defecto": defecto,
+        "punto": punto
+    }
+    # Los campos que tomaron el valor típico quedan vacíos, como al calcular
+    campos = ["" if p in defecto else texto_campo(p, valores[p]) for p in PARAMETROS]
+    visible = {"display": "inline-block"}
+    return estado, visible, visible, None, entrada["config"], *campos, "tab1", None
+
+@callback(
+    Output("archivo-word", "data"),
+    Input("descarga-word", "n_clicks"),
+    State("estado-calculo", "data"),
+    prevent_initial_call=True
+)
+def descargar_word(n, estado):
+    if not estado or not estado.get("calculado"):
+        raise PreventUpdate
+    contenido = reporte_circuito("docx", estado["config"], estado["valores"], estado["defecto"])
+    return dcc.send_bytes(contenido, "resultado.docx")
+
+@callback(
+    Output("archivo-pdf", "data"),
+    Input("descarga-pdf", "n_clicks"),
+    State("estado-calculo", "data"),
+    prevent_initial_call=True
+)
+def descargar_pdf(n, estado):
+    if not estado or not estado.get("calculado"):
+        raise PreventUpdate
+    contenido = reporte_circuito("pdf", estado["config"], estado["valores"], estado["defecto"])
+    return dcc.send_bytes(contenido, "resultado.pdf")
+
+# ----- Trabajos en segundo plano -----
+#
+# Monte Carlo, barridos del historial, archivos masivos y reportes corren en
+# gestor_trabajos (trabajos.py). El callback que los inicia solo guarda el id en
+# {prefijo}-trabajo; el sondeo de abajo muestra el avance y, al terminar, el resultado.
+
+def texto_avance(estado):
+    # (porcentaje, etiqueta); sin total conocido la barra queda llena y solo cuenta
+    hechos, total = estado.get("hechos") or 0, estado.get("total")
+    if total:
+        porcentaje = round(100 * hechos / max(total, 1))
+        return porcentaje, f"{porcentaje}%"
+    return 100, f"{hechos:,}"
+
+def registrar_sondeo(prefijo, salidas, mostrar, conservar=True):
+    # salidas: pares (id, propiedad) que llena mostrar(trabajo, resultado) cuando el
+    # trabajo termina bien. Con conservar=False el id se borra después de mostrar
+    # (descargas que no deben repetirse al recargar la página).
+    oculto = {"display": "none"}
+
+    @callback(
+        Output(f"{prefijo}-progreso", "value"),
+        Output(f"{prefijo}-progreso", "label"),
+        Output(f"{prefijo}-progreso", "style"),
+        Output(f"{prefijo}-cancelar", "style"),
+        Output(f"{prefijo}-intervalo", "disabled"),
+        Output(f"{prefijo}-mensaje", "children", allow_duplicate=True),
+        Output(f"{prefijo}-trabajo", "data", allow_duplicate=True),
+        *[Output(id_, propiedad, allow_duplicate=True) for id_, propiedad in salidas],
+        Input(f"{prefijo}-intervalo", "n_intervals"),
+        Input(f"{prefijo}-trabajo", "data"),
+        prevent_initial_call="initial_duplicate"
+    )
+    def sondear(n, trabajo):
+        sin_cambios = [dash.no_update] * len(salidas)
+        estado = gestor_trabajos.estado(trabajo["id"]) if trabajo else None
+        if estado is None:
+            # Sin trabajo, o ya borrado por gestor_trabajos.limpiar()
+            return 0, "", oculto, oculto, True, dash.no_update, None if trabajo else dash.no_update, *sin_cambios
+        if estado["estado"] not in TERMINADOS:
+            porcentaje, etiqueta = texto_avance(estado)
+            mensaje = ("Cancelando..." if estado.get("cancelando")
+                       else "En cola..." if estado["estado"] == PENDIENTE else "Procesando...")
+            return (porcentaje, etiqueta, {"display": "flex"}, {"display": "inline-block"}, False,
+                    mensaje, dash.no_update, *sin_cambios)
+        if estado["estado"] == LISTO:
+            return (100, "", oculto, oculto, True, "", dash.no_update if conservar else None,
+                    *mostrar(trabajo, estado["resultado"]))
+        mensaje = estado["mensaje"] if estado["estado"] == CANCELADO else html.Span(
+            f"Error: {estado['mensaje']}", style={"color": "#ff5555"}
+        )
+        return 0, "", oculto, oculto, True, mensaje, None, *sin_cambios
+
+    @callback(
+        Output(f"{prefijo}-mensaje", "children", allow_duplicate=True),
+        Input(f"{prefijo}-cancelar", "n_clicks"),
+        State(f"{prefijo}-trabajo", "data"),
+        prevent_initial_call=True
+    )
+    def cancelar(n, trabajo):
+        if not trabajo:
+            raise PreventUpdate
+        gestor_trabajos.cancelar(trabajo["id"])
+        return "Cancelando..."
+
+# ----- Diseño inverso -----
+
+@callback(
+    Output("diseno-resultados", "children"),
+    Output("diseno-candidatos", "data"),
+    Input("btn-diseno", "n_clicks"),
+    State("diseno-ic", "value"),
+    State("diseno-vce", "value"),
+    State("diseno-serie", "value"),
+    State("diseno-tolerancia", "value"),
+    State("config", "value"),
+    State("Vcc", "value"), State("β", "value"), State("Vbe", "value"),
+    prevent_initial_call=True
+)
+def buscar_diseno(n, Ic_txt, Vce_txt, serie, tolerancia, config, Vcc, beta, Vbe):
+    valores, _ = obtener_valores_efectivos(Vcc, None, None, None, beta, Vbe)
+    try:
+        Ic_obj, Vce_obj = interpretar_valor(Ic_txt), interpretar_valor(Vce_txt)
+        if Ic_obj is None or Vce_obj is None:
+            raise ValueError("Indica Ic y Vce objetivo")
+        inicio = time.perf_counter()
+        with etapa("diseno"):
+            candidatos = disenar(
+                config, valores["Vcc"], valores["β"], valores["Vbe"], Ic_obj, Vce_obj, serie, tolerancia or 0.0
+            )
+        transcurrido = time.perf_counter() - inicio
+    except ValueError as e:
+        return html.Div(str(e), style={"color": "#ff5555"}), None
+    if not candidatos:
+        return html.Div("Ninguna combinación deja el transistor en la región activa."), None
+
+    resistencia = lambda v: "—" if v is None else f"{formatear_resistencia(v)}Ω"
+    tabla = html.Table([
+        html.Thead(html.Tr([html.Th(c) for c in ("Rb", "Rc", "Re", "Ic", "Vce", "Error", "Margen a saturación", "")])),
+        html.Tbody([
+            html.Tr([
+                html.Td(resistencia(c["Rb"])), html.Td(resistencia(c["Rc"])), html.Td(resistencia(c["Re"])),
+                html.Td(formatear_valor(c["Ic"])), html.Td(f"{c['Vce']:.2f} V"),
+                html.Td(f"{c['error']:.2%}"), html.Td(f"{c['margen']:.2f} V"),
+                html.Td(dbc.Button("Usar", id={"type": "usar-diseno", "indice": i}, size="sm", color="secondary"))
+            ]) for i, c in enumerate(candidatos)
+        ])
+    ], className="table table-dark table-striped soft-box")
+    return html.Div([
+        html.P(f"{config}, serie {serie}: búsqueda en {transcurrido * 1e3:.0f} ms", className="text-muted"),
+        tabla
+    ]), candidatos
+
+@callback(
+    Output("Rb", "value"),
+    Output("Rc", "value"),
+    Output("Re", "value"),
+    Input({"type": "usar-diseno", "indice": ALL}, "n_clicks"),
+    State("diseno-candidatos", "data"),
+    prevent_initial_call=True
+)
+def usar_diseno(clics, candidatos):
+    # Los botones se crean con n_clicks=None; solo cuenta un clic real
+    if not candidatos or not ctx.triggered_id or not ctx.triggered[0]["value"]:
+        raise PreventUpdate
+    elegido = candidatos[ctx.triggered_id["indice"]]
+    return tuple(
+        dash.no_update if elegido[p] is None else formatear_resistencia(elegido[p])
+        for p in ("Rb", "Rc", "Re")
+    )
 
-    # Tabla de ejemplos
-    tabla_ejemplo = html.Table([
-        html.Thead(html.Tr([html.Th("Parámetro"), html.Th("Ejemplo")])) ,
+# ----- Barrido de temperatura -----
+
+# Filas del historial (las más recientes) que entran en un barrido
+LIMITE_BARRIDO_HISTORIAL = 20_000
+CURVAS_HISTORIAL = 20
+
+def texto_limites(T_baja, T_alta):
+    partes = []
+    if np.isfinite(T_alta):
+        partes.append(f"sale de ACTIVA al calentarse a {T_alta:.1f} °C")
+    if np.isfinite(T_baja):
+        partes.append(f"sale de ACTIVA al enfriarse a {T_baja:.1f} °C")
+    return "; ".join(partes) or "permanece en ACTIVA en todo el rango"
+
+def figuras_temperatura(T, res, nombres, T_baja=None, T_alta=None):
+    import plotly.graph_objects as go
+    figuras = []
+    for clave, titulo, eje in (("Ic", "Ic vs temperatura", "IC (A)"), ("Vce", "Vce vs temperatura", "VCE (V)")):
+        fig = go.Figure()
+        for fila, nombre in enumerate(nombres):
+            fig.add_trace(go.Scatter(x=T, y=res[clave][fila].astype(np.float32), mode="lines", name=nombre))
+        if clave == "Vce":
+            fig.add_hline(y=VCE_SAT, line_dash="dash", line_color="orange")
+        for limite in (T_baja, T_alta):
+            if limite is not None and np.isfinite(limite):
+                fig.add_vline(x=limite, line_dash="dot", line_color="#ff5555")
+        fig.update_layout(title=titulo, xaxis_title="T (°C)", yaxis_title=eje, template="plotly_dark",
+                          showlegend=len(nombres) > 1)
+        figuras.append(dcc.Graph(figure=fig))
+    return figuras
+
+@callback(
+    Output("temp-resultados", "children"),
+    Output("temp-trabajo", "data"),
+    Input("btn-temp", "n_clicks"),
+    State("temp-alcance", "value"),
+    State("temp-min", "value"),
+    State("temp-max", "value"),
+    State("temp-paso", "value"),
+    State("estado-calculo", "data"),
+    State("sesion", "data"),
+    prevent_initial_call=True
+)
+def barrer_temperatura(n, alcance, t_min, t_max, paso, estado, sesion):
+    t_min = T_MIN if t_min is None else float(t_min)
+    t_max = T_MAX if t_max is None else float(t_max)
+    paso = max(float(paso or PASO_T), 0.01)
+    # β ∝ T^1.5 en kelvin: por debajo del cero absoluto no tiene sentido
+    t_min = max(t_min, CERO_ABSOLUTO + paso)
+    if not (t_min < t_max < np.inf):
+        return html.Div("La temperatura máxima debe superar a la mínima.", style={"color": "#ff5555"}), None
+    if not t_min <= T_REFERENCIA <= t_max:
+        # Los límites de ACTIVA se miden desde la temperatura de los valores del formulario
+        return html.Div(f"El rango debe incluir {T_REFERENCIA:g} °C, la temperatura a la que valen β y Vbe.",
+                        style={"color": "#ff5555"}), None
+    puntos = numero_temperaturas(t_min, t_max, paso)
+    if puntos > MAX_TEMPERATURAS:
+        return html.Div(f"El barrido tendría {puntos:,} temperaturas; el máximo es {MAX_TEMPERATURAS:,}. "
+                        "Aumenta el paso o reduce el rango.", style={"color": "#ff5555"}), None
+    T = temperaturas(t_min, t_max, paso)
+    inicio = time.perf_counter()
+
+    if alcance != "historial":
+        # Un solo circuito tarda milisegundos: se resuelve en el mismo callback
+        vacio = contenido_sin_calculo(estado)
+        if vacio is not None:
+            return vacio or html.Div("Primero realiza un cálculo con el botón Calcular."), None
+        with etapa("temperatura"):
+            res = barrido_temperatura([estado["config"]], estado["valores"], T)
+            T_baja, T_alta, activa_ref = limites_activa(res["estado"], T)
+        transcurrido = time.perf_counter() - inicio
+        resumen = (texto_limites(T_baja[0], T_alta[0]) if activa_ref[0]
+                   else f"no está en ACTIVA a {T_REFERENCIA:g} °C")
+        return html.Div([
+            html.H5(f"{estado['config']}: {resumen}", style={"color": "#00bfff"}),
+            html.P(f"{len(T):,} temperaturas resueltas en {transcurrido * 1e3:.0f} ms", className="text-muted"),
+            *figuras_temperatura(T, res, [estado["config"]], T_baja[0], T_alta[0])
+        ]), None
+
+    with etapa("historial_lectura"):
+        configs, columnas = historial_sesiones.columnas(sesion, limite=LIMITE_BARRIDO_HISTORIAL)
+    if not configs:
+        return html.Div("No hay cálculos previos."), None
+    # Entradas antiguas pueden no tener todos los campos
+    valores = {p: [VALORES_DEFECTO[p] if x is None else x for x in columnas[p]] for p in PARAMETROS}
+    argumentos = (configs, valores, t_min, t_max, paso)
+    id_trabajo = gestor_trabajos.enviar(
+        "temperatura", tarea_temperatura_historial, *argumentos,
+        clave=GestorTrabajos.clave("temperatura", *argumentos), total=len(configs)
+    )
+    return None, {"id": id_trabajo, "t_min": t_min, "t_max": t_max, "paso": paso}
+
+def resultados_temperatura(trabajo, resultado):
+    T = temperaturas(trabajo["t_min"], trabajo["t_max"], trabajo["paso"])
+    with np.load(gestor_trabajos.ruta(trabajo["id"], "temperatura.npz")) as datos:
+        configs = datos["configs"].tolist()
+        valores = {p: datos[f"valor_{i}"] for i, p in enumerate(PARAMETROS)}
+        T_baja, T_alta, activa_ref = datos["T_baja"], datos["T_alta"], datos["activa_ref"]
+    # Las curvas completas solo de los más recientes: son pocas filas y se resuelven aquí
+    muestra = slice(0, CURVAS_HISTORIAL)
+    with etapa("temperatura"):
+        res = barrido_temperatura(configs[muestra], {p: valores[p][muestra] for p in PARAMETROS}, T)
+
+    salen = np.flatnonzero(np.isfinite(T_alta) | np.isfinite(T_baja))
+    n_salen = len(salen)
+    # Primero los que salen a menor temperatura al calentarse (riesgo de embalamiento)
+    salen = salen[np.argsort(np.where(np.isfinite(T_alta[salen]), T_alta[salen], np.inf))][:25]
+    tabla = html.Table([
+        html.Thead(html.Tr([html.Th(c) for c in ("Config", "Vcc", "Rc", "Rb", "Re", "β", "Vbe", "Sale al calentar", "Sale al enfriar")])),
         html.Tbody([
-            html.Tr([html.Td("Vcc"), html.Td("12 V")]),
-            html.Tr([html.Td("Rc"), html.Td("1 kΩ")]),
-            html.Tr([html.Td("Rb"), html.Td("100 kΩ")]),
-            html.Tr([html.Td("Re"), html.Td("1 kΩ")]),
-            html.Tr([html.Td("β"), html.Td("100")]),
-            html.Tr([html.Td("Vbe"), html.Td("0.7 V")]),
+            html.Tr([
+                html.Td(configs[i]), *[html.Td(f"{valores[p][i]:g}") for p in PARAMETROS],
+                html.Td("—" if np.isnan(T_alta[i]) else f"{T_alta[i]:.1f} °C"),
+                html.Td("—" if np.isnan(T_baja[i]) else f"{T_baja[i]:.1f} °C")
+            ]) for i in salen
         ])
-    ], className="table table-bordered table-info soft-box")
+    ], className="table table-dark table-striped soft-box")
+    return [html.Div([
+        html.H5(
+            f"{n_salen:,} de {int(activa_ref.sum()):,} "
+            f"circuitos en ACTIVA a {T_REFERENCIA:g} °C salen de ella entre {trabajo['t_min']:g} y {trabajo['t_max']:g} °C",
+            style={"color": "#00bfff"}
+        ),
+        html.P(f"{len(configs):,} circuitos × {len(T):,} temperaturas en {resultado['segundos'] * 1e3:.0f} ms",
+               className="text-muted"),
+        tabla if n_salen else None,
+        html.P(f"Curvas de los {min(len(configs), CURVAS_HISTORIAL)} cálculos más recientes", className="text-muted mt-2"),
+        *figuras_temperatura(T, res, [f"{i + 1}. {c}" for i, c in enumerate(configs[muestra])])
+    ])]
+
+registrar_sondeo("temp", [("temp-resultados", "children")], resultados_temperatura)
+
+# ----- Reportes de varios circuitos -----
+
+@callback(
+    Output("reporte-trabajo", "data"),
+    Output("reporte-mensaje", "children"),
+    Input("btn-reporte-word", "n_clicks"),
+    Input("btn-reporte-pdf", "n_clicks"),
+    State("reporte-cantidad", "value"),
+    State("historial-config", "value"),
+    State("sesion", "data"),
+    prevent_initial_call=True
+)
+def iniciar_reporte(n_word, n_pdf, cantidad, config, sesion):
+    formato = "pdf" if ctx.triggered_id == "btn-reporte-pdf" else "docx"
+    entradas = historial_sesiones.pagina(sesion, 1, int(cantidad or 10), config)
+    if not entradas:
+        return None, "No hay cálculos en el historial para el reporte."
+    # Las entradas del historial ya guardan los valores efectivos y cuáles se asumieron
+    circuitos = [
+        {"config": e["config"], **{p: e[p] for p in PARAMETROS}, "asumidos": e["defecto"]} for e in reversed(entradas)
+    ]
+    id_trabajo = gestor_trabajos.enviar(
+        "reporte", tarea_reporte, formato, circuitos,
+        clave=GestorTrabajos.clave("reporte", formato, circuitos), total=len(circuitos)
+    )
+    return {"id": id_trabajo, "formato": formato}, ""
 
+def entregar_reporte(trabajo, resultado):
+    nombre = f"reporte_{resultado['circuitos']}_circuitos.{trabajo['formato']}"
+    return [dcc.send_file(gestor_trabajos.ruta(trabajo["id"], resultado["archivo"]), filename=nombre)]
 
+# La descarga se entrega una sola vez: al recargar la página no se repite
+registrar_sondeo("reporte", [("reporte-descarga", "data")], entregar_reporte, conservar=False)
 
-    # Mostrar resultados en tiempo real: si hay errores, no mostrar resultados
-    if any(errores):
-        return validacion, "", {"display": "none"}, "", {"display": "none"}, validacion
+def estadisticas_cache():
+    return {
+        "calculos": cache_calculos.estadisticas(),
+        "reportes": cache_reportes.estadisticas(),
+        "historial_sesiones": historial_sesiones.cache.estadisticas()
+    }
 
-    # Si no se ha hecho cálculo y no hay cambios, limpiar todo
-    if not n and ctx.triggered_id != "btn-calc":
-        return "", "", {"display": "none"}, "", {"display": "none"}, None
+def ruta_estadisticas_cache():
+    return estadisticas_cache()
+
+@callback(
+    Output("mc-resultados", "children"),
+    Output("mc-trabajo", "data"),
+    Input("btn-mc", "n_clicks"),
+    State("mc-tolerancia", "value"),
+    State("mc-beta", "value"),
+    State("mc-vbe", "value"),
+    State("mc-muestras", "value"),
+    State("estado-calculo", "data"),
+    prevent_initial_call=True
+)
+def simular_montecarlo(n, tolerancia, disp_beta, disp_vbe, muestras, estado):
+    vacio = contenido_sin_calculo(estado)
+    if vacio is not None:
+        return vacio or html.Div("Primero realiza un cálculo con el botón Calcular."), None
+    argumentos = (
+        estado["config"], estado["valores"], int(muestras), tolerancia,
+        (disp_beta or 0) / 100, (disp_vbe or 0) / 1000
+    )
+    id_trabajo = gestor_trabajos.enviar(
+        "montecarlo", tarea_montecarlo, *argumentos,
+        clave=GestorTrabajos.clave("montecarlo", *argumentos), total=int(muestras)
+    )
+    return None, {"id": id_trabajo}
 
+def resultados_montecarlo(trabajo, resultado):
+    conteos = np.asarray(resultado["conteos"])
+    rendimiento = conteos[0] / conteos.sum()
 
-    # Si hay valores faltantes, mostrar tabla de faltantes en el área de resultados (derecha)
+    resumen = html.Table([
+        html.Thead(html.Tr([html.Th("Estado"), html.Th("Muestras"), html.Th("Fracción")])),
+        html.Tbody([
+            html.Tr([html.Td(estado), html.Td(f"{c:,}"), html.Td(f"{c / conteos.sum():.2%}")])
+            for estado, c in zip(ESTADOS, conteos)
+        ])
+    ], className="table table-dark table-striped soft-box")
 
-    # Detectar si el resultado es un mensaje de faltantes
-    if isinstance(resultados, html.Div) and "Valores faltantes" in str(resultados):
-        faltantes = str(resultados.children).split(": ")[-1].replace("⚠️ Valores faltantes: ", "").replace(")',)", "").replace("')", "").split(", ")
-        tabla_faltantes = html.Table([
-            html.Thead(html.Tr([html.Th("Parámetro faltante")])) ,
-            html.Tbody([
-                html.Tr([html.Td(f)]) for f in faltantes if f and f != "{}"
-            ])
-        ], className="table table-bordered table-warning soft-box")
-        return tabla_faltantes, "", {"display": "none"}, "", {"display": "none"}, None
+    histogramas = resultado["histogramas"]
+    return [html.Div([
+        html.H4(f"Rendimiento (ACTIVA): {rendimiento:.2%}", style={"color": "#00bfff"}),
+        html.P(f"{resultado['n']:,} muestras resueltas en {resultado['segundos'] * 1e3:.0f} ms", className="text-muted"),
+        resumen,
+        dcc.Graph(figure=histograma_figura(**histogramas["Ic"], titulo="Distribución de Ic", eje_x="IC (A)")),
+        dcc.Graph(figure=histograma_figura(**histogramas["Vce"], titulo="Distribución de Vce", eje_x="VCE (V)", limite=VCE_SAT))
+    ])]
+
+registrar_sondeo("mc", [("mc-resultados", "children")], resultados_montecarlo)
+
+@callback(
+    Output("lote-resumen", "children"),
+    Output("lote-descargar", "style"),
+    Output("lote-trabajo", "data"),
+    Input("lote-archivo", "contents"),
+    State("lote-archivo", "filename"),
+    State("config", "value"),
+    prevent_initial_call=True
+)
+def resolver_archivo(contenido, nombre, config):
+    if not contenido:
+        raise PreventUpdate
+    datos = base64.b64decode(contenido.split(",", 1)[1])
+    config = config or "Emisor común"
+    # El mismo archivo con la misma configuración reutiliza el resultado anterior
+    id_trabajo, nuevo = gestor_trabajos.crear("lote", GestorTrabajos.clave("lote", nombre, config, datos))
+    if nuevo:
+        with open(gestor_trabajos.ruta(id_trabajo, "entrada"), "wb") as f:
+            f.write(datos)
+        gestor_trabajos.lanzar(id_trabajo, tarea_lote, nombre, config)
+    return None, {"display": "none"}, {"id": id_trabajo, "nombre": nombre}
+
+def resultados_lote(trabajo, resumen):
+    return html.Div([
+        html.H5(f"{resumen['filas']:,} circuitos resueltos en {resumen['segundos']:.1f} s", style={"color": "#00bfff"}),
+        tabla_resumen_lote(resumen)
+    ]), {"display": "inline-block"}
+
+registrar_sondeo("lote", [("lote-resumen", "children"), ("lote-descargar", "style")], resultados_lote)
+
+def tabla_resumen_lote(resumen):
+    filas = [html.Tr([html.Td(estado), html.Td(f"{c:,}")]) for estado, c in resumen["conteos"].items()]
+    if resumen["config_desconocida"]:
+        filas.append(html.Tr([html.Td("Configuración desconocida"), html.Td(f"{resumen['config_desconocida']:,}")]))
+    if resumen["filas"] and np.isfinite(resumen["Ic_min"]):
+        filas.append(html.Tr([html.Td("Ic (mín – máx)"), html.Td(f"{formatear_valor(resumen['Ic_min'])} – {formatear_valor(resumen['Ic_max'])}")]))
+        filas.append(html.Tr([html.Td("Vce (mín – máx)"), html.Td(f"{resumen['Vce_min']:.2f} V – {resumen['Vce_max']:.2f} V")]))
+    return html.Table([
+        html.Thead(html.Tr([html.Th("Estado"), html.Th("Circuitos")])),
+        html.Tbody(filas)
+    ], className="table table-dark table-striped soft-box")
 
+@callback(
+    Output("lote-descarga", "data"),
+    Input("lote-descargar", "n_clicks"),
+    State("lote-trabajo", "data"),
+    prevent_initial_call=True
+)
+def descargar_lote(n, trabajo):
+    if not trabajo:
+        raise PreventUpdate
+    ruta = gestor_trabajos.ruta(trabajo["id"], "resultado.csv")
+    if not os.path.exists(ruta):
+        raise PreventUpdate
+    base = os.path.splitext(trabajo["nombre"])[0]
+    return dcc.send_file(ruta, filename=f"resultados_{base}.csv")
 
-    if tab == "tab1":
-        # Mejora visual: caja con sombra, separación, íconos
-        return html.Div([
-            html.Div([
-                html.H4("Resultados del análisis", style={"color": "#00bfff", "marginBottom": "10px"}),
-                resultados
-            ], className="soft-box", style={"background": "rgba(0,191,255,0.07)", "border": "1.5px solid #00bfff", "boxShadow": "0 2px 12px #00bfff33"})
-        ]), href_word, {"display": "inline-block"}, "", {"display": "none"}, None
-    elif tab == "tab2":
-        return dcc.Graph(figure=grafico), href_word, {"display": "inline-block"}, "", {"display": "none"}, None
-    elif tab == "tab3":
-        try:
-            Vce_range = np.linspace(0, valores_efectivos["Vcc"], 100)
-            divisor = valores_efectivos["Rb"] + (valores_efectivos["β"]+1)*valores_efectivos["Re"]
-            Ib = (valores_efectivos["Vcc"] - valores_efectivos["Vbe"]) / divisor
-            Ic_curva = [valores_efectivos["β"] * Ib for _ in Vce_range]
-            fig_curvas = go.Figure()
-            fig_curvas.add_trace(go.Scatter(x=Vce_range, y=Ic_curva, mode='lines', name='Curva IC vs VCE'))
-            fig_curvas.update_layout(title="Curva Dinámica IC vs VCE", xaxis_title="VCE (V)", yaxis_title="IC (A)", template="plotly_dark")
-            return dcc.Graph(figure=fig_curvas), href_word, {"display": "inline-block"}, "", {"display": "none"}, None
-        except:
-            return html.Div("Error al calcular curva dinámica. Revisa los valores."), href_word, {"display": "inline-block"}, "", {"display": "none"}, None
-    elif tab == "tab4":
-        if not historial:
-            return html.Div("No hay cálculos previos."), href_word, {"display": "inline-block"}, "", {"display": "none"}, None
-        # Mejora visual: tabla con colores y separación
-        tabla_hist = html.Table([
-            html.Thead(html.Tr([
-                html.Th("Config"), html.Th("Vcc"), html.Th("Rc"), html.Th("Rb"), html.Th("Re"), html.Th("β"), html.Th("Vbe")
-            ])),
-            html.Tbody([
-                html.Tr([
-                    html.Td(h["config"]), html.Td(h["Vcc"]), html.Td(h["Rc"]), html.Td(h["Rb"]), html.Td(h["Re"]), html.Td(h["β"]), html.Td(h["Vbe"])
-                ], style={"background": "#23233a" if i%2 else "#1e1e2f"}) for i, h in enumerate(historial)
-            ])
-        ], className="table table-bordered table-info soft-box", style={"boxShadow": "0 2px 8px #00bfff33", "marginTop": "10px"})
-        return html.Div([
-            html.H5("Historial de cálculos", style={"color": "#00bfff"}),
-            tabla_hist
-        ]), href_word, {"display": "inline-block"}, "", {"display": "none"}, None
+def ruta_salud():
+    # Comprobación de vida para el balanceador: no toca el historial ni las cachés
+    return {"estado": "ok", "pid": os.getpid()}
 
-    # (Eliminado retorno extra de tabla_ejemplo para mantener 6 valores)
-    # Si quieres mostrar la tabla de ejemplo, inclúyela en el campo de validación o en contenido_tab, pero no como valor extra.
+# ----- Aplicación -----
 
-    resultados, grafico, resultados_dict = calcular_y_graficar(config, Vcc, Rc, Rb, Re, beta, Vbe)
-    href_word = exportar_a_word(resultados_dict)
+app = dash.Dash(
+    __name__,
+    external_stylesheets=[dbc.themes.SLATE],
+    title="Analizador BJT - Transistores",
+    index_string=INDICE_HTML,
+    # Respuestas comprimidas con gzip/brotli (flask-compress)
+    compress=True
+)
+app.layout = disposicion()
+# Punto de entrada WSGI para producción: gunicorn -c gunicorn.conf.py app:server
+server = app.server
+registrar_api(server)
+# Tiempos por etapa, tamaños de respuesta y cachés en /metrics (formato Prometheus)
+metricas.instalar(server)
+gestor_trabajos.limpiar()
+server.add_url_rule("/estadisticas/cache", view_func=ruta_estadisticas_cache)
+server.add_url_rule("/salud", view_func=ruta_salud)
 
-    if tab == "tab1":
-        return resultados, href_word, {"display": "inline-block"}, None
-    elif tab == "tab2":
-        return dcc.Graph(figure=grafico), href_word, {"display": "inline-block"}, None
-    elif tab == "tab3":
-        try:
-            Vce_range = np.linspace(0, interpretar_valor(Vcc), 100)
-            divisor = interpretar_valor(Rb) + (float(beta)+1)*interpretar_valor(Re)
-            Ib = (interpretar_valor(Vcc) - interpretar_valor(Vbe)) / divisor
-            Ic_curva = [float(beta) * Ib for _ in Vce_range]
-            fig_curvas = go.Figure()
-            fig_curvas.add_trace(go.Scatter(x=Vce_range, y=Ic_curva, mode='lines', name='Curva IC vs VCE'))
-            fig_curvas.update_layout(title="Curva Dinámica IC vs VCE", xaxis_title="VCE (V)", yaxis_title="IC (A)", template="plotly_dark")
-            return dcc.Graph(figure=fig_curvas), href_word, {"display": "inline-block"}, None
-        except:
-            return html.Div("Error al calcular curva dinámica. Revisa los valores."), href_word, {"display": "inline-block"}, None
 if __name__ == "__main__":
+    # Servidor de desarrollo; en producción se usa gunicorn (ver gunicorn.conf.py)
     port = int(os.environ.get("PORT", 8050))  # Usa el puerto de Render o 8050 por defecto
-    app.run(host="0.0.0.0", port=port, debug=True)
+    app.run(host="0.0.0.0", port=port, debug=os.environ.get("DASH_DEBUG") == "1")
 
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# ----- Reporte de tiempo de arranque -----
+#
+# python arranque.py              importa app en un proceso limpio con -X importtime
+# python arranque.py --top 25     y muestra el costo de importación por paquete
+# python arranque.py --modulo nucleo --json
+#
+# El tiempo de cada módulo se suma a su paquete de primer nivel (pandas.core.frame
+# cuenta para pandas). Además se avisa si alguna dependencia que debería cargarse
+# al primer uso (reportes, tablas, gráficos) se importó al arrancar.
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# Solo deben cargarse cuando se usan por primera vez
+PEREZOSAS = ("pandas", "docx", "fpdf", "openpyxl", "plotly.graph_objs")
+
+_LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def medir_importacion(modulo):
+    # Devuelve (segundos de pared, [(módulo, propio µs, acumulado µs, profundidad)])
+    inicio = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ, capture_output=True, text=True
+    )
+    pared = time.perf_counter() - inicio
+    if proceso.returncode:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    modulos = []
+    for linea in proceso.stderr.splitlines():
+        m = _LINEA.match(linea)
+        if m:
+            propio, acumulado, sangria, nombre = m.groups()
+            modulos.append((nombre, int(propio), int(acumulado), len(sangria) // 2))
+    return pared, modulos
+
+def por_paquete(modulos):
+    totales = defaultdict(int)
+    for nombre, propio, _, _ in modulos:
+        totales[nombre.split(".")[0]] += propio
+    return sorted(totales.items(), key=lambda t: t[1], reverse=True)
+
+def perezosas_cargadas(modulos):
+    cargados = {nombre for nombre, *_ in modulos}
+    return [p for p in PEREZOSAS if p in cargados]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo de importación por dependencia")
+    parser.add_argument("--modulo", default="app", help="módulo a importar (por defecto app)")
+    parser.add_argument("--top", type=int, default=15, help="paquetes a mostrar")
+    parser.add_argument("--json", action="store_true", help="salida en JSON")
+    args = parser.parse_args(argv)
+
+    pared, modulos = medir_importacion(args.modulo)
+    paquetes = por_paquete(modulos)
+    total = sum(t for _, t in paquetes)
+    cargadas = perezosas_cargadas(modulos)
+
+    if args.json:
+        print(json.dumps({
+            "modulo": args.modulo,
+            "pared_s": round(pared, 3),
+            "importacion_s": round(total / 1e6, 3),
+            "paquetes": {nombre: round(t / 1e6, 4) for nombre, t in paquetes[:args.top]},
+            "perezosas_cargadas": cargadas
+        }, indent=2))
+        return 0
+
+    print(f"import {args.modulo}: {total / 1e3:.0f} ms importando, {pared * 1e3:.0f} ms de pared (incluye el intérprete)")
+    print(f"{'paquete':28} {'ms':>9} {'%':>6}")
+    for nombre, t in paquetes[:args.top]:
+        print(f"{nombre:28} {t / 1e3:9.1f} {t / total:6.1%}")
+    if cargadas:
+        print("Aviso: se importan al arrancar y deberían cargarse al primer uso: " + ", ".join(cargadas))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
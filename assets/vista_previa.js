@@ -0,0 +1,82 @@
+// Vista previa en el navegador: mismas ecuaciones que nucleo.resolver_lote para un
+// solo circuito, sin ida y vuelta al servidor en cada tecla.
+(function () {
+    var PREFIJOS = {
+        E: 1e18, P: 1e15, T: 1e12, G: 1e9, M: 1e6, k: 1e3, K: 1e3,
+        h: 1e2, da: 1e1, d: 1e-1, c: 1e-2, m: 1e-3,
+        u: 1e-6, "µ": 1e-6, "μ": 1e-6, n: 1e-9, p: 1e-12, f: 1e-15, a: 1e-18
+    };
+    var NUMERO = "[+-]?(?:\\d+\\.?\\d*|\\.\\d+)(?:[eE][+-]?\\d+)?";
+    var PREFIJO = "da|[EPTGMkKhdcmuµμnpfa]";
+    var UNIDAD = "(?:V|A|W|Ω|[oO]hms?)?";
+    var VALOR = new RegExp("^\\s*(" + NUMERO + ")\\s*(" + PREFIJO + ")?\\s*" + UNIDAD + "\\s*$");
+    var RKM = new RegExp("^\\s*([+-]?\\d+)(" + PREFIJO + "|R)(\\d+)\\s*" + UNIDAD + "\\s*$");
+
+    // Igual que unidades.interpretar_valor: null si está vacío, NaN si no se reconoce
+    function interpretarValor(texto) {
+        if (texto === null || texto === undefined) return null;
+        texto = String(texto).trim();
+        if (!texto) return null;
+        var m = VALOR.exec(texto);
+        if (m) return parseFloat(m[1]) * (PREFIJOS[m[2]] || 1);
+        m = RKM.exec(texto);
+        if (m) return parseFloat(m[1] + "." + m[3]) * (PREFIJOS[m[2]] || 1);
+        return NaN;
+    }
+
+    function interpretarBeta(texto) {
+        if (texto === null || texto === undefined || !String(texto).trim()) return null;
+        var valor = Number(String(texto).trim());
+        return isFinite(valor) ? valor : NaN;
+    }
+
+    function formatearCorriente(valor) {
+        var a = Math.abs(valor);
+        if (a >= 1) return valor.toFixed(3) + " A";
+        if (a >= 1e-3) return (valor * 1e3).toFixed(3) + " mA";
+        if (a >= 1e-6) return (valor * 1e6).toFixed(3) + " µA";
+        return (valor * 1e9).toFixed(3) + " nA";
+    }
+
+    function resolver(config, v, vceSat) {
+        var Ib = 0, Ic = 0, Ie = 0;
+        if (config === "Base común") {
+            Ie = (v.Vcc - v.Vbe) / (v.Re + v.Rc);
+            Ic = (v["β"] / (v["β"] + 1)) * Ie;
+            Ib = Ie - Ic;
+        } else if (config === "Emisor común" || config === "Colector común") {
+            var divisor = (v.Rb || v.Re) ? v.Rb + (v["β"] + 1) * v.Re : 1;
+            Ib = (v.Vcc - v.Vbe) / divisor;
+            Ic = v["β"] * Ib;
+            Ie = config === "Colector común" ? (v["β"] + 1) * Ib : Ic + Ib;
+        }
+        var Ve = Ie * v.Re;
+        var Vc = config === "Colector común" ? v.Vcc : v.Vcc - Ic * v.Rc;
+        var Vce = Vc - Ve;
+        var estado = !(isFinite(Ic) && isFinite(Vce)) ? "INVÁLIDO" : Vce < vceSat ? "SATURACIÓN" : Ic > 0 ? "ACTIVA" : "CORTE";
+        return {Ic: Ic, Vce: Vce, estado: estado};
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        bjt: {
+            vista_previa: function (config, Vcc, Rc, Rb, Re, beta, Vbe, modelo) {
+                var campos = {Vcc: Vcc, Rc: Rc, Rb: Rb, Re: Re, "β": beta, Vbe: Vbe};
+                var valores = {};
+                for (var nombre in campos) {
+                    var valor = nombre === "β" ? interpretarBeta(campos[nombre]) : interpretarValor(campos[nombre]);
+                    if (Number.isNaN(valor)) return "Vista previa: " + nombre + " inválido";
+                    valores[nombre] = valor === null ? modelo.defecto[nombre] : valor;
+                }
+                var q = resolver(config, valores, modelo.vce_sat);
+                return "Vista previa · Ic ≈ " + formatearCorriente(q.Ic) +
+                    " · Vce ≈ " + q.Vce.toFixed(2) + " V · " + q.estado;
+            },
+            sesion: function (marca, actual) {
+                // Identificador del navegador (localStorage): se conserva al recargar o cerrar la pestaña
+                if (actual) return window.dash_clientside.no_update;
+                var bytes = crypto.getRandomValues(new Uint8Array(16));
+                return Array.from(bytes, function (b) { return b.toString(16).padStart(2, "0"); }).join("");
+            }
+        }
+    });
+})();
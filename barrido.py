@@ -0,0 +1,361 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from nucleo import (
+    CONFIGURACIONES, ESTADOS, PARAMETROS, VALORES_DEFECTO, codificar_config, conteo_estados,
+    muestrear_montecarlo, resolver_lote
+)
+from unidades import interpretar_valor
+
+# ----- Barridos en varios núcleos -----
+#
+# Para barridos que no caben en un núcleo (rejillas factoriales sobre los seis
+# parámetros, Monte Carlo de cientos de millones de muestras):
+#   - el espacio se parte en bloques de índices planos [inicio, fin)
+#   - cada bloque se resuelve con resolver_lote en un pool de procesos
+#   - las salidas por elemento, si se piden, se escriben en memoria compartida:
+#     ningún arreglo grande vuelve serializado al proceso principal
+#   - las reducciones (conteo por región, mín/máx, percentiles por histograma)
+#     se acumulan bloque a bloque, así que el resultado completo nunca está en RAM
+#
+# Cada bloque es independiente y lo único que viaja entre procesos es la
+# descripción del barrido y un acumulador de unos pocos KB, de modo que el
+# rendimiento crece casi linealmente con los núcleos mientras haya memoria de sobra.
+#
+# python barrido.py rejilla --Vcc 5:15:11 --Rb 10k:1M:400:log --Re 100:2.2k:50 --beta 50:300:26
+# python barrido.py montecarlo -n 200000000 --Rb 100k --tolerancia 0.05 --procesos 32
+
+# Elementos por bloque: ~15 temporales float64 por elemento en resolver_lote,
+# unos 30 MB por proceso
+TAMANO_BLOQUE = 250_000
+# Bloques en vuelo por proceso: uno corriendo y otro esperando en la cola
+VENTANA_POR_PROCESO = 2
+# Muestra previa que fija el rango de los histogramas de percentiles
+PILOTO = 100_000
+BINS_PERCENTIL = 8192
+PERCENTILES = (1, 5, 50, 95, 99)
+CAMPOS_REDUCIDOS = ("Ic", "Vce")
+TIPOS_SALIDA = {"estado": np.int8}
+
+
+class Rejilla:
+    # Producto cartesiano de las configuraciones y los valores de cada parámetro;
+    # los parámetros sin eje toman su valor típico. El índice plano recorre la
+    # rejilla en orden C con la configuración como primer eje.
+
+    def __init__(self, ejes, configs=CONFIGURACIONES):
+        self.configs = codificar_config(np.asarray(configs, dtype=object))
+        if (self.configs < 0).any():
+            raise ValueError(f"Configuración desconocida en {list(configs)}")
+        desconocidos = set(ejes) - set(PARAMETROS)
+        if desconocidos:
+            raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(desconocidos))}")
+        self.ejes = {
+            p: np.atleast_1d(np.asarray(ejes.get(p, VALORES_DEFECTO[p]), dtype=np.float64))
+            for p in PARAMETROS
+        }
+        self.forma = (len(self.configs), *(len(self.ejes[p]) for p in PARAMETROS))
+        self.total = int(np.prod(self.forma, dtype=np.int64))
+
+    def _resolver_indices(self, planos):
+        indices = np.unravel_index(planos, self.forma)
+        return resolver_lote(
+            self.configs[indices[0]],
+            *(self.ejes[p][i] for p, i in zip(PARAMETROS, indices[1:]))
+        )
+
+    def resolver(self, inicio, fin):
+        return self._resolver_indices(np.arange(inicio, fin))
+
+    def piloto(self, n):
+        # Puntos al azar de toda la rejilla: los primeros índices solo varían los últimos ejes
+        rng = np.random.default_rng(0)
+        return self._resolver_indices(rng.integers(0, self.total, min(n, self.total)))
+
+
+class MonteCarlo:
+    # Mismo modelo de tolerancias que nucleo.muestrear_montecarlo. La semilla de cada
+    # bloque se deriva de la semilla global y de su posición, así que el resultado no
+    # depende del número de procesos (sí del tamaño de bloque).
+
+    def __init__(self, config, valores_efectivos, n, tolerancia=0.05,
+                 dispersion_beta=0.20, dispersion_vbe=0.02, semilla=None):
+        if codificar_config(config) < 0:
+            raise ValueError(f"Configuración desconocida: {config}")
+        self.config = config
+        self.valores = {p: float(valores_efectivos[p]) for p in PARAMETROS}
+        self.total = int(n)
+        self.tolerancia = tolerancia
+        self.dispersion_beta = dispersion_beta
+        self.dispersion_vbe = dispersion_vbe
+        self.entropia = np.random.SeedSequence(semilla).entropy
+
+    def _muestrear(self, n, clave):
+        return muestrear_montecarlo(
+            self.config, self.valores, n, self.tolerancia, self.dispersion_beta, self.dispersion_vbe,
+            semilla=np.random.SeedSequence(self.entropia, spawn_key=clave)
+        )
+
+    def resolver(self, inicio, fin):
+        return self._muestrear(fin - inicio, (1, inicio))
+
+    def piloto(self, n):
+        return self._muestrear(min(n, self.total), (0,))
+
+
+class Acumulador:
+    # Reducciones que se pueden unir bloque a bloque. Los percentiles salen de un
+    # histograma de rango fijo (con cubetas de desborde a cada lado): su resolución
+    # es el ancho de una cubeta, (máx - mín del piloto) / BINS_PERCENTIL.
+
+    def __init__(self, rangos, bins=BINS_PERCENTIL):
+        self.rangos = rangos
+        self.bins = bins
+        self.n = 0
+        self.conteos = np.zeros(len(ESTADOS), dtype=np.int64)
+        self.no_finitos = dict.fromkeys(CAMPOS_REDUCIDOS, 0)
+        self.minimo = dict.fromkeys(CAMPOS_REDUCIDOS, np.inf)
+        self.maximo = dict.fromkeys(CAMPOS_REDUCIDOS, -np.inf)
+        # [por debajo, bins..., por encima]
+        self.histogramas = {c: np.zeros(bins + 2, dtype=np.int64) for c in CAMPOS_REDUCIDOS}
+
+    def agregar(self, res):
+        self.n += len(res["estado"])
+        self.conteos += conteo_estados(res["estado"])
+        for campo in CAMPOS_REDUCIDOS:
+            valores = res[campo]
+            finitos = valores[np.isfinite(valores)]
+            self.no_finitos[campo] += valores.size - finitos.size
+            if not finitos.size:
+                continue
+            self.minimo[campo] = min(self.minimo[campo], float(finitos.min()))
+            self.maximo[campo] = max(self.maximo[campo], float(finitos.max()))
+            bajo, alto = self.rangos[campo]
+            histograma = self.histogramas[campo]
+            histograma[0] += np.count_nonzero(finitos < bajo)
+            histograma[-1] += np.count_nonzero(finitos > alto)
+            histograma[1:-1] += np.histogram(finitos, bins=self.bins, range=(bajo, alto))[0]
+
+    def unir(self, otro):
+        self.n += otro.n
+        self.conteos += otro.conteos
+        for campo in CAMPOS_REDUCIDOS:
+            self.no_finitos[campo] += otro.no_finitos[campo]
+            self.minimo[campo] = min(self.minimo[campo], otro.minimo[campo])
+            self.maximo[campo] = max(self.maximo[campo], otro.maximo[campo])
+            self.histogramas[campo] += otro.histogramas[campo]
+
+    def percentil(self, campo, q):
+        histograma = self.histogramas[campo]
+        total = histograma.sum()
+        if not total:
+            return float("nan")
+        objetivo = q / 100 * total
+        acumulado = np.cumsum(histograma)
+        i = int(np.searchsorted(acumulado, objetivo))
+        # En las cubetas de desborde solo se sabe el extremo
+        if i == 0:
+            return self.minimo[campo]
+        if i == len(histograma) - 1:
+            return self.maximo[campo]
+        bajo, alto = self.rangos[campo]
+        ancho = (alto - bajo) / self.bins
+        previo = acumulado[i - 1]
+        fraccion = (objetivo - previo) / histograma[i] if histograma[i] else 0.0
+        return float(np.clip(bajo + (i - 1 + fraccion) * ancho, self.minimo[campo], self.maximo[campo]))
+
+    def resumen(self):
+        return {
+            "n": self.n,
+            "conteos": {estado: int(c) for estado, c in zip(ESTADOS, self.conteos)},
+            **{campo: {
+                "min": self.minimo[campo],
+                "max": self.maximo[campo],
+                **{f"p{q:g}": self.percentil(campo, q) for q in PERCENTILES},
+                "no_finitos": self.no_finitos[campo]
+            } for campo in CAMPOS_REDUCIDOS}
+        }
+
+
+def rangos_piloto(res):
+    # Rango de los histogramas a partir de la muestra previa, con un 5 % de margen
+    rangos = {}
+    for campo in CAMPOS_REDUCIDOS:
+        valores = res[campo][np.isfinite(res[campo])]
+        bajo, alto = (float(valores.min()), float(valores.max())) if valores.size else (0.0, 1.0)
+        margen = 0.05 * (alto - bajo) or max(abs(bajo), 1.0) * 0.05
+        rangos[campo] = (bajo - margen, alto + margen)
+    return rangos
+
+# ----- Salidas en memoria compartida -----
+
+class Salidas:
+    # Un arreglo por campo pedido, del tamaño del barrido completo. Cada proceso
+    # escribe su tramo directamente. Hay que llamar a cerrar() (o usar with) cuando
+    # ya no se necesiten, soltando antes las vistas que se hayan tomado.
+
+    def __init__(self, total, campos):
+        from multiprocessing.shared_memory import SharedMemory
+        self.total = total
+        self._memorias = {}
+        self.arreglos = {}
+        for campo in campos:
+            tipo = np.dtype(TIPOS_SALIDA.get(campo, np.float64))
+            memoria = SharedMemory(create=True, size=max(total * tipo.itemsize, 1))
+            self._memorias[campo] = memoria
+            self.arreglos[campo] = np.ndarray((total,), dtype=tipo, buffer=memoria.buf)
+
+    def descriptor(self):
+        # Lo que necesita un proceso para abrir los mismos arreglos
+        return {campo: (self._memorias[campo].name, a.dtype.str, self.total) for campo, a in self.arreglos.items()}
+
+    def __getitem__(self, campo):
+        return self.arreglos[campo]
+
+    def cerrar(self):
+        self.arreglos = {}
+        for memoria in self._memorias.values():
+            memoria.close()
+            memoria.unlink()
+        self._memorias = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+def _escribir_salidas(descriptor, inicio, fin, res):
+    from multiprocessing.shared_memory import SharedMemory
+    for campo, (nombre, tipo, total) in descriptor.items():
+        memoria = SharedMemory(name=nombre)
+        try:
+            destino = np.ndarray((total,), dtype=np.dtype(tipo), buffer=memoria.buf)
+            destino[inicio:fin] = res[campo]
+            del destino
+        finally:
+            memoria.close()
+
+def _resolver_bloque(barrido, inicio, fin, rangos, bins, descriptor):
+    # Corre en los procesos del pool; solo devuelve el acumulador del bloque
+    res = barrido.resolver(inicio, fin)
+    if descriptor:
+        _escribir_salidas(descriptor, inicio, fin, res)
+    acumulador = Acumulador(rangos, bins)
+    acumulador.agregar(res)
+    return acumulador
+
+# ----- Ejecución -----
+
+def ejecutar(barrido, procesos=None, tamano_bloque=TAMANO_BLOQUE, guardar=(), bins=BINS_PERCENTIL, progreso=None):
+    # Devuelve (resumen, salidas): salidas es None si no se pidió guardar ningún campo.
+    # progreso(hechos, total) se llama al terminar cada bloque; si lanza una excepción
+    # (trabajos.Cancelado) se cancelan los bloques pendientes y se propaga.
+    procesos = procesos or os.cpu_count() or 1
+    rangos = rangos_piloto(barrido.piloto(PILOTO))
+    salidas = Salidas(barrido.total, guardar) if guardar else None
+    descriptor = salidas.descriptor() if salidas else None
+    # Generador: con rejillas grandes ni la lista de bloques se guarda entera
+    bloques = ((i, min(i + tamano_bloque, barrido.total)) for i in range(0, barrido.total, tamano_bloque))
+    n_bloques = -(-barrido.total // tamano_bloque)
+    acumulado = Acumulador(rangos, bins)
+    hechos = 0
+    try:
+        if procesos == 1 or n_bloques <= 1:
+            # Sin pool: arrancar procesos cuesta más que un solo bloque
+            for inicio, fin in bloques:
+                acumulado.unir(_resolver_bloque(barrido, inicio, fin, rangos, bins, descriptor))
+                hechos += fin - inicio
+                if progreso:
+                    progreso(hechos, barrido.total)
+        else:
+            import multiprocessing
+            from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+            procesos = min(procesos, n_bloques)
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # Ventana acotada: a lo sumo VENTANA_POR_PROCESO bloques por proceso en
+                # vuelo, y cada acumulador se suelta al unirlo. La memoria no crece con
+                # el número de bloques
+                futuros = {}
+                try:
+                    while True:
+                        for inicio, fin in itertools.islice(bloques, procesos * VENTANA_POR_PROCESO - len(futuros)):
+                            futuros[pool.submit(_resolver_bloque, barrido, inicio, fin, rangos, bins, descriptor)] = fin - inicio
+                        if not futuros:
+                            break
+                        listos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+                        for futuro in listos:
+                            acumulado.unir(futuro.result())
+                            hechos += futuros.pop(futuro)
+                            del futuro
+                            if progreso:
+                                progreso(hechos, barrido.total)
+                        del listos
+                except BaseException:
+                    for futuro in futuros:
+                        futuro.cancel()
+                    raise
+    except BaseException:
+        if salidas:
+            salidas.cerrar()
+        raise
+    return acumulado.resumen(), salidas
+
+# ----- Línea de comandos -----
+
+def eje(texto):
+    # "valor" o "inicio:fin:puntos[:log]", con los mismos sufijos que el formulario (10k, 2.2M)
+    partes = texto.split(":")
+    if len(partes) == 1:
+        return np.array([interpretar_valor(partes[0])])
+    if len(partes) not in (3, 4) or (len(partes) == 4 and partes[3] != "log"):
+        raise argparse.ArgumentTypeError(f"Se esperaba valor o inicio:fin:puntos[:log], no {texto!r}")
+    inicio, fin = interpretar_valor(partes[0]), interpretar_valor(partes[1])
+    puntos = int(partes[2])
+    if len(partes) == 4:
+        return np.geomspace(inicio, fin, puntos)
+    return np.linspace(inicio, fin, puntos)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barridos de circuitos BJT en varios núcleos")
+    parser.add_argument("modo", choices=("rejilla", "montecarlo"))
+    parser.add_argument("--config", action="append", choices=CONFIGURACIONES,
+                        help="configuración (se puede repetir en rejilla; por defecto todas / Emisor común)")
+    for p in PARAMETROS:
+        nombre = "beta" if p == "β" else p
+        parser.add_argument(f"--{nombre}", dest=p, type=eje, help=f"{p}: valor o inicio:fin:puntos[:log]")
+    parser.add_argument("-n", "--muestras", type=int, default=10_000_000, help="muestras de Monte Carlo")
+    parser.add_argument("--tolerancia", type=float, default=0.05, help="tolerancia de resistencias")
+    parser.add_argument("--dispersion-beta", type=float, default=0.20)
+    parser.add_argument("--dispersion-vbe", type=float, default=0.02, help="V")
+    parser.add_argument("--semilla", type=int)
+    parser.add_argument("--procesos", type=int, help="por defecto, todos los núcleos")
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="elementos por bloque")
+    args = parser.parse_args(argv)
+
+    ejes = {p: getattr(args, p) for p in PARAMETROS if getattr(args, p) is not None}
+    if args.modo == "rejilla":
+        barrido = Rejilla(ejes, args.config or CONFIGURACIONES)
+    else:
+        if any(len(v) > 1 for v in ejes.values()):
+            parser.error("montecarlo usa un valor nominal por parámetro")
+        valores = {p: float(ejes[p][0]) if p in ejes else VALORES_DEFECTO[p] for p in PARAMETROS}
+        barrido = MonteCarlo((args.config or ["Emisor común"])[0], valores, args.muestras, args.tolerancia,
+                             args.dispersion_beta, args.dispersion_vbe, args.semilla)
+
+    inicio = time.perf_counter()
+    resumen, _ = ejecutar(barrido, args.procesos, args.bloque)
+    transcurrido = time.perf_counter() - inicio
+    resumen["segundos"] = round(transcurrido, 3)
+    resumen["por_segundo"] = round(barrido.total / transcurrido)
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
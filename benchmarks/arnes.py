@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import tempfile
+
+# ----- Arnés de callbacks sin navegador -----
+#
+# Llama a los callbacks de Dash igual que lo haría el navegador: un POST a
+# /_dash-update-component con el cliente de pruebas de Flask. Así se mide el
+# recorrido completo (serialización, callback y respuesta) sin abrir puertos.
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cargar_app():
+    # Historial y resultados en un directorio temporal: el benchmark no toca los datos reales
+    temporal = tempfile.mkdtemp(prefix="bjt-bench-")
+    os.environ.setdefault("HISTORIAL_DB", os.path.join(temporal, "historial.db"))
+    os.environ.setdefault("RESULTADOS_DIR", os.path.join(temporal, "resultados"))
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    import app
+    return app
+
+
+class Arnes:
+
+    def __init__(self, modulo_app):
+        self.app = modulo_app.app
+        self.cliente = self.app.server.test_client()
+        respuesta = self.cliente.get("/_dash-dependencies")
+        self.dependencias = {d["output"]: d for d in json.loads(respuesta.data)}
+
+    def _dependencia(self, salida):
+        # La salida se da como "id.propiedad" de cualquiera de las salidas del callback
+        for clave, dependencia in self.dependencias.items():
+            if salida in clave.strip(".").split("..."):
+                return clave, dependencia
+        raise KeyError(salida)
+
+    def carga(self, salida, valores, disparador=None):
+        clave, dependencia = self._dependencia(salida)
+
+        def convertir(lista):
+            return [
+                {"id": x["id"], "property": x["property"], "value": valores.get(f"{x['id']}.{x['property']}")}
+                for x in lista
+            ]
+
+        if clave.startswith(".."):
+            salidas = [dict(zip(("id", "property"), s.rsplit(".", 1))) for s in clave.strip(".").split("...")]
+        else:
+            salidas = dict(zip(("id", "property"), clave.rsplit(".", 1)))
+        return {
+            "output": clave,
+            "outputs": salidas,
+            "inputs": convertir(dependencia["inputs"]),
+            "state": convertir(dependencia["state"]),
+            "changedPropIds": [disparador] if disparador else []
+        }
+
+    def llamar(self, salida, valores, disparador=None):
+        # Devuelve (código HTTP, cuerpo en bytes)
+        respuesta = self.cliente.post("/_dash-update-component", json=self.carga(salida, valores, disparador))
+        return respuesta.status_code, respuesta.data
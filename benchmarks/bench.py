@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from arnes import Arnes, cargar_app
+
+# ----- Benchmarks de rendimiento -----
+#
+# python benchmarks/bench.py                   compara con benchmarks/baseline.json
+# python benchmarks/bench.py --guardar-base    mide y guarda una base nueva
+# python benchmarks/bench.py --umbral 0.5 --solo callback
+#
+# Cada caso informa latencias p50/p95/p99 y rendimiento por segundo. Sale con
+# código 1 si alguna métrica empeora más que el umbral respecto de la base.
+# Las bases dependen de la máquina: conviene regenerarlas en la misma donde se compara.
+# En máquinas virtuales compartidas el ruido entre procesos ronda el ±40%, de ahí
+# el umbral por defecto; en una máquina dedicada se puede bajar con --umbral.
+
+BASE_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+UMBRAL_DEFECTO = 0.50
+
+# Métrica -> sentido: +1 si un valor mayor es peor, -1 si un valor menor es peor.
+# p95/p99 se informan pero no se comparan: con pocas repeticiones son demasiado ruidosos.
+COMPARADAS = {"p50_ms": 1, "por_segundo": -1, "tamano_bytes": 1}
+
+CASOS = {}
+
+
+def caso(nombre):
+    def registrar(funcion):
+        CASOS[nombre] = funcion
+        return funcion
+    return registrar
+
+def medir(funcion, repeticiones, calentamiento=3):
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = np.empty(repeticiones)
+    for i in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos[i] = time.perf_counter() - inicio
+    return tiempos
+
+def resumen(tiempos, unidades=1):
+    # tiempos: segundos por repetición; unidades: operaciones hechas en cada repetición
+    por_unidad = tiempos / unidades
+    p50, p95, p99 = np.percentile(por_unidad, [50, 95, 99]) * 1e3
+    return {
+        "p50_ms": round(float(p50), 5),
+        "p95_ms": round(float(p95), 5),
+        "p99_ms": round(float(p99), 5),
+        "por_segundo": round(float(unidades / np.median(tiempos)), 1)
+    }
+
+# ----- Casos -----
+
+@caso("unidades.interpretar_valor")
+def bench_interpretar_valor(app, arnes, escala):
+    from unidades import _interpretar_texto, interpretar_valor
+    n = 2000
+    # Textos distintos en todas las notaciones aceptadas; la caché se vacía en cada
+    # repetición para medir el análisis y no la búsqueda en caché
+    formatos = ("{:.4g}k", "{:.4g} kΩ", "{:.4g}", "{:.3e}", "{:.4g}µ", "{:.4g}V")
+    textos = [formatos[i % len(formatos)].format(1 + i / 7) for i in range(n)]
+    textos += [f"{i % 97}k{i % 10}" for i in range(n // 4)]
+
+    def correr():
+        _interpretar_texto.cache_clear()
+        for texto in textos:
+            interpretar_valor(texto)
+
+    return resumen(medir(correr, 50 * escala), len(textos))
+
+@caso("app.calcular_y_graficar.llamada")
+def bench_calcular_llamada(app, arnes, escala):
+    contador = iter(range(10**9))
+
+    def correr():
+        # Entradas siempre nuevas y caché vacía: cada llamada resuelve y grafica, como al editar un campo
+        i = next(contador)
+        app.cache_calculos.limpiar()
+        app.calcular_y_graficar("Emisor común", f"{10 + i % 50}", "1k", f"{100 + i}k", "1k", "100", "0.7")
+
+    return resumen(medir(correr, 200 * escala))
+
+@caso("app.calcular_y_graficar.lote")
+def bench_calcular_lote(app, arnes, escala):
+    n = 100
+    configuraciones = ("Emisor común", "Base común", "Colector común")
+
+    def correr():
+        app.cache_calculos.limpiar()
+        for i in range(n):
+            app.calcular_y_graficar(configuraciones[i % 3], f"{5 + i % 20}", "2.2k", f"{47 + i}k", "470", "150", "0.65")
+
+    return resumen(medir(correr, 5 * escala, calentamiento=1), n)
+
+@caso("nucleo.resolver_lote")
+def bench_resolver_lote(app, arnes, escala):
+    from nucleo import resolver_lote
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    config = rng.integers(0, 3, n).astype(np.int8)
+    Rb = rng.uniform(10e3, 1e6, n)
+
+    def correr():
+        resolver_lote(config, 12.0, 1e3, Rb, 1e3, 100.0, 0.7)
+
+    return resumen(medir(correr, 10 * escala, calentamiento=1), n)
+
+@caso("reportes.exportar_a_word")
+def bench_exportar_word(app, arnes, escala):
+    from reportes import exportar_a_word
+    resultados_dict = app.calcular_y_graficar("Emisor común", "12", "1k", "100k", "1k", "100", "0.7")[2]
+    tamano = len(exportar_a_word(resultados_dict))
+
+    def correr():
+        exportar_a_word(resultados_dict)
+
+    return {**resumen(medir(correr, 20 * escala)), "tamano_bytes": tamano}
+
+@caso("cli.procesar_csv")
+def bench_cli_csv(app, arnes, escala):
+    import io
+    import tempfile
+    from cli import procesar
+    n = 100_000
+    configuraciones = ("Emisor común", "Base común", "Colector común")
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", delete=False) as f:
+        f.write("config,Vcc,Rc,Rb,Re,beta,Vbe\n")
+        f.writelines(f"{configuraciones[i % 3]},12,1k,{47 + i % 500}k,1k,100,0.7\n" for i in range(n))
+    try:
+        tiempos = medir(lambda: procesar([f.name], "auto", None, "Emisor común", 50_000, True, io.StringIO()),
+                        3 * escala, calentamiento=1)
+    finally:
+        os.remove(f.name)
+    return resumen(tiempos, n)
+
+ENTRADAS_CALCULO = {
+    # Con un cálculo previo (n_clicks) los campos recalculan al pulsar Enter
+    "btn-calc.n_clicks": 1, "config.value": "Emisor común",
+    "Vcc.value": "12", "Rc.value": "1k", "Rb.value": "100k", "Re.value": "1k", "β.value": "100", "Vbe.value": "0.7"
+}
+
+# Sesión del navegador simulada para las pestañas que leen el historial
+SESION = "bench"
+
+def estado_calculado(arnes):
+    # Disparado con Enter en un campo: resuelve sin escribir en el historial
+    estado, cuerpo = arnes.llamar("estado-calculo.data", {**ENTRADAS_CALCULO, "Vcc.n_submit": 1}, "Vcc.n_submit")
+    return json.loads(cuerpo)["response"]["estado-calculo"]["data"]
+
+@caso("callback.resolver_circuito")
+def bench_callback_resolver(app, arnes, escala):
+    contador = iter(range(10**9))
+
+    def correr():
+        app.cache_calculos.limpiar()
+        valores = {**ENTRADAS_CALCULO, "Rb.value": f"{100 + next(contador)}k", "Vcc.n_submit": 1}
+        estado, _ = arnes.llamar("estado-calculo.data", valores, "Vcc.n_submit")
+        assert estado == 200, estado
+
+    return resumen(medir(correr, 100 * escala))
+
+def bench_pestana(tab, salida, extra=None):
+    def bench(app, arnes, escala):
+        # Latencia de pintar la pestaña justo después de un cálculo (lo que ve el usuario al cambiar de pestaña)
+        estado = estado_calculado(arnes)
+        assert estado["calculado"], estado
+        if tab == "tab4" and app.historial_sesiones.contar(SESION) < 100:
+            for i in range(100):
+                app.historial_sesiones.agregar(SESION, {
+                    "config": "Emisor común", **estado["valores"], "Rb": 1e3 * (100 + i), "punto": estado["punto"]
+                })
+        valores = {"estado-calculo.data": estado, "tabs.value": tab, "sesion.data": SESION, **(extra or {})}
+
+        def correr():
+            estado, _ = arnes.llamar(salida, valores, "tabs.value")
+            assert estado == 200, estado
+
+        return resumen(medir(correr, 50 * escala))
+    return bench
+
+caso("callback.tab1_resultados")(bench_pestana("tab1", "contenido-tab1.children"))
+caso("callback.tab2_grafica")(bench_pestana("tab2", "contenido-tab2.children"))
+caso("callback.tab3_curvas")(bench_pestana("tab3", "contenido-tab3.children", {
+    "curvas-numero.value": 10, "curvas-puntos.value": 500, "curvas-early.value": 100
+}))
+caso("callback.tab4_historial")(bench_pestana("tab4", "contenido-tab4.children", {"historial-tabla.page_current": 0}))
+
+@caso("callback.tab3_curvas_parche")
+def bench_curvas_parche(app, arnes, escala):
+    # Edición de Rc con la figura ya dibujada: solo viajan la recta de carga y el punto Q
+    curvas = {"curvas-numero.value": 10, "curvas-puntos.value": 500, "curvas-early.value": 100}
+    inicial = {"estado-calculo.data": estado_calculado(arnes), "tabs.value": "tab3", **curvas}
+    _, cuerpo = arnes.llamar("grafica-curvas.figure", inicial, "estado-calculo.data")
+    firma = json.loads(cuerpo)["response"]["firma-curvas"]["data"]
+    _, cuerpo = arnes.llamar("estado-calculo.data", {**ENTRADAS_CALCULO, "Rc.value": "1.5k", "Vcc.n_submit": 1}, "Vcc.n_submit")
+    editado = json.loads(cuerpo)["response"]["estado-calculo"]["data"]
+    valores = {**inicial, "estado-calculo.data": editado, "firma-curvas.data": firma}
+
+    def correr():
+        estado, _ = arnes.llamar("grafica-curvas.figure", valores, "estado-calculo.data")
+        assert estado == 200, estado
+
+    return resumen(medir(correr, 50 * escala))
+
+# ----- Comparación con la base -----
+
+def comparar(actual, base, umbral):
+    # Devuelve la lista de regresiones como (caso, métrica, base, actual, cambio relativo)
+    regresiones = []
+    for nombre, metricas in actual.items():
+        for metrica, sentido in COMPARADAS.items():
+            anterior = base.get(nombre, {}).get(metrica)
+            valor = metricas.get(metrica)
+            if not anterior or valor is None:
+                continue
+            cambio = (valor - anterior) / anterior * sentido
+            if cambio > umbral:
+                regresiones.append((nombre, metrica, anterior, valor, cambio))
+    return regresiones
+
+def imprimir(resultados, base):
+    print(f"{'caso':36} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'por s':>12} {'vs base p50':>12}")
+    for nombre, m in resultados.items():
+        anterior = base.get(nombre, {}).get("p50_ms")
+        relativo = f"{(m['p50_ms'] - anterior) / anterior:+.0%}" if anterior else "-"
+        print(f"{nombre:36} {m['p50_ms']:10.4f} {m['p95_ms']:10.4f} {m['p99_ms']:10.4f} {m['por_segundo']:12,.0f} {relativo:>12}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del analizador BJT")
+    parser.add_argument("--base", default=BASE_DEFECTO, help="archivo JSON con la base de comparación")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar los resultados como nueva base")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_DEFECTO,
+                        help="empeoramiento relativo tolerado antes de fallar (0.50 = 50%%)")
+    parser.add_argument("--solo", help="ejecutar solo los casos cuyo nombre contenga este texto")
+    parser.add_argument("--escala", type=int, default=1, help="multiplica el número de repeticiones")
+    parser.add_argument("--rondas", type=int, default=3, help="rondas por caso; se informa la de menor p50")
+    args = parser.parse_args(argv)
+
+    app = cargar_app()
+    arnes = Arnes(app)
+    resultados = {}
+    for nombre, funcion in CASOS.items():
+        if args.solo and args.solo not in nombre:
+            continue
+        # Mejor de varias rondas: el ruido de la máquina solo puede sumar tiempo
+        rondas = [funcion(app, arnes, args.escala) for _ in range(max(args.rondas, 1))]
+        resultados[nombre] = min(rondas, key=lambda r: r["p50_ms"])
+
+    base = {}
+    if os.path.exists(args.base):
+        with open(args.base, "r", encoding="utf-8") as f:
+            base = json.load(f).get("casos", {})
+    imprimir(resultados, base)
+
+    if args.guardar_base:
+        # Se conservan los casos no ejecutados con --solo
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump({
+                "maquina": {"python": platform.python_version(), "sistema": platform.platform(), "procesador": platform.machine()},
+                "casos": {**base, **resultados}
+            }, f, indent=2, ensure_ascii=False)
+        print(f"Base guardada en {args.base}")
+        return 0
+
+    regresiones = comparar(resultados, base, args.umbral)
+    for nombre, metrica, anterior, valor, cambio in regresiones:
+        print(f"REGRESIÓN {nombre} {metrica}: {anterior} -> {valor} ({cambio:+.0%} peor)")
+    if not base:
+        print("Sin base de comparación; usa --guardar-base para crearla.")
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
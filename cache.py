@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    # Caché acotada con desalojo del elemento menos usado recientemente.
+    # Segura entre hilos: el servidor puede atender varios callbacks a la vez.
+
+    def __init__(self, capacidad=128):
+        self.capacidad = capacidad
+        self._datos = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, clave, calcular):
+        # Devuelve el valor cacheado o lo calcula con calcular() y lo guarda
+        with self._candado:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+        valor = calcular()
+        with self._candado:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+        return valor
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "tamano": len(self._datos),
+                "capacidad": self.capacidad,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0
+            }
+
+    def descartar(self, clave):
+        with self._candado:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._candado:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
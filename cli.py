@@ -0,0 +1,185 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from lotes import detectar_separador, normalizar_columnas
+from nucleo import CONFIGURACIONES, ESTADOS, PARAMETROS, codificar_config, conteo_estados, filas_resultado, resolver_columnas
+from resultado import CSV_ENCABEZADO, lineas_csv, registros
+
+# ----- Resolución por lotes desde la línea de comandos -----
+#
+# python cli.py circuitos.csv > resultados.csv
+# python cli.py circuitos.jsonl --salida jsonl
+# cat circuitos.csv | python cli.py --config "Base común" --resumen
+#
+# Lee circuitos en CSV (con encabezado, separado por "," ";" o tabulador) o JSONL
+# (un objeto por línea, como /api/resolver) desde archivos o la entrada estándar, y
+# escribe los resultados en la salida estándar bloque a bloque. Los valores aceptan
+# la misma notación que la interfaz ("2.2k", "4k7"); los vacíos o inválidos toman
+# el valor típico y quedan en la columna asumidos.
+# Solo importa numpy y los módulos del modelo: nada de Dash, plotly, pandas ni
+# python-docx, así que arranca rápido y sirve en tuberías y bancos de prueba.
+
+TAMANO_BLOQUE = 100_000
+CONFIG_DEFECTO = "Emisor común"
+
+EXTENSIONES = {".csv": "csv", ".txt": "csv", ".tsv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+class EntradaInvalida(ValueError):
+    pass
+
+
+def abrir(ruta):
+    # utf-8-sig descarta el BOM que deja Excel al exportar CSV
+    if ruta == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    return open(ruta, "r", encoding="utf-8-sig", newline="")
+
+def detectar_formato(ruta, primera):
+    formato = EXTENSIONES.get(os.path.splitext(ruta)[1].lower())
+    if formato:
+        return formato
+    return "jsonl" if primera.lstrip().startswith("{") else "csv"
+
+def _bloques(filas, tamano):
+    while True:
+        bloque = list(itertools.islice(filas, tamano))
+        if not bloque:
+            return
+        yield bloque
+
+def bloques_csv(lineas, primera, tamano):
+    # Devuelve bloques de columnas: (config, {parámetro: lista de textos}, n)
+    separador = detectar_separador(primera.encode("utf-8"))
+    lector = csv.reader(itertools.chain([primera], lineas), delimiter=separador)
+    encabezado = normalizar_columnas(next(lector, []))
+    indices = {c: i for i, c in enumerate(encabezado) if c == "config" or c in PARAMETROS}
+    if not indices:
+        raise EntradaInvalida("El encabezado no tiene ninguna columna conocida (config, Vcc, Rc, Rb, Re, β, Vbe)")
+    for bloque in _bloques(lector, tamano):
+        # Trasponer con zip_longest: las filas cortas se completan con vacíos
+        traspuesto = list(itertools.zip_longest(*bloque, fillvalue=""))
+        columnas = {c: traspuesto[i] if i < len(traspuesto) else [""] * len(bloque) for c, i in indices.items()}
+        yield columnas.pop("config", None), columnas, len(bloque)
+
+def _objetos_jsonl(lineas):
+    for numero, linea in enumerate(lineas, start=1):
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            circuito = json.loads(linea)
+        except ValueError:
+            raise EntradaInvalida(f"Línea {numero}: JSON inválido")
+        if not isinstance(circuito, dict):
+            raise EntradaInvalida(f"Línea {numero}: se esperaba un objeto")
+        yield circuito
+
+def bloques_jsonl(lineas, primera, tamano):
+    objetos = _objetos_jsonl(itertools.chain([primera], lineas))
+    while True:
+        # Lo leído antes de una línea inválida se resuelve igual
+        bloque = []
+        try:
+            for circuito in objetos:
+                bloque.append(circuito)
+                if len(bloque) >= tamano:
+                    break
+        except EntradaInvalida:
+            if bloque:
+                yield _columnas_jsonl(bloque)
+            raise
+        if not bloque:
+            return
+        yield _columnas_jsonl(bloque)
+
+def _columnas_jsonl(bloque):
+    normalizados = [dict(zip(normalizar_columnas(c), c.values())) for c in bloque]
+    config = [c.get("config") for c in normalizados]
+    columnas = {p: [c.get(p) for c in normalizados] for p in PARAMETROS}
+    return config, columnas, len(bloque)
+
+def resolver(config, columnas, n, config_defecto):
+    if config is None:
+        config = np.full(n, config_defecto, dtype=object)
+    else:
+        config = np.array([c or config_defecto for c in config], dtype=object)
+    return config, *resolver_columnas(config, columnas, n)
+
+def escribir_csv(salida, config, valores, asumidos, res, encabezado):
+    lineas = lineas_csv(registros(config, valores, asumidos, res), configs=config)
+    if encabezado:
+        lineas.insert(0, ",".join(CSV_ENCABEZADO))
+    salida.write("\n".join(lineas) + "\n")
+
+def escribir_jsonl(salida, config, valores, asumidos, res, encabezado):
+    salida.write("".join(json.dumps(f, ensure_ascii=False) + "\n" for f in filas_resultado(config, valores, asumidos, res)))
+
+def procesar(rutas, formato_entrada, formato_salida, config_defecto, tamano, encabezado, salida):
+    # Devuelve el resumen (filas, conteos por estado, configuraciones desconocidas)
+    resumen = {"filas": 0, "conteos": np.zeros(len(ESTADOS), dtype=np.int64), "config_desconocida": 0}
+    for ruta in rutas:
+        with abrir(ruta) as flujo:
+            primera = next(flujo, "")
+            if not primera.strip():
+                continue
+            formato = formato_entrada if formato_entrada != "auto" else detectar_formato(ruta, primera)
+            escribir = escribir_jsonl if (formato_salida or formato) == "jsonl" else escribir_csv
+            leer = bloques_jsonl if formato == "jsonl" else bloques_csv
+            for config, columnas, n in leer(flujo, primera, tamano):
+                config, valores, asumidos, res = resolver(config, columnas, n, config_defecto)
+                escribir(salida, config, valores, asumidos, res, encabezado and not resumen["filas"])
+                conocida = codificar_config(config) >= 0
+                resumen["conteos"] += conteo_estados(res["estado"][conocida])
+                resumen["config_desconocida"] += int((~conocida).sum())
+                resumen["filas"] += n
+    return resumen
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Punto de operación de circuitos BJT por lotes")
+    parser.add_argument("archivos", nargs="*", default=["-"], help="archivos CSV o JSONL; sin archivos o '-' lee la entrada estándar")
+    parser.add_argument("--entrada", choices=("auto", "csv", "jsonl"), default="auto",
+                        help="formato de entrada; auto lo deduce de la extensión o de la primera línea")
+    parser.add_argument("--salida", choices=("csv", "jsonl"), help="formato de salida (por defecto, el de la entrada)")
+    parser.add_argument("--config", choices=CONFIGURACIONES, default=CONFIG_DEFECTO, help="configuración de las filas que no la indican")
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="circuitos resueltos por bloque")
+    parser.add_argument("--sin-encabezado", action="store_true", help="no escribir el encabezado CSV")
+    parser.add_argument("--resumen", action="store_true", help="conteo por estado y tiempo en la salida de error")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    try:
+        resumen = procesar(
+            args.archivos, args.entrada, args.salida, args.config, max(args.bloque, 1),
+            not args.sin_encabezado, sys.stdout
+        )
+        sys.stdout.flush()
+    except EntradaInvalida as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # El lector cerró la tubería (| head): no es un error
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if args.resumen:
+        segundos = time.perf_counter() - inicio
+        conteos = ", ".join(f"{e}: {int(c)}" for e, c in zip(ESTADOS, resumen["conteos"]))
+        print(f"{resumen['filas']} circuitos en {segundos:.2f} s ({resumen['filas'] / max(segundos, 1e-9):,.0f}/s); {conteos}"
+              + (f"; configuración desconocida: {resumen['config_desconocida']}" if resumen["config_desconocida"] else ""),
+              file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+from functools import lru_cache
+
+import numpy as np
+
+from nucleo import (
+    ACTIVA, BASE_COMUN, COLECTOR_COMUN, CONFIGURACIONES, EMISOR_COMUN, VCE_SAT,
+    codificar_config, resolver_lote
+)
+
+# ----- Diseño inverso con valores normalizados -----
+#
+# Dado un punto Q objetivo (Ic, Vce) con Vcc, β y Vbe, busca las combinaciones de
+# resistencias de una serie E que más se acercan. Se usa el mismo resolver_lote que
+# el análisis, así que los resultados coinciden con lo que muestra la pestaña
+# Resultados al cargar la combinación.
+#
+# Emisor común: Ic solo depende de Rb y Re, y Vce baja monótonamente con Rc. Para
+# cada par (Rb, Re) se despeja el Rc ideal y se prueban sus dos vecinos en el
+# índice ordenado de la serie (searchsorted), que dan el mejor Vce del par (los
+# demás Rc del par no entran en la lista); con tolerancia, todos los valores de
+# Rc entre los que dejan Vce en los dos bordes de la banda, más sus vecinos. Los
+# pares se podan antes: solo pasan los CANDIDATOS_EC de menor error en Ic. Es una
+# heurística, no equivale a recorrer Rb × Re × Rc: un par algo peor en Ic pero
+# con mejor Vce puede quedar fuera. Con tolerancia pasan además todos los pares
+# con el error de Ic dentro de la banda, así que ninguna combinación dentro de la
+# tolerancia se pierde y la de más margen siempre aparece.
+# Base común (Rb no interviene) y colector común (Rc no interviene) son una
+# cuadrícula de dos resistencias que se resuelve completa.
+
+SERIES = {
+    "E12": (1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2),
+    "E24": (1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
+            3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1),
+    # 10^(i/96) redondeado a 3 cifras coincide con la tabla de la norma
+    "E96": tuple(round(10 ** (i / 96), 2) for i in range(96))
+}
+
+# Décadas buscadas: de 10 Ω a 9.x MΩ
+DECADAS = range(1, 7)
+
+# Pares (Rb, Re) de emisor común que pasan a evaluarse con los Rc cercanos al ideal
+CANDIDATOS_EC = 4096
+
+
+@lru_cache(maxsize=None)
+def indice_serie(serie):
+    # Todos los valores de la serie en las décadas buscadas, ordenados
+    base = np.asarray(SERIES[serie])
+    return np.sort(np.round(np.concatenate([base * 10.0 ** d for d in DECADAS]), 3))
+
+def entre_vecinos(indice, bajo, alto):
+    # Para cada par de ideales bajo <= alto, las posiciones del índice desde el vecino
+    # inferior de bajo hasta el superior de alto, aplanadas: (fila de cada una, posición).
+    # Con bajo == alto son los dos valores que rodean al ideal (uno en los extremos)
+    ultimo = len(indice) - 1
+    inicio = np.clip(np.searchsorted(indice, bajo) - 1, 0, ultimo)
+    fin = np.maximum(np.clip(np.searchsorted(indice, alto), 0, ultimo), inicio)
+    cuentas = fin - inicio + 1
+    fila = np.repeat(np.arange(len(inicio)), cuentas)
+    desplazamiento = np.arange(cuentas.sum()) - np.repeat(np.cumsum(cuentas) - cuentas, cuentas)
+    return fila, inicio[fila] + desplazamiento
+
+def _candidatos(config, indice, Vcc, beta, Vbe, Ic_obj, Vce_obj, tolerancia=0.0):
+    # Devuelve (Rb, Rc, Re) planos; None en la resistencia que no interviene
+    if config == EMISOR_COMUN:
+        Rb, Re = indice[:, None], indice[None, :]
+        Ib = (Vcc - Vbe) / (Rb + (beta + 1) * Re)
+        Ic = beta * Ib
+        # Los pares con la Ic más cercana y los que caen en la banda de tolerancia;
+        # para ellos, los Rc de la banda de Vce y sus vecinos
+        error_ic = np.abs(Ic - Ic_obj).ravel()
+        k = min(CANDIDATOS_EC, error_ic.size)
+        elegidos = np.argpartition(error_ic, k - 1)[:k]
+        if tolerancia > 0:
+            elegidos = np.union1d(elegidos, np.flatnonzero(error_ic <= tolerancia * Ic_obj))
+        Rb = np.broadcast_to(Rb, Ic.shape).ravel()[elegidos]
+        Re = np.broadcast_to(Re, Ic.shape).ravel()[elegidos]
+        Ic = Ic.ravel()[elegidos]
+        Ie = Ic * (beta + 1) / beta
+        Rc_ideal = lambda Vce: (Vcc - Vce - Ie * Re) / Ic
+        # Vce baja con Rc: el borde alto de la banda da el Rc más chico
+        fila, pos = entre_vecinos(indice, Rc_ideal(Vce_obj * (1 + tolerancia)), Rc_ideal(Vce_obj * (1 - tolerancia)))
+        filas = np.unique(np.column_stack([Rb[fila], indice[pos], Re[fila]]), axis=0)
+        return filas[:, 0], filas[:, 1], filas[:, 2]
+    a, b = np.meshgrid(indice, indice, indexing="ij")
+    if config == BASE_COMUN:
+        return None, b.ravel(), a.ravel()
+    return a.ravel(), None, b.ravel()
+
+def disenar(config, Vcc, beta, Vbe, Ic_obj, Vce_obj, serie="E24", tolerancia=0.0, n=10):
+    # Devuelve hasta n combinaciones ordenadas por error relativo (el peor entre Ic y Vce)
+    # y, a igual error o dentro de la tolerancia, por margen hasta saturación.
+    codigo = int(codificar_config(config))
+    if codigo < 0:
+        raise ValueError(f"Configuración desconocida: {config}")
+    if Ic_obj <= 0 or not (VCE_SAT < Vce_obj < Vcc):
+        raise ValueError(f"El punto Q debe tener Ic > 0 y {VCE_SAT} V < Vce < Vcc")
+
+    indice = indice_serie(serie)
+    Rb, Rc, Re = _candidatos(codigo, indice, Vcc, beta, Vbe, Ic_obj, Vce_obj, tolerancia)
+    # La resistencia que no interviene se resuelve con un valor cualquiera
+    res = resolver_lote(
+        codigo, Vcc, 1.0 if Rc is None else Rc, 1.0 if Rb is None else Rb, Re, beta, Vbe
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        error = np.maximum(np.abs(res["Ic"] / Ic_obj - 1), np.abs(res["Vce"] / Vce_obj - 1))
+    margen = res["Vce"] - VCE_SAT
+    valido = (res["estado"] == ACTIVA) & np.isfinite(error)
+    error = np.where(valido, error, np.inf)
+    # Dentro de la banda de tolerancia todas valen lo mismo y decide el margen
+    clave = np.where(error <= tolerancia, 0.0, error)
+    orden = np.lexsort((error, -margen, clave))[:n]
+    orden = orden[valido[orden]]
+
+    return [{
+        "config": CONFIGURACIONES[codigo],
+        "Rb": None if Rb is None else float(Rb[i]),
+        "Rc": None if Rc is None else float(Rc[i]),
+        "Re": float(Re[i]),
+        "Ic": float(res["Ic"][i]),
+        "Vce": float(res["Vce"][i]),
+        "error": float(error[i]),
+        "margen": float(margen[i])
+    } for i in orden]
@@ -0,0 +1,20 @@
+import os
+
+# Configuración de producción: gunicorn -c gunicorn.conf.py app:server
+#
+# Cada worker es un proceso con sus propias cachés LRU (solo guardan resultados
+# deterministas, así que no necesitan sincronizarse); el historial vive en SQLite
+# en modo WAL y es seguro entre procesos. Los trabajos en segundo plano corren en
+# un pool de TRABAJOS_PROCESOS procesos por worker y su estado vive en disco
+# (RESULTADOS_DIR), así que cualquier worker responde el sondeo de avance.
+# Las métricas de /metrics (metricas.py) son por proceso y solo son coherentes con
+# un worker, así que por defecto hay uno solo con más hilos: NumPy suelta el GIL en
+# los lotes y el trabajo pesado corre en el pool de trabajos, no en el worker.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8050')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+keepalive = 5
+accesslog = "-"
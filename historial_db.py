@@ -0,0 +1,291 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from cache import CacheLRU
+
+# ----- Historial persistente en SQLite -----
+#
+# Cada cálculo es una fila nueva (inserción O(1)); el modo WAL deja que varios
+# procesos del servidor escriban y lean a la vez sin pisarse el archivo.
+# Cada fila lleva la sesión del navegador que la creó. Las filas anteriores a
+# las sesiones (o importadas de historial.json) quedan con sesion NULL y ninguna
+# sesión las ve: eran el historial compartido de todos los usuarios y no hay forma
+# de saber de quién es cada una. Siguen en la base para quien la consulte directamente.
+
+# Clave del diccionario de historial -> columna de la tabla
+COLUMNAS = {
+    "config": "config",
+    "Vcc": "vcc",
+    "Rc": "rc",
+    "Rb": "rb",
+    "Re": "re",
+    "β": "beta",
+    "Vbe": "vbe"
+}
+
+# Punto de operación resuelto: columnas para filtrar y ordenar; el punto completo
+# y los campos que tomaron su valor típico van en "resultado" (JSON)
+COLUMNAS_RESULTADO = {
+    "Ic": "ic",
+    "Vce": "vce",
+    "estado": "estado"
+}
+
+# Columnas por las que se puede ordenar (clave de la tabla -> columna SQL)
+ORDENABLES = {"fecha": "fecha", **COLUMNAS, **COLUMNAS_RESULTADO}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS historial (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha REAL NOT NULL,
+    config TEXT,
+    vcc REAL, rc REAL, rb REAL, re REAL, beta REAL, vbe REAL,
+    sesion TEXT,
+    ic REAL, vce REAL, estado TEXT, resultado TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_historial_fecha ON historial(fecha);
+CREATE INDEX IF NOT EXISTS idx_historial_config ON historial(config, fecha);
+"""
+
+# Columnas agregadas después de la primera versión, para migrar bases antiguas
+COLUMNAS_NUEVAS = {"sesion": "TEXT", "ic": "REAL", "vce": "REAL", "estado": "TEXT", "resultado": "TEXT"}
+
+# Se crean después de migrar: en bases antiguas esas columnas aún no existen
+INDICES_SESION = """
+CREATE INDEX IF NOT EXISTS idx_historial_sesion ON historial(sesion, id);
+CREATE INDEX IF NOT EXISTS idx_historial_sesion_config ON historial(sesion, config, id);
+CREATE INDEX IF NOT EXISTS idx_historial_sesion_estado ON historial(sesion, estado, ic);
+CREATE INDEX IF NOT EXISTS idx_historial_sesion_ic ON historial(sesion, ic);
+"""
+
+
+class Historial:
+
+    def __init__(self, ruta, ruta_json=None):
+        self.ruta = ruta
+        # Historial antiguo (una lista JSON) que se importa la primera vez
+        self.ruta_json = ruta_json
+        self._local = threading.local()
+        self._candado = threading.Lock()
+        self._preparado = False
+
+    def _conexion(self):
+        # Una conexión por hilo; se abre la primera vez que se usa
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.row_factory = sqlite3.Row
+            self._local.con = con
+            with self._candado:
+                if not self._preparado:
+                    con.executescript(ESQUEMA)
+                    self._migrar(con)
+                    con.executescript(INDICES_SESION)
+                    self._importar_json(con)
+                    self._preparado = True
+        return con
+
+    @staticmethod
+    def _migrar(con):
+        columnas = {f["name"] for f in con.execute("PRAGMA table_info(historial)")}
+        for columna, tipo in COLUMNAS_NUEVAS.items():
+            if columna in columnas:
+                continue
+            try:
+                con.execute(f"ALTER TABLE historial ADD COLUMN {columna} {tipo}")
+            except sqlite3.OperationalError:
+                # Otro proceso la agregó entre la consulta y el ALTER
+                pass
+
+    def _importar_json(self, con):
+        if not self.ruta_json or not os.path.exists(self.ruta_json):
+            return
+        if con.execute("SELECT 1 FROM historial LIMIT 1").fetchone():
+            return
+        try:
+            with open(self.ruta_json, "r", encoding="utf-8") as f:
+                entradas = json.load(f)
+        except (OSError, ValueError):
+            return
+        fecha = os.path.getmtime(self.ruta_json)
+        con.execute("BEGIN IMMEDIATE")
+        # Otro proceso pudo importarlo mientras esperábamos el bloqueo
+        if con.execute("SELECT 1 FROM historial LIMIT 1").fetchone():
+            con.execute("COMMIT")
+            return
+        con.executemany(self._sql_insertar(), [self._fila(e, fecha) for e in entradas])
+        con.execute("COMMIT")
+
+    @staticmethod
+    def _sql_insertar():
+        columnas = ", ".join(["fecha", *COLUMNAS.values(), "sesion", *COLUMNAS_RESULTADO.values(), "resultado"])
+        marcas = ", ".join("?" * (len(COLUMNAS) + len(COLUMNAS_RESULTADO) + 3))
+        return f"INSERT INTO historial ({columnas}) VALUES ({marcas})"
+
+    @staticmethod
+    def _fila(entrada, fecha, sesion=None):
+        # entrada: config y los seis valores; opcionalmente "punto" y "defecto" del cálculo
+        punto = entrada.get("punto") or {}
+        resultado = json.dumps({"punto": punto, "defecto": entrada.get("defecto") or []}, ensure_ascii=False) if punto else None
+        return (
+            entrada.get("fecha", fecha), *(entrada.get(k) for k in COLUMNAS), sesion,
+            *(punto.get(k) for k in COLUMNAS_RESULTADO), resultado
+        )
+
+    def agregar(self, entrada, sesion=None):
+        # Devuelve el id de la fila nueva
+        return self._conexion().execute(self._sql_insertar(), self._fila(entrada, time.time(), sesion)).lastrowid
+
+    @staticmethod
+    def _filtro(config, sesion=None, estado=None, ic_min=None, ic_max=None):
+        # sesion=None no filtra por sesión (todas las filas)
+        condiciones, args = [], []
+        for condicion, valor in (
+            ("sesion = ?", sesion), ("config = ?", config or None), ("estado = ?", estado or None),
+            ("ic >= ?", ic_min), ("ic <= ?", ic_max)
+        ):
+            if valor is not None:
+                condiciones.append(condicion)
+                args.append(valor)
+        return ("WHERE " + " AND ".join(condiciones) if condiciones else ""), tuple(args)
+
+    def contar(self, config=None, sesion=None):
+        donde, args = self._filtro(config, sesion)
+        return self._conexion().execute(f"SELECT COUNT(*) FROM historial {donde}", args).fetchone()[0]
+
+    def contar_por_config(self, sesion=None):
+        donde, args = self._filtro(None, sesion)
+        return dict(self._conexion().execute(
+            f"SELECT config, COUNT(*) FROM historial {donde} GROUP BY config", args
+        ).fetchall())
+
+    def ultimo_id(self, sesion):
+        # Búsqueda en el índice (sesion, id): sirve para validar copias en memoria
+        return self._conexion().execute("SELECT MAX(id) FROM historial WHERE sesion = ?", (sesion,)).fetchone()[0]
+
+    def pagina(self, numero, tamano=25, config=None, sesion=None):
+        # Página numero (desde 1), de la más reciente a la más antigua
+        donde, args = self._filtro(config, sesion)
+        filas = self._conexion().execute(
+            f"SELECT * FROM historial {donde} ORDER BY fecha DESC, id DESC LIMIT ? OFFSET ?",
+            (*args, tamano, (max(numero, 1) - 1) * tamano)
+        ).fetchall()
+        return [self._entrada(f) for f in filas]
+
+    def consultar(self, sesion=None, config=None, estado=None, ic_min=None, ic_max=None,
+                  orden="fecha", descendente=True, numero=1, tamano=25):
+        # Página filtrada y ordenada: (total que cumple el filtro, entradas de la página)
+        donde, args = self._filtro(config, sesion, estado, ic_min, ic_max)
+        sentido = "DESC" if descendente else "ASC"
+        columna = ORDENABLES.get(orden, "fecha")
+        con = self._conexion()
+        total = con.execute(f"SELECT COUNT(*) FROM historial {donde}", args).fetchone()[0]
+        filas = con.execute(
+            f"SELECT * FROM historial {donde} ORDER BY {columna} {sentido}, id {sentido} LIMIT ? OFFSET ?",
+            (*args, tamano, (max(numero, 1) - 1) * tamano)
+        ).fetchall()
+        return total, [self._entrada(f) for f in filas]
+
+    def entrada(self, id_entrada, sesion=None):
+        donde, args = self._filtro(None, sesion)
+        donde = f"{donde} AND id = ?" if donde else "WHERE id = ?"
+        fila = self._conexion().execute(f"SELECT * FROM historial {donde}", (*args, id_entrada)).fetchone()
+        return self._entrada(fila) if fila else None
+
+    def columnas(self, config=None, limite=None, sesion=None):
+        # Las entradas más recientes como columnas: (configs, {clave: lista}) para lotes vectorizados
+        donde, args = self._filtro(config, sesion)
+        sql = f"SELECT * FROM historial {donde} ORDER BY fecha DESC, id DESC"
+        if limite:
+            sql, args = sql + " LIMIT ?", (*args, limite)
+        filas = self._conexion().execute(sql, args).fetchall()
+        return (
+            [f["config"] for f in filas],
+            {clave: [f[columna] for f in filas] for clave, columna in COLUMNAS.items() if clave != "config"}
+        )
+
+    @staticmethod
+    def _entrada(fila):
+        entrada = {"id": fila["id"], "fecha": fila["fecha"]}
+        for clave, columna in {**COLUMNAS, **COLUMNAS_RESULTADO}.items():
+            entrada[clave] = fila[columna]
+        # Las filas anteriores a guardar resultados no tienen punto
+        resultado = json.loads(fila["resultado"]) if fila["resultado"] else {}
+        entrada["punto"] = resultado.get("punto")
+        entrada["defecto"] = resultado.get("defecto", [])
+        return entrada
+
+
+class HistorialSesiones:
+    # Historial de cada sesión del navegador. Las últimas entradas de las sesiones
+    # activas se guardan en memoria en una caché LRU acotada (las sesiones inactivas
+    # se desalojan); las escrituras van siempre a SQLite, que es la fuente de verdad.
+    # Como cada worker tiene su propia caché, antes de usar la copia en memoria se
+    # compara el último id de la sesión con el de la base (una búsqueda en el índice).
+
+    def __init__(self, historial, sesiones=256, entradas=50):
+        self.historial = historial
+        self.entradas = entradas
+        self.cache = CacheLRU(sesiones)
+
+    def _cargar(self, sesion):
+        return {
+            "ultimo": self.historial.ultimo_id(sesion),
+            "total": self.historial.contar(sesion=sesion),
+            "por_config": self.historial.contar_por_config(sesion),
+            "recientes": self.historial.pagina(1, self.entradas, sesion=sesion)
+        }
+
+    def _datos(self, sesion):
+        if not sesion:
+            # Antes de que el navegador reciba su id no hay historial que mostrar
+            return {"ultimo": None, "total": 0, "por_config": {}, "recientes": []}
+        datos = self.cache.obtener(sesion, lambda: self._cargar(sesion))
+        if datos["ultimo"] != self.historial.ultimo_id(sesion):
+            # Otro worker escribió en esta sesión
+            self.cache.descartar(sesion)
+            datos = self.cache.obtener(sesion, lambda: self._cargar(sesion))
+        return datos
+
+    def agregar(self, sesion, entrada):
+        self.historial.agregar(entrada, sesion)
+        self.cache.descartar(sesion)
+
+    def contar(self, sesion, config=None):
+        datos = self._datos(sesion)
+        return datos["por_config"].get(config, 0) if config else datos["total"]
+
+    def pagina(self, sesion, numero, tamano=25, config=None):
+        datos = self._datos(sesion)
+        recientes = [e for e in datos["recientes"] if not config or e["config"] == config]
+        inicio = (max(numero, 1) - 1) * tamano
+        # En memoria solo si la página cae entera dentro de las entradas guardadas
+        if datos["total"] <= len(datos["recientes"]) or len(recientes) >= inicio + tamano:
+            return recientes[inicio:inicio + tamano]
+        return self.historial.pagina(numero, tamano, config, sesion)
+
+    def consultar(self, sesion, config=None, estado=None, ic_min=None, ic_max=None,
+                  orden="fecha", descendente=True, numero=1, tamano=25):
+        # Sin más filtro que la configuración y en el orden de siempre, la página
+        # sale de la copia en memoria; cualquier otra consulta va a los índices de SQLite
+        if not sesion:
+            return 0, []
+        if estado is None and ic_min is None and ic_max is None and orden == "fecha" and descendente:
+            return self.contar(sesion, config), self.pagina(sesion, numero, tamano, config)
+        return self.historial.consultar(sesion, config, estado, ic_min, ic_max, orden, descendente, numero, tamano)
+
+    def entrada(self, sesion, id_entrada):
+        # Solo entradas de la propia sesión
+        if not sesion:
+            return None
+        return self.historial.entrada(id_entrada, sesion)
+
+    def columnas(self, sesion, config=None, limite=None):
+        if not sesion:
+            return [], {clave: [] for clave in COLUMNAS if clave != "config"}
+        return self.historial.columnas(config, limite, sesion)
@@ -0,0 +1,126 @@
+import io
+import os
+
+import numpy as np
+
+from nucleo import (
+    COLUMNAS_RESULTADO, ESTADOS, PARAMETROS, conteo_estados, codificar_config,
+    nombres_estado, resolver_columnas
+)
+
+# ----- Resolución masiva de archivos CSV / Excel -----
+#
+# El archivo se lee y resuelve por bloques de filas; cada bloque se escribe al
+# CSV de salida y solo se conservan los acumulados del resumen, de modo que la
+# memoria no depende del número de filas.
+
+TAMANO_BLOQUE = 50_000
+
+# Encabezados aceptados (sin distinguir mayúsculas) -> nombre interno
+ALIAS_COLUMNAS = {
+    "config": "config", "configuracion": "config", "configuración": "config",
+    "vcc": "Vcc", "rc": "Rc", "rb": "Rb", "re": "Re",
+    "β": "β", "beta": "β", "hfe": "β", "vbe": "Vbe"
+}
+
+
+def normalizar_columnas(columnas):
+    return [ALIAS_COLUMNAS.get(str(c).strip().lower(), str(c).strip()) for c in columnas]
+
+def detectar_separador(contenido):
+    # Excel en español suele exportar con ";"; se detecta en la primera línea
+    primera = contenido[:4096].split(b"\n", 1)[0].decode("utf-8", "replace")
+    return max((",", ";", "\t"), key=primera.count)
+
+def _bloques_csv(contenido, tamano):
+    import pandas as pd
+    lector = pd.read_csv(
+        io.BytesIO(contenido), chunksize=tamano, dtype=str,
+        keep_default_na=False, sep=detectar_separador(contenido)
+    )
+    for bloque in lector:
+        bloque.columns = normalizar_columnas(bloque.columns)
+        yield bloque
+
+def _bloques_excel(contenido, tamano):
+    import pandas as pd
+    from openpyxl import load_workbook
+    # Modo solo lectura: openpyxl entrega las filas sin cargar la hoja completa
+    libro = load_workbook(io.BytesIO(contenido), read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = normalizar_columnas(next(filas, ()))
+        bloque = []
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) >= tamano:
+                yield pd.DataFrame(bloque, columns=encabezado, dtype=object)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=encabezado, dtype=object)
+    finally:
+        libro.close()
+
+def leer_bloques(nombre, contenido, tamano=TAMANO_BLOQUE):
+    extension = os.path.splitext(nombre)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return _bloques_excel(contenido, tamano)
+    if extension in (".csv", ".txt"):
+        return _bloques_csv(contenido, tamano)
+    raise ValueError(f"Formato no soportado: {extension or nombre}")
+
+def resolver_bloque(bloque, config_defecto):
+    # Devuelve un DataFrame con los valores efectivos, los asumidos y los resultados
+    import pandas as pd
+    n = len(bloque)
+    if "config" in bloque:
+        config = bloque["config"].to_numpy(dtype=object, copy=True)
+        vacia = pd.isna(config) | (config == "")
+        config[vacia] = config_defecto
+    else:
+        config = np.full(n, config_defecto, dtype=object)
+    columnas = {p: bloque[p].to_numpy(dtype=object) for p in PARAMETROS if p in bloque}
+    valores, asumidos, res = resolver_columnas(config, columnas, n)
+
+    salida = {"config": config}
+    for p in PARAMETROS:
+        salida[p] = valores[p]
+    marcas = np.column_stack([asumidos[p] for p in PARAMETROS])
+    salida["asumidos"] = [";".join(p for p, m in zip(PARAMETROS, fila) if m) for fila in marcas]
+    for k in COLUMNAS_RESULTADO:
+        salida[k] = res[k]
+    salida["estado"] = nombres_estado(res["estado"])
+    resultado = pd.DataFrame(salida)
+    resultado.loc[codificar_config(config) < 0, "estado"] = "CONFIG. DESCONOCIDA"
+    return resultado, res
+
+def procesar_archivo(nombre, contenido, destino, config_defecto="Emisor común",
+                     tamano=TAMANO_BLOQUE, progreso=None):
+    # Resuelve todo el archivo hacia el CSV destino y devuelve el resumen
+    resumen = {
+        "archivo": nombre,
+        "filas": 0,
+        "conteos": dict.fromkeys(ESTADOS, 0),
+        "config_desconocida": 0,
+        "Ic_min": np.inf, "Ic_max": -np.inf,
+        "Vce_min": np.inf, "Vce_max": -np.inf
+    }
+    with open(destino, "w", encoding="utf-8", newline="") as salida:
+        for i, bloque in enumerate(leer_bloques(nombre, contenido, tamano)):
+            resultado, res = resolver_bloque(bloque, config_defecto)
+            # 8 cifras significativas sobran para componentes reales y abaratan la escritura
+            resultado.to_csv(salida, header=(i == 0), index=False, float_format="%.8g")
+
+            conocida = codificar_config(resultado["config"].to_numpy(dtype=object)) >= 0
+            for estado, c in zip(ESTADOS, conteo_estados(res["estado"][conocida])):
+                resumen["conteos"][estado] += int(c)
+            resumen["config_desconocida"] += int((~conocida).sum())
+            resumen["filas"] += len(resultado)
+            for clave in ("Ic", "Vce"):
+                valores = res[clave][conocida & np.isfinite(res[clave])]
+                if valores.size:
+                    resumen[f"{clave}_min"] = min(resumen[f"{clave}_min"], float(valores.min()))
+                    resumen[f"{clave}_max"] = max(resumen[f"{clave}_max"], float(valores.max()))
+            if progreso:
+                progreso(resumen["filas"])
+    return resumen
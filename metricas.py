@@ -0,0 +1,230 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# ----- Métricas de rendimiento -----
+#
+# Tiempos por etapa del cálculo, duración y tamaño de cada respuesta y tasas de
+# acierto de las cachés, expuestos en /metrics en el formato de texto de Prometheus.
+# Los contadores viven en la memoria del proceso y no se comparten: /metrics solo
+# es coherente con un único worker (WEB_CONCURRENCY=1; los hilos de gthread sí
+# comparten el registro). Con varios workers cada raspado cae en uno al azar y
+# devuelve solo sus contadores, que además empiezan de cero en cada reinicio; el
+# pid va como etiqueta para que al menos se note. Por eso gunicorn.conf.py y
+# render.yaml arrancan un solo worker con varios hilos.
+#
+# Con BJT_PERFILADOR=<directorio> se activa además un perfilador por muestreo:
+# las peticiones que tardan más de BJT_PERFILADOR_UMBRAL_MS dejan sus pilas en
+# formato "collapsed" (una pila por línea con su cuenta), listo para flamegraph.pl
+# o speedscope.
+
+CUBETAS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CUBETAS_BYTES = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+AYUDAS = {
+    "bjt_etapa_segundos": "Duración de cada etapa del cálculo",
+    "bjt_callback_segundos": "Duración de cada callback de Dash, incluida la serialización de la respuesta",
+    "bjt_peticion_segundos": "Duración de las demás peticiones HTTP",
+    "bjt_respuesta_bytes": "Tamaño de las respuestas sin comprimir",
+    "bjt_cache_aciertos_total": "Aciertos de caché",
+    "bjt_cache_fallos_total": "Fallos de caché",
+    "bjt_cache_desalojos_total": "Elementos desalojados de la caché",
+    "bjt_cache_elementos": "Elementos en la caché",
+    "bjt_cache_tasa_aciertos": "Fracción de consultas resueltas por la caché"
+}
+
+
+class Histograma:
+
+    def __init__(self, cubetas):
+        self.cubetas = cubetas
+        self.cuentas = [0] * len(cubetas)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.cubetas):
+            if valor <= limite:
+                self.cuentas[i] += 1
+                break
+        self.suma += valor
+        self.total += 1
+
+
+def _etiquetas(pares):
+    if not pares:
+        return ""
+    escapar = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escapar(v)}"' for k, v in pares) + "}"
+
+
+class Registro:
+
+    def __init__(self):
+        self._histogramas = {}
+        self._caches = {}
+        self._candado = threading.Lock()
+
+    def observar(self, nombre, etiquetas, valor, cubetas=CUBETAS_SEGUNDOS):
+        # etiquetas: tupla de pares (clave, valor)
+        with self._candado:
+            histograma = self._histogramas.get((nombre, etiquetas))
+            if histograma is None:
+                histograma = self._histogramas[(nombre, etiquetas)] = Histograma(cubetas)
+            histograma.observar(valor)
+
+    def registrar_cache(self, nombre, cache):
+        # cache: cualquier objeto con estadisticas() como CacheLRU
+        self._caches[nombre] = cache
+
+    def texto(self):
+        pid = ("pid", os.getpid())
+        lineas = []
+        with self._candado:
+            por_nombre = {}
+            for (nombre, etiquetas), h in sorted(self._histogramas.items()):
+                por_nombre.setdefault(nombre, []).append((etiquetas, h.cubetas, list(h.cuentas), h.suma, h.total))
+        for nombre, series in por_nombre.items():
+            lineas += [f"# HELP {nombre} {AYUDAS.get(nombre, nombre)}", f"# TYPE {nombre} histogram"]
+            for etiquetas, cubetas, cuentas, suma, total in series:
+                acumulado = 0
+                for limite, cuenta in zip(cubetas, cuentas):
+                    acumulado += cuenta
+                    lineas.append(f"{nombre}_bucket{_etiquetas((*etiquetas, pid, ('le', f'{limite:g}')))} {acumulado}")
+                lineas.append(f"{nombre}_bucket{_etiquetas((*etiquetas, pid, ('le', '+Inf')))} {total}")
+                lineas.append(f"{nombre}_sum{_etiquetas((*etiquetas, pid))} {suma:.6f}")
+                lineas.append(f"{nombre}_count{_etiquetas((*etiquetas, pid))} {total}")
+
+        estadisticas = {nombre: cache.estadisticas() for nombre, cache in self._caches.items()}
+        for metrica, clave, tipo in (
+            ("bjt_cache_aciertos_total", "aciertos", "counter"),
+            ("bjt_cache_fallos_total", "fallos", "counter"),
+            ("bjt_cache_desalojos_total", "desalojos", "counter"),
+            ("bjt_cache_elementos", "tamano", "gauge"),
+            ("bjt_cache_tasa_aciertos", "tasa_aciertos", "gauge")
+        ):
+            if not estadisticas:
+                break
+            lineas += [f"# HELP {metrica} {AYUDAS[metrica]}", f"# TYPE {metrica} {tipo}"]
+            for nombre, e in estadisticas.items():
+                lineas.append(f"{metrica}{_etiquetas((('cache', nombre), pid))} {e[clave]:g}")
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
+
+@contextmanager
+def etapa(nombre):
+    # with etapa("figura"): ... -> bjt_etapa_segundos{etapa="figura"}
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registro.observar("bjt_etapa_segundos", (("etapa", nombre),), time.perf_counter() - inicio)
+
+# ----- Perfilador por muestreo -----
+
+class Perfilador:
+
+    def __init__(self, directorio, umbral_s=0.5, intervalo_s=0.005):
+        self.directorio = directorio
+        self.umbral_s = umbral_s
+        self.intervalo_s = intervalo_s
+        # Hilo de cada petición en curso -> cuenta de pilas muestreadas
+        self._activas = {}
+        self._candado = threading.Lock()
+        self._hilo = None
+
+    def iniciar(self):
+        with self._candado:
+            self._activas[threading.get_ident()] = Counter()
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._muestrear, name="perfilador", daemon=True)
+                self._hilo.start()
+
+    def terminar(self, duracion, nombre):
+        with self._candado:
+            pilas = self._activas.pop(threading.get_ident(), None)
+        if pilas and duracion >= self.umbral_s:
+            self._volcar(pilas, duracion, nombre)
+
+    def _muestrear(self):
+        while True:
+            time.sleep(self.intervalo_s)
+            marcos = sys._current_frames()
+            with self._candado:
+                for ident, pilas in self._activas.items():
+                    marco = marcos.get(ident)
+                    if marco is not None:
+                        pilas[_pila(marco)] += 1
+
+    def _volcar(self, pilas, duracion, nombre):
+        os.makedirs(self.directorio, exist_ok=True)
+        seguro = "".join(c if c.isalnum() or c in "-_." else "_" for c in nombre)[:60]
+        archivo = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{seguro}-{duracion * 1e3:.0f}ms.txt"
+        with open(os.path.join(self.directorio, archivo), "w", encoding="utf-8") as f:
+            for pila, cuenta in pilas.most_common():
+                f.write(f"{pila} {cuenta}\n")
+
+def _pila(marco):
+    # De la raíz a la hoja, separada por ";"
+    partes = []
+    while marco is not None:
+        codigo = marco.f_code
+        partes.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+        marco = marco.f_back
+    return ";".join(reversed(partes))
+
+def perfilador_desde_entorno():
+    directorio = os.environ.get("BJT_PERFILADOR")
+    if not directorio:
+        return None
+    return Perfilador(
+        directorio,
+        umbral_s=float(os.environ.get("BJT_PERFILADOR_UMBRAL_MS", 500)) / 1000,
+        intervalo_s=float(os.environ.get("BJT_PERFILADOR_INTERVALO_MS", 5)) / 1000
+    )
+
+# ----- Integración con Flask -----
+
+def _nombre_peticion(request):
+    # Los callbacks de Dash se distinguen por su primera salida ("estado-calculo.data")
+    if request.path.endswith("/_dash-update-component"):
+        cuerpo = request.get_json(silent=True) or {}
+        salida = str(cuerpo.get("output", "")).strip(".").split("...")[0]
+        return "bjt_callback_segundos", ("callback", salida or "?")
+    regla = request.url_rule.rule if request.url_rule else "sin_ruta"
+    return "bjt_peticion_segundos", ("ruta", regla)
+
+def instalar(server):
+    from flask import Response, g, request
+
+    perfilador = perfilador_desde_entorno()
+
+    @server.before_request
+    def _inicio_peticion():
+        g.inicio_metricas = time.perf_counter()
+        if perfilador:
+            perfilador.iniciar()
+
+    @server.after_request
+    def _fin_peticion(respuesta):
+        inicio = g.pop("inicio_metricas", None)
+        if inicio is None:
+            return respuesta
+        duracion = time.perf_counter() - inicio
+        metrica, etiqueta = _nombre_peticion(request)
+        registro.observar(metrica, (etiqueta,), duracion)
+        # Las respuestas en streaming (NDJSON, send_file) no se leen para no consumirlas
+        if not respuesta.is_streamed and not respuesta.direct_passthrough:
+            registro.observar("bjt_respuesta_bytes", (etiqueta,), len(respuesta.get_data()), CUBETAS_BYTES)
+        if perfilador:
+            perfilador.terminar(duracion, etiqueta[1])
+        return respuesta
+
+    @server.route("/metrics")
+    def ruta_metricas():
+        return Response(registro.texto(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,278 @@
+import numpy as np
+
+from unidades import interpretar_columna
+
+# ----- Constantes del modelo -----
+
+CONFIGURACIONES = ("Emisor común", "Base común", "Colector común")
+EMISOR_COMUN, BASE_COMUN, COLECTOR_COMUN = range(len(CONFIGURACIONES))
+
+# INVÁLIDO: Ic o Vce no son números finitos (por ejemplo Re = Rc = 0 en base común);
+# el circuito no tiene un punto de operación y no cuenta en ninguna región física
+ESTADOS = ("ACTIVA", "SATURACIÓN", "CORTE", "INVÁLIDO")
+ACTIVA, SATURACION, CORTE, INVALIDO = range(len(ESTADOS))
+
+VCE_SAT = 0.2
+
+# Valores típicos usados cuando un campo está vacío o no se puede interpretar
+VALORES_DEFECTO = {
+    "Vcc": 12.0,   # Voltios
+    "Rc": 1000.0,  # Ohms
+    "Rb": 100000.0, # Ohms
+    "Re": 1000.0,  # Ohms
+    "β": 100.0,    # Sin unidad
+    "Vbe": 0.7     # Voltios
+}
+
+PARAMETROS = tuple(VALORES_DEFECTO)
+
+# ----- Solucionador vectorizado -----
+
+def codificar_config(config):
+    # Acepta nombres ("Emisor común", ...) o códigos enteros; -1 = configuración desconocida
+    arr = np.asarray(config)
+    if arr.dtype.kind in "iu":
+        return arr.astype(np.int8)
+    codigos = np.full(arr.shape, -1, dtype=np.int8)
+    for i, nombre in enumerate(CONFIGURACIONES):
+        codigos[arr == nombre] = i
+    return codigos
+
+def resolver_lote(config, Vcc, Rc, Rb, Re, beta, Vbe):
+    # Resuelve el punto de operación de todos los circuitos a la vez.
+    # Los argumentos se difunden (broadcast) entre sí; un escalar vale para todo el lote.
+    cfg = codificar_config(config)
+    cfg, Vcc, Rc, Rb, Re, beta, Vbe = np.broadcast_arrays(
+        cfg, *(np.asarray(x, dtype=np.float64) for x in (Vcc, Rc, Rb, Re, beta, Vbe))
+    )
+    ec = cfg == EMISOR_COMUN
+    bc = cfg == BASE_COMUN
+    cc = cfg == COLECTOR_COMUN
+    conocida = ec | bc | cc
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Emisor y colector común: malla base-emisor con Rb y Re reflejada
+        divisor = np.where((Rb != 0) | (Re != 0), Rb + (beta + 1) * Re, 1.0)
+        Ib_malla = (Vcc - Vbe) / divisor
+        # Base común: la corriente de emisor la fijan Re y Rc
+        Ie_bc = (Vcc - Vbe) / (Re + Rc)
+        Ic_bc = (beta / (beta + 1)) * Ie_bc
+
+        Ic = np.where(bc, Ic_bc, np.where(conocida, beta * Ib_malla, 0.0))
+        Ib = np.where(bc, Ie_bc - Ic_bc, np.where(conocida, Ib_malla, 0.0))
+        Ie = np.where(bc, Ie_bc, np.where(cc, (beta + 1) * Ib_malla, np.where(ec, Ic + Ib, 0.0)))
+
+        Ve = Ie * Re
+        Vb = Ve + Vbe
+        Vc = np.where(cc, Vcc, Vcc - Ic * Rc)
+        Vce = Vc - Ve
+        Vbc = Vb - Vc
+
+        Ic_sat = np.where(Rc != 0, Vcc / Rc, 0.0)
+    Pmax = VCE_SAT * Ic_sat
+
+    estado = np.where(Vce < VCE_SAT, SATURACION, np.where(Ic > 0, ACTIVA, CORTE)).astype(np.int8)
+    # Con NaN o inf las comparaciones de arriba no significan nada
+    estado[~(np.isfinite(Ic) & np.isfinite(Vce))] = INVALIDO
+
+    return {
+        "Ib": Ib, "Ic": Ic, "Ie": Ie,
+        "Vb": Vb, "Ve": Ve, "Vc": Vc,
+        "Vce": Vce, "Vbc": Vbc,
+        "Ic(sat)": Ic_sat, "Pmax": Pmax,
+        "estado": estado
+    }
+
+def nombres_estado(estado):
+    return np.asarray(ESTADOS)[np.asarray(estado)]
+
+# ----- Monte Carlo de tolerancias -----
+
+TOLERANCIAS_RESISTENCIA = (0.01, 0.05, 0.10)
+
+def muestrear_montecarlo(config, valores_efectivos, n, tolerancia=0.05,
+                         dispersion_beta=0.20, dispersion_vbe=0.02, semilla=None):
+    # Resistencias: uniformes dentro de ±tolerancia alrededor del valor nominal.
+    # β: normal con desviación relativa dispersion_beta. Vbe: normal con desviación
+    # absoluta dispersion_vbe (V). Vcc se mantiene fijo. Todo se resuelve en un solo lote.
+    rng = np.random.default_rng(semilla)
+
+    def resistencia(nominal):
+        return nominal * rng.uniform(1 - tolerancia, 1 + tolerancia, n)
+
+    beta = valores_efectivos["β"] * (1 + dispersion_beta * rng.standard_normal(n))
+    np.maximum(beta, 1.0, out=beta)
+    Vbe = valores_efectivos["Vbe"] + dispersion_vbe * rng.standard_normal(n)
+
+    return resolver_lote(
+        config, valores_efectivos["Vcc"],
+        resistencia(valores_efectivos["Rc"]),
+        resistencia(valores_efectivos["Rb"]),
+        resistencia(valores_efectivos["Re"]),
+        beta, Vbe
+    )
+
+def conteo_estados(estado):
+    return np.bincount(np.asarray(estado).ravel(), minlength=len(ESTADOS))
+
+def histograma(valores, bins=60):
+    valores = valores[np.isfinite(valores)]
+    if not valores.size:
+        return np.zeros(0), np.zeros(0)
+    conteos, bordes = np.histogram(valores, bins=bins)
+    return conteos, bordes
+
+# ----- Curvas características de salida -----
+
+VT = 0.02585           # Voltaje térmico a 27 °C (V)
+VA_DEFECTO = 100.0     # Voltaje de Early (V)
+BETA_R_DEFECTO = 1.0   # Ganancia inversa
+
+def pasos_base(Ib_q, n):
+    # n corrientes de base equiespaciadas hasta el doble de la del punto Q
+    Ib_max = 2 * Ib_q if Ib_q > 0 else 2 * (VALORES_DEFECTO["Vcc"] - VALORES_DEFECTO["Vbe"]) / VALORES_DEFECTO["Rb"]
+    return np.linspace(Ib_max / n, Ib_max, n)
+
+def familia_curvas(Ib, Vce, beta, Va=VA_DEFECTO, beta_r=BETA_R_DEFECTO, Vt=VT):
+    # Modelo de Ebers-Moll (transporte) con efecto Early, a corriente de base fija.
+    # Eliminando Vbe entre Ic e Ib queda una expresión cerrada en Vce:
+    #   Ic = β·Ib · (βr − (βr+1)·e^(−Vce/Vt)) / (βr + β·e^(−Vce/Vt)) · (1 + Vce/Va)
+    # Ib de forma (N,) y Vce de forma (M,) dan una matriz (N, M) por difusión.
+    Ib = np.asarray(Ib, dtype=np.float64)[:, None]
+    Vce = np.asarray(Vce, dtype=np.float64)[None, :]
+    x = np.exp(-Vce / Vt)
+    factor = (beta_r - (beta_r + 1) * x) / (beta_r + beta * x) * (1 + Vce / Va)
+    return beta * Ib * factor
+
+# ----- Barrido de temperatura -----
+
+T_REFERENCIA = 25.0      # Temperatura a la que valen el Vbe y el β del formulario (°C)
+DERIVA_VBE = -2e-3       # Deriva de Vbe (V/°C)
+EXPONENTE_BETA = 1.5     # β ∝ (T/T0)^1.5, con T en kelvin
+T_MIN, T_MAX, PASO_T = -40.0, 125.0, 0.1
+CELDAS_BLOQUE_T = 250_000
+# Por debajo del cero absoluto la base en kelvin de β es negativa (β = NaN)
+CERO_ABSOLUTO = -273.15
+# Puntos de un barrido: el de un solo circuito corre dentro de la petición web
+MAX_TEMPERATURAS = 100_000
+
+# La rejilla se ancla en T_REFERENCIA: limites_activa mide desde ahí, así que esa
+# temperatura tiene que estar resuelta exactamente. Los extremos se redondean
+# hacia dentro al múltiplo del paso más cercano.
+def _indices_temperatura(t_min, t_max, paso):
+    desde = int(np.ceil((t_min - T_REFERENCIA) / paso - 1e-9))
+    hasta = int(np.floor((t_max - T_REFERENCIA) / paso + 1e-9))
+    return desde, hasta
+
+def numero_temperaturas(t_min, t_max, paso):
+    desde, hasta = _indices_temperatura(t_min, t_max, paso)
+    return hasta - desde + 1
+
+def temperaturas(t_min=T_MIN, t_max=T_MAX, paso=PASO_T):
+    if t_min <= CERO_ABSOLUTO:
+        raise ValueError(f"La temperatura mínima debe superar {CERO_ABSOLUTO} °C")
+    if not t_min <= T_REFERENCIA <= t_max:
+        raise ValueError(f"El rango debe incluir {T_REFERENCIA:g} °C")
+    n = numero_temperaturas(t_min, t_max, paso)
+    if n > MAX_TEMPERATURAS:
+        raise ValueError(f"El barrido tendría {n:,} temperaturas (máximo {MAX_TEMPERATURAS:,})")
+    desde, hasta = _indices_temperatura(t_min, t_max, paso)
+    # Redondeo para que 0.1 * k no deje colas como 24.999999999999996
+    return np.round(T_REFERENCIA + np.arange(desde, hasta + 1) * paso, 9)
+
+def barrido_temperatura(config, valores, T):
+    # config y cada valor de forma (N,), T de forma (M,): resultados de forma (N, M).
+    # Solo Vbe y β dependen de la temperatura; las resistencias se toman ideales.
+    cfg = np.atleast_1d(codificar_config(config))[:, None]
+    v = {p: np.atleast_1d(np.asarray(valores[p], dtype=np.float64))[:, None] for p in PARAMETROS}
+    T = np.asarray(T, dtype=np.float64)[None, :]
+    Vbe = v["Vbe"] + DERIVA_VBE * (T - T_REFERENCIA)
+    beta = v["β"] * ((T + 273.15) / (T_REFERENCIA + 273.15)) ** EXPONENTE_BETA
+    return resolver_lote(cfg, v["Vcc"], v["Rc"], v["Rb"], v["Re"], beta, Vbe)
+
+def limites_activa(estado, T):
+    # Temperaturas a las que cada circuito sale de ACTIVA, enfriándose y calentándose
+    # desde T_REFERENCIA (NaN si no sale dentro del rango o si ya no está en ACTIVA).
+    T = np.asarray(T)
+    fuera = np.asarray(estado) != ACTIVA
+    # temperaturas() siempre incluye T_REFERENCIA en la rejilla
+    i_ref = int(np.abs(T - T_REFERENCIA).argmin())
+    activa_ref = ~fuera[:, i_ref]
+
+    arriba = fuera[:, i_ref:]
+    sale_arriba = arriba.any(axis=1) & activa_ref
+    T_alta = np.where(sale_arriba, T[i_ref:][arriba.argmax(axis=1)], np.nan)
+
+    abajo = fuera[:, :i_ref + 1][:, ::-1]
+    sale_abajo = abajo.any(axis=1) & activa_ref
+    T_baja = np.where(sale_abajo, T[:i_ref + 1][::-1][abajo.argmax(axis=1)], np.nan)
+    return T_baja, T_alta, activa_ref
+
+def salidas_temperatura(config, valores, T, celdas_bloque=CELDAS_BLOQUE_T):
+    # limites_activa para muchos circuitos, por bloques de filas para acotar la memoria
+    config = np.atleast_1d(np.asarray(config, dtype=object))
+    n = len(config)
+    filas = max(celdas_bloque // max(len(T), 1), 1)
+    T_baja, T_alta, activa_ref = np.empty(n), np.empty(n), np.empty(n, dtype=bool)
+    for inicio in range(0, n, filas):
+        tramo = slice(inicio, inicio + filas)
+        res = barrido_temperatura(config[tramo], {p: np.asarray(valores[p])[tramo] for p in PARAMETROS}, T)
+        T_baja[tramo], T_alta[tramo], activa_ref[tramo] = limites_activa(res["estado"], T)
+    return T_baja, T_alta, activa_ref
+
+# ----- Lotes a partir de columnas de texto -----
+
+def valores_efectivos_columnas(columnas, n):
+    # Versión masiva de obtener_valores_efectivos: columnas es un dict
+    # nombre -> secuencia de longitud n (textos o números); las columnas ausentes
+    # y los valores vacíos o inválidos toman el valor típico.
+    # Devuelve (valores, asumidos), ambos dict nombre -> array.
+    valores = {}
+    asumidos = {}
+    for nombre in PARAMETROS:
+        columna = columnas.get(nombre)
+        if columna is None:
+            valores[nombre] = np.full(n, VALORES_DEFECTO[nombre])
+            asumidos[nombre] = np.ones(n, dtype=bool)
+            continue
+        arr, valida = interpretar_columna(columna, prefijos=nombre != "β")
+        valores[nombre] = np.where(valida, arr, VALORES_DEFECTO[nombre])
+        asumidos[nombre] = ~valida
+    return valores, asumidos
+
+def resolver_columnas(config, columnas, n):
+    valores, asumidos = valores_efectivos_columnas(columnas, n)
+    res = resolver_lote(config, *(valores[p] for p in PARAMETROS))
+    return valores, asumidos, res
+
+COLUMNAS_RESULTADO = ("Ib", "Ic", "Ie", "Vb", "Ve", "Vc", "Vce", "Vbc", "Ic(sat)", "Pmax")
+
+def _columna_json(arr):
+    # Los valores no finitos (división entre cero) se convierten en None
+    col = np.asarray(arr, dtype=np.float64)
+    salida = col.astype(object)
+    salida[~np.isfinite(col)] = None
+    return salida.tolist()
+
+def filas_resultado(config, valores, asumidos, res):
+    # Convierte un lote resuelto en un diccionario plano por circuito, con las
+    # mismas magnitudes que la tabla de resultados pero como números
+    n = len(res["estado"])
+    configs = np.broadcast_to(np.asarray(config, dtype=object), (n,)).tolist()
+    conocida = (codificar_config(configs) >= 0).tolist()
+    entradas = {p: _columna_json(valores[p]) for p in PARAMETROS}
+    salidas = {k: _columna_json(res[k]) for k in COLUMNAS_RESULTADO}
+    estados = nombres_estado(res["estado"]).tolist()
+    marcas = np.column_stack([asumidos[p] for p in PARAMETROS])
+    for i in range(n):
+        fila = {"config": configs[i]}
+        for p in PARAMETROS:
+            fila[p] = entradas[p][i]
+        fila["asumidos"] = [p for p, m in zip(PARAMETROS, marcas[i]) if m]
+        for k in COLUMNAS_RESULTADO:
+            fila[k] = salidas[k][i]
+        fila["Vce(sat)"] = VCE_SAT
+        fila["estado"] = estados[i]
+        if not conocida[i]:
+            fila["error"] = "Configuración desconocida"
+        yield fila
@@ -0,0 +1,144 @@
+import io
+
+import numpy as np
+
+from nucleo import PARAMETROS, resolver_lote
+from resultado import PuntoOperacion, filas_texto, registros
+
+# ----- Formato -----
+#
+# Los exportadores reciben PuntoOperacion (números) y dan formato al escribir.
+
+INTRODUCCION = (
+    "Este reporte presenta el análisis de un transistor BJT en distintas configuraciones. "
+    "Se detallan los parámetros utilizados, los procesos de cálculo y los resultados obtenidos. "
+    "Los valores deducidos o asumidos se indican con el símbolo '≅'."
+)
+
+def procesos_calculo(punto):
+    textos = {clave: texto for clave, texto, _ in filas_texto(punto, entradas=True)}
+    t = textos.get
+    return [
+        ("Cálculo de Ib", "Ib = (Vcc - Vbe) / (Rb + (β+1)·Re)",
+         f"Ib = ({t('Vcc')} - {t('Vbe')}) / ({t('Rb')} + ({t('β')}+1)·{t('Re')}) = {t('Ib')}"),
+        ("Cálculo de Ic", "Ic = β · Ib", f"Ic = {t('β')} · {t('Ib')} = {t('Ic')}"),
+        ("Cálculo de Ie", "Ie = Ic + Ib", f"Ie = {t('Ic')} + {t('Ib')} = {t('Ie')}"),
+        ("Cálculo de Ve", "Ve = Ie · Re", f"Ve = {t('Ie')} · {t('Re')} = {t('Ve')}"),
+        ("Cálculo de Vb", "Vb = Ve + Vbe", f"Vb = {t('Ve')} + {t('Vbe')} = {t('Vb')}"),
+        ("Cálculo de Vc", "Vc = Vcc - Ic · Rc (o Vcc si es colector común)", f"Vc = {t('Vc')}"),
+        ("Cálculo de Vce", "Vce = Vc - Ve", f"Vce = {t('Vc')} - {t('Ve')} = {t('Vce')}"),
+        ("Cálculo de Vbc", "Vbc = Vb - Vc", f"Vbc = {t('Vb')} - {t('Vc')} = {t('Vbc')}"),
+        ("Cálculo de Ic(sat)", "Ic(sat) = Vcc / Rc", f"Ic(sat) = {t('Vcc')} / {t('Rc')} = {t('Ic(sat)')}"),
+        ("Cálculo de Pmax", "Pmax = Vce(sat) · Ic(sat)", f"Pmax = {t('Vce(sat)')} · {t('Ic(sat)')} = {t('Pmax')}")
+    ]
+
+# ----- Word -----
+
+def _circuito_word(doc, punto, nivel=1, entradas=False):
+    doc.add_heading('Procesos de cálculo', level=nivel)
+    for nombre, formula, desarrollo in procesos_calculo(punto):
+        doc.add_paragraph(nombre, style='List Bullet')
+        p = doc.add_paragraph()
+        p.add_run(formula + "\n").bold = True
+        p.add_run(desarrollo)
+    # Tabla de resultados
+    doc.add_heading('Resultados', level=nivel)
+    # Todas las filas de una vez: add_row() recorre la tabla entera en cada llamada
+    filas = [('Parámetro', 'Valor'), *((clave, texto) for clave, texto, _ in filas_texto(punto, entradas))]
+    table = doc.add_table(rows=len(filas), cols=2)
+    for fila, (clave, valor) in zip(table.rows, filas):
+        celdas = fila.cells
+        celdas[0].text = clave
+        celdas[1].text = valor
+
+def _guardar_word(doc):
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def exportar_a_word(punto):
+    from docx import Document
+    doc = Document()
+    # Título
+    doc.add_heading('Reporte de Análisis de Transistor BJT', 0)
+    # Introducción
+    doc.add_paragraph(INTRODUCCION)
+    _circuito_word(doc, punto)
+    return _guardar_word(doc)
+
+# ----- PDF -----
+
+# Las fuentes base de PDF solo cubren latin-1
+_SUSTITUCIONES_PDF = str.maketrans({"β": "beta", "≅": "~", "·": "*", "Ω": "ohm", "⚠": "", "️": ""})
+
+def _texto_pdf(texto):
+    return texto.translate(_SUSTITUCIONES_PDF).encode("latin-1", "replace").decode("latin-1")
+
+def _nuevo_pdf():
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.multi_cell(0, 9, _texto_pdf('Reporte de Análisis de Transistor BJT'), new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", size=10)
+    pdf.multi_cell(0, 5, _texto_pdf(INTRODUCCION), new_x="LMARGIN", new_y="NEXT")
+    return pdf
+
+def _circuito_pdf(pdf, punto, entradas=False):
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 9, _texto_pdf('Procesos de cálculo'), new_x="LMARGIN", new_y="NEXT")
+    for nombre, formula, desarrollo in procesos_calculo(punto):
+        pdf.set_font("Helvetica", "B", 9)
+        pdf.multi_cell(0, 5, _texto_pdf(f"{nombre}: {formula}"), new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", size=9)
+        pdf.multi_cell(0, 5, _texto_pdf(desarrollo), new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 9, "Resultados", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", size=9)
+    for clave, texto in [('Parámetro', 'Valor'), *((clave, texto) for clave, texto, _ in filas_texto(punto, entradas))]:
+        pdf.cell(60, 6, _texto_pdf(clave), border=1)
+        pdf.cell(0, 6, _texto_pdf(texto), border=1, new_x="LMARGIN", new_y="NEXT")
+
+def exportar_a_pdf(punto):
+    pdf = _nuevo_pdf()
+    _circuito_pdf(pdf, punto)
+    return bytes(pdf.output())
+
+# ----- Reportes de varios circuitos -----
+
+def reporte_multiple(formato, circuitos, progreso=None):
+    # circuitos: lista de dicts con "config", los seis valores efectivos y, opcionalmente,
+    # "asumidos". Todos los puntos de operación se resuelven en un solo lote;
+    # progreso(hechos, total) se llama a medida que se escribe cada circuito.
+    config = [c["config"] for c in circuitos]
+    asumidos = {p: [p in c.get("asumidos", ()) for c in circuitos] for p in PARAMETROS}
+    valores = {p: np.array([c[p] for c in circuitos], dtype=np.float64) for p in PARAMETROS}
+    res = resolver_lote(config, *(valores[p] for p in PARAMETROS))
+    puntos = registros(config, valores, asumidos, res)
+    if formato == "pdf":
+        documento = _nuevo_pdf()
+    else:
+        from docx import Document
+        documento = Document()
+        documento.add_heading('Reporte de Análisis de Transistor BJT', 0)
+        documento.add_paragraph(INTRODUCCION)
+
+    total = len(circuitos)
+    for i, circuito in enumerate(circuitos):
+        punto = PuntoOperacion.desde_registro(puntos[i])
+        titulo = f"Circuito {i + 1}: {circuito['config']}"
+        if formato == "pdf":
+            documento.add_page()
+            documento.set_font("Helvetica", "B", 14)
+            documento.cell(0, 10, _texto_pdf(titulo), new_x="LMARGIN", new_y="NEXT")
+            _circuito_pdf(documento, punto, entradas=True)
+        else:
+            documento.add_heading(titulo, level=1)
+            _circuito_word(documento, punto, nivel=2, entradas=True)
+        if progreso:
+            progreso(i + 1, total)
+
+    if formato == "pdf":
+        return bytes(documento.output())
+    return _guardar_word(documento)
@@ -0,0 +1,203 @@
+from enum import IntEnum
+
+import numpy as np
+
+from nucleo import (
+    ACTIVA, COLUMNAS_RESULTADO, CONFIGURACIONES, CORTE, ESTADOS, INVALIDO, PARAMETROS, SATURACION, VCE_SAT,
+    codificar_config, resolver_lote
+)
+
+# ----- Punto de operación -----
+#
+# Resultado numérico de un circuito, sin nada de la interfaz: los valores efectivos,
+# las magnitudes resueltas como floats y la región. El formato (HTML, Word/PDF,
+# JSON, CSV) se aplica solo al mostrarlo o exportarlo. Para lotes, el mismo
+# contenido va en un arreglo estructurado de NumPy con dtype DTYPE_PUNTO.
+
+class Region(IntEnum):
+    ACTIVA = ACTIVA
+    SATURACION = SATURACION
+    CORTE = CORTE
+    INVALIDO = INVALIDO
+
+    @property
+    def nombre(self):
+        return ESTADOS[self]
+
+# Atributos de PuntoOperacion y campos de DTYPE_PUNTO (β y Ic(sat) no son identificadores)
+CAMPOS_ENTRADA = dict(zip(PARAMETROS, ("Vcc", "Rc", "Rb", "Re", "beta", "Vbe")))
+CAMPOS_SALIDA = {k: k.replace("(sat)", "_sat") for k in COLUMNAS_RESULTADO}
+
+# asumidos: un bit por parámetro, en el orden de PARAMETROS
+DTYPE_PUNTO = np.dtype([
+    ("config", np.int8),
+    *((c, np.float64) for c in CAMPOS_ENTRADA.values()),
+    ("asumidos", np.uint8),
+    *((c, np.float64) for c in CAMPOS_SALIDA.values()),
+    ("region", np.int8)
+])
+
+def mascara_asumidos(asumidos, n):
+    # asumidos: dict parámetro -> array de bool (como valores_efectivos_columnas)
+    mascara = np.zeros(n, dtype=np.uint8)
+    for bit, p in enumerate(PARAMETROS):
+        if p in asumidos:
+            mascara |= np.asarray(asumidos[p], dtype=np.uint8) << bit
+    return mascara
+
+def registros(config, valores, asumidos, res):
+    # Un lote resuelto (resolver_lote) como arreglo estructurado de n registros
+    n = len(res["estado"])
+    salida = np.empty(n, dtype=DTYPE_PUNTO)
+    salida["config"] = codificar_config(config)
+    for p, campo in CAMPOS_ENTRADA.items():
+        salida[campo] = valores[p]
+    salida["asumidos"] = mascara_asumidos(asumidos, n)
+    for k, campo in CAMPOS_SALIDA.items():
+        salida[campo] = res[k]
+    salida["region"] = res["estado"]
+    return salida
+
+
+class PuntoOperacion:
+    __slots__ = ("config", *CAMPOS_ENTRADA.values(), "asumidos", *CAMPOS_SALIDA.values(), "region")
+
+    def __init__(self, config, valores, resultados, region, asumidos=()):
+        self.config = config
+        for p, campo in CAMPOS_ENTRADA.items():
+            setattr(self, campo, float(valores[p]))
+        for k, campo in CAMPOS_SALIDA.items():
+            setattr(self, campo, float(resultados[k]))
+        self.region = Region(int(region))
+        self.asumidos = tuple(p for p in PARAMETROS if p in asumidos)
+
+    @classmethod
+    def resolver(cls, config, valores, asumidos=()):
+        # Un solo circuito: lote de longitud 1 del solucionador vectorizado
+        res = resolver_lote([config], *([valores[p]] for p in PARAMETROS))
+        return cls(config, valores, {k: res[k][0] for k in COLUMNAS_RESULTADO}, res["estado"][0], asumidos)
+
+    @classmethod
+    def desde_registro(cls, registro):
+        asumidos = [p for bit, p in enumerate(PARAMETROS) if registro["asumidos"] >> bit & 1]
+        codigo = int(registro["config"])
+        return cls(
+            CONFIGURACIONES[codigo] if codigo >= 0 else None,
+            {p: registro[campo] for p, campo in CAMPOS_ENTRADA.items()},
+            {k: registro[campo] for k, campo in CAMPOS_SALIDA.items()},
+            registro["region"], asumidos
+        )
+
+    @classmethod
+    def desde_json(cls, datos):
+        # Inversa de a_json; los None (no finitos) vuelven a ser NaN
+        numero = lambda v: np.nan if v is None else v
+        return cls(
+            datos["config"],
+            {p: numero(datos[p]) for p in PARAMETROS},
+            {k: numero(datos[k]) for k in COLUMNAS_RESULTADO},
+            ESTADOS.index(datos["estado"]), datos.get("asumidos", ())
+        )
+
+    def __getitem__(self, clave):
+        # Acceso con los nombres de la tabla de resultados: punto["Ic(sat)"], punto["β"]
+        if clave == "Vce(sat)":
+            return VCE_SAT
+        if clave == "estado":
+            return self.region.nombre
+        return getattr(self, CAMPOS_ENTRADA.get(clave) or CAMPOS_SALIDA.get(clave, clave))
+
+    @property
+    def valores(self):
+        return {p: getattr(self, campo) for p, campo in CAMPOS_ENTRADA.items()}
+
+    def a_json(self):
+        # Mismas claves que las filas de la API; los valores no finitos van como None
+        numero = lambda v: v if np.isfinite(v) else None
+        datos = {"config": self.config}
+        for p, campo in CAMPOS_ENTRADA.items():
+            datos[p] = numero(getattr(self, campo))
+        datos["asumidos"] = list(self.asumidos)
+        for k, campo in CAMPOS_SALIDA.items():
+            datos[k] = numero(getattr(self, campo))
+        datos["Vce(sat)"] = VCE_SAT
+        datos["estado"] = self.region.nombre
+        return datos
+
+    def __repr__(self):
+        return f"PuntoOperacion({self.config!r}, Ic={self.Ic:.4g}, Vce={self.Vce:.4g}, {self.region.nombre})"
+
+# ----- Texto -----
+
+def formatear_valor(valor):
+    if abs(valor) >= 1:
+        return f"{valor:.3f} A"
+    elif abs(valor) >= 1e-3:
+        return f"{valor*1e3:.3f} mA"
+    elif abs(valor) >= 1e-6:
+        return f"{valor*1e6:.3f} µA"
+    else:
+        return f"{valor*1e9:.3f} nA"
+
+def _voltios(valor):
+    return f"{valor:.2f} V"
+
+# Filas de la tabla de resultados y su formato
+FORMATOS = {
+    "Ib": formatear_valor, "Ic": formatear_valor, "Ie": formatear_valor,
+    "Vb": _voltios, "Ve": _voltios, "Vc": _voltios, "Vce": _voltios, "Vbc": _voltios,
+    "Ic(sat)": formatear_valor, "Vce(sat)": _voltios, "Pmax": lambda v: f"{v:.3f} W"
+}
+
+# Magnitudes que se marcan con '≅' cuando se asumió el parámetro del que dependen
+DEPENDENCIAS = {"Ib": "Rb", "Ic": "Rc", "Ie": "Re", "Ic(sat)": "Rc"}
+
+def filas_texto(punto, entradas=False):
+    # [(clave, texto, asumido)] en el orden de la tabla de resultados; con entradas=True
+    # empieza por la configuración y los seis valores efectivos
+    filas = []
+    if entradas:
+        filas.append(("Configuración", punto.config or "?", False))
+        filas += [(p, f"{punto[p]:g}", p in punto.asumidos) for p in PARAMETROS]
+    filas.append(("Estado del transistor", punto.region.nombre, False))
+    for clave, formato in FORMATOS.items():
+        asumido = DEPENDENCIAS.get(clave) in punto.asumidos
+        texto = formato(punto[clave])
+        filas.append((clave, f"≅ {texto}" if asumido else texto, asumido))
+    return filas
+
+# ----- CSV -----
+
+CSV_ENCABEZADO = ["config", *PARAMETROS, "asumidos", *COLUMNAS_RESULTADO, "estado"]
+
+# Texto de cada máscara de asumidos posible
+_TEXTO_ASUMIDOS = np.array([
+    ";".join(p for bit, p in enumerate(PARAMETROS) if m >> bit & 1) for m in range(1 << len(PARAMETROS))
+], dtype=object)
+
+def lineas_csv(registros, formato="%.8g", separador=",", configs=None):
+    # Filas CSV (sin encabezado) de un arreglo DTYPE_PUNTO: un solo formato % por fila.
+    # configs: los textos originales de la configuración; el registro solo guarda el
+    # código, y sin ellos las configuraciones desconocidas salen vacías
+    desconocida = registros["config"] < 0
+    if configs is None:
+        configs = np.asarray(CONFIGURACIONES, dtype=object)[np.where(desconocida, 0, registros["config"])]
+        configs[desconocida] = ""
+    else:
+        configs = np.array(configs, dtype=object)
+        # Texto libre: se cita como en el módulo csv si lleva el separador o comillas
+        for i in np.flatnonzero(desconocida):
+            texto = str(configs[i] or "")
+            if any(c in texto for c in (separador, '"', "\n", "\r")):
+                texto = '"' + texto.replace('"', '""') + '"'
+            configs[i] = texto
+    estados = np.asarray(ESTADOS, dtype=object)[registros["region"]]
+    estados[desconocida] = "CONFIG. DESCONOCIDA"
+    plantilla = separador.join(
+        ["%s", *[formato] * len(CAMPOS_ENTRADA), "%s", *[formato] * len(CAMPOS_SALIDA), "%s"]
+    )
+    columnas = [
+        configs, *(registros[c] for c in CAMPOS_ENTRADA.values()),
+        _TEXTO_ASUMIDOS[registros["asumidos"]], *(registros[c] for c in CAMPOS_SALIDA.values()), estados
+    ]
+    return [plantilla % fila for fila in zip(*(c.tolist() for c in columnas))]
@@ -0,0 +1,361 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+# ----- Trabajos en segundo plano -----
+#
+# Gestor local, sin broker: cada trabajo es un directorio <raiz>/<id>/ con
+#   estado.json   estado, avance, mensaje y resultado (JSON)
+#   cancelar      archivo bandera que pide la cancelación
+#   ...           los archivos que produzca el trabajo
+# Los trabajos corren en un pool de procesos. Todo lo que hace falta para seguirlos
+# está en disco, así que cualquier worker de gunicorn puede responder el sondeo.
+# Un trabajo con clave que terminó bien se reutiliza al pedirlo de nuevo (reconexiones,
+# dobles clics) en lugar de recalcularse. Si un proceso del pool muere, el pool se
+# reemplaza y los trabajos que llevaba (en curso o en cola) quedan en ERROR.
+
+PENDIENTE, CORRIENDO, LISTO, ERROR, CANCELADO = "pendiente", "corriendo", "listo", "error", "cancelado"
+TERMINADOS = (LISTO, ERROR, CANCELADO)
+
+# Mínimo entre escrituras de estado.json al informar avance (s)
+INTERVALO_AVANCE = 0.2
+# Un trabajo creado y nunca lanzado (crear() sin lanzar()) caduca después de esto (s)
+ESPERA_LANZAMIENTO = 600
+
+
+class Cancelado(Exception):
+    pass
+
+
+def _escribir_atomico(ruta, datos, modo="wb"):
+    # Otro proceso puede estar leyendo: se escribe aparte y se renombra
+    temporal = f"{ruta}.tmp{os.getpid()}"
+    with open(temporal, modo) as f:
+        f.write(datos)
+    os.replace(temporal, ruta)
+
+def _leer_estado(directorio):
+    try:
+        with open(os.path.join(directorio, "estado.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _guardar_estado(directorio, estado):
+    estado["actualizado"] = time.time()
+    _escribir_atomico(os.path.join(directorio, "estado.json"), json.dumps(estado, ensure_ascii=False), "w")
+
+
+class Avance:
+    # Se pasa como primer argumento a la función del trabajo. avance(hechos, total)
+    # informa el progreso (con la misma firma que los parámetros progreso= del resto
+    # del código) y lanza Cancelado si el usuario pidió cancelar.
+
+    def __init__(self, directorio, estado):
+        self.directorio = directorio
+        self._estado = estado
+        self._ultima = 0.0
+
+    def ruta(self, nombre):
+        return os.path.join(self.directorio, nombre)
+
+    def cancelado(self):
+        return os.path.exists(self.ruta("cancelar"))
+
+    def __call__(self, hechos, total=None, mensaje=None):
+        if self.cancelado():
+            raise Cancelado()
+        self._estado["hechos"] = hechos
+        if total is not None:
+            self._estado["total"] = total
+        if mensaje is not None:
+            self._estado["mensaje"] = mensaje
+        ahora = time.monotonic()
+        if ahora - self._ultima >= INTERVALO_AVANCE or hechos == self._estado.get("total"):
+            self._ultima = ahora
+            _guardar_estado(self.directorio, self._estado)
+
+def _ejecutar(directorio, funcion, args):
+    # Corre dentro del proceso del pool
+    estado = _leer_estado(directorio)
+    avance = Avance(directorio, estado)
+    if avance.cancelado():
+        estado["estado"] = CANCELADO
+        _guardar_estado(directorio, estado)
+        return
+    estado.update(estado=CORRIENDO, pid=os.getpid(), inicio=time.time())
+    _guardar_estado(directorio, estado)
+    try:
+        resultado = funcion(avance, *args)
+    except Cancelado:
+        estado.update(estado=CANCELADO, mensaje="Cancelado")
+    except Exception as e:
+        estado.update(estado=ERROR, mensaje=f"{type(e).__name__}: {e}")
+    else:
+        estado.update(estado=LISTO, resultado=resultado, hechos=estado.get("total") or estado.get("hechos"))
+    estado["fin"] = time.time()
+    _guardar_estado(directorio, estado)
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class GestorTrabajos:
+
+    def __init__(self, raiz, procesos=2):
+        self.raiz = raiz
+        self.procesos = procesos
+        self._pool = None
+        # Futuros de los trabajos que este proceso lanzó y aún no terminaron
+        self._futuros = {}
+        self._candado = threading.Lock()
+
+    def _ejecutor(self, nuevo=False):
+        # El pool se crea al primer trabajo; "spawn" evita heredar el estado del servidor.
+        # Si un proceso del pool muere (falta de memoria, kill) el pool queda roto y
+        # no acepta más trabajos: nuevo=True lo reemplaza
+        if nuevo and self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        if self._pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.procesos, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def directorio(self, id_trabajo):
+        # Solo identificadores generados por nosotros: nada de rutas que vengan del navegador
+        id_trabajo = os.path.basename(str(id_trabajo))
+        return os.path.join(self.raiz, id_trabajo)
+
+    @staticmethod
+    def clave(*partes):
+        # Identifica los argumentos de un trabajo; los bytes (archivos subidos) entran por su hash
+        partes = [hashlib.sha1(p).hexdigest() if isinstance(p, bytes) else p for p in partes]
+        return hashlib.sha1(json.dumps(partes, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _ruta_clave(self, clave):
+        return os.path.join(self.raiz, "claves", clave)
+
+    def crear(self, tipo, clave=None, total=None):
+        # Crea el directorio del trabajo sin lanzarlo (para dejar archivos de entrada);
+        # si hay un trabajo con la misma clave listo o en curso, devuelve (su id, False)
+        if clave:
+            anterior = self._trabajo_de_clave(clave)
+            if anterior:
+                return anterior, False
+        id_trabajo = uuid.uuid4().hex
+        directorio = self.directorio(id_trabajo)
+        os.makedirs(directorio)
+        _guardar_estado(directorio, {
+            "id": id_trabajo, "tipo": tipo, "estado": PENDIENTE, "clave": clave,
+            "hechos": 0, "total": total, "mensaje": None, "resultado": None, "creado": time.time()
+        })
+        if clave:
+            os.makedirs(os.path.dirname(self._ruta_clave(clave)), exist_ok=True)
+            _escribir_atomico(self._ruta_clave(clave), id_trabajo, "w")
+        return id_trabajo, True
+
+    def lanzar(self, id_trabajo, funcion, *args):
+        # funcion(avance, *args) debe poder importarse desde el proceso del pool
+        from concurrent.futures.process import BrokenProcessPool
+        directorio = self.directorio(id_trabajo)
+        with self._candado:
+            # El proceso del servidor que lleva el futuro: si muere, el trabajo no va a
+            # empezar. Se anota con el candado tomado para que estado() no vea el
+            # servidor sin el futuro
+            estado = _leer_estado(directorio)
+            estado["servidor"] = os.getpid()
+            _guardar_estado(directorio, estado)
+            try:
+                try:
+                    futuro = self._ejecutor().submit(_ejecutar, directorio, funcion, args)
+                except BrokenProcessPool:
+                    futuro = self._ejecutor(nuevo=True).submit(_ejecutar, directorio, funcion, args)
+            except Exception as e:
+                self._fallar(id_trabajo, f"No se pudo lanzar el trabajo ({type(e).__name__}: {e})")
+                return id_trabajo
+            self._futuros[id_trabajo] = futuro
+        futuro.add_done_callback(lambda f: self._terminado(id_trabajo, f))
+        return id_trabajo
+
+    def _terminado(self, id_trabajo, futuro):
+        # Corre en el hilo del pool al terminar el futuro. _ejecutar ya guardó el
+        # estado final salvo que el proceso del pool muriera antes
+        with self._candado:
+            self._futuros.pop(id_trabajo, None)
+        if not futuro.cancelled() and futuro.exception() is not None:
+            self._fallar(id_trabajo, "El proceso del trabajo terminó inesperadamente")
+
+    def _fallar(self, id_trabajo, mensaje):
+        # Marca como ERROR un trabajo que no llegó a terminar y suelta su clave,
+        # para que la misma petición cree un trabajo nuevo
+        directorio = self.directorio(id_trabajo)
+        estado = _leer_estado(directorio)
+        if not estado or estado["estado"] in TERMINADOS:
+            return estado
+        estado.update(estado=ERROR, mensaje=mensaje, fin=time.time())
+        _guardar_estado(directorio, estado)
+        if estado.get("clave"):
+            try:
+                with open(self._ruta_clave(estado["clave"]), "r", encoding="utf-8") as f:
+                    if f.read().strip() == id_trabajo:
+                        os.remove(self._ruta_clave(estado["clave"]))
+            except OSError:
+                pass
+        return estado
+
+    def _sin_futuro(self, id_trabajo, estado):
+        # Un trabajo PENDIENTE que ya nunca va a empezar: su futuro se perdió con el
+        # proceso del servidor que lo lanzó, o se creó y nunca se lanzó
+        servidor = estado.get("servidor")
+        if servidor == os.getpid():
+            with self._candado:
+                futuro = self._futuros.get(id_trabajo)
+            return futuro is None or futuro.done()
+        if servidor:
+            return not _vivo(servidor)
+        return estado.get("creado", 0) < time.time() - ESPERA_LANZAMIENTO
+
+    def enviar(self, tipo, funcion, *args, clave=None, total=None):
+        id_trabajo, nuevo = self.crear(tipo, clave, total)
+        if nuevo:
+            self.lanzar(id_trabajo, funcion, *args)
+        return id_trabajo
+
+    def _trabajo_de_clave(self, clave):
+        try:
+            with open(self._ruta_clave(clave), "r", encoding="utf-8") as f:
+                id_trabajo = f.read().strip()
+        except OSError:
+            return None
+        estado = self.estado(id_trabajo)
+        if estado and estado["estado"] in (PENDIENTE, CORRIENDO, LISTO):
+            return id_trabajo
+        return None
+
+    def estado(self, id_trabajo):
+        if not id_trabajo:
+            return None
+        directorio = self.directorio(id_trabajo)
+        estado = _leer_estado(directorio)
+        if not estado or estado["estado"] in TERMINADOS:
+            return estado
+        if estado["estado"] == PENDIENTE and self._sin_futuro(id_trabajo, estado):
+            return self._fallar(id_trabajo, "El trabajo se perdió antes de empezar") or estado
+        # Un trabajo cuyo proceso murió (reinicio del worker) no va a terminar nunca
+        if estado["estado"] == CORRIENDO and estado.get("pid") and not _vivo(estado["pid"]):
+            estado.update(estado=ERROR, mensaje="El proceso del trabajo terminó inesperadamente")
+        estado["cancelando"] = os.path.exists(os.path.join(directorio, "cancelar"))
+        return estado
+
+    def cancelar(self, id_trabajo):
+        directorio = self.directorio(id_trabajo)
+        if os.path.isdir(directorio):
+            open(os.path.join(directorio, "cancelar"), "w").close()
+
+    def ruta(self, id_trabajo, nombre):
+        return os.path.join(self.directorio(id_trabajo), os.path.basename(nombre))
+
+    def limpiar(self, antiguedad=24 * 3600):
+        # Borra los trabajos terminados hace más de antiguedad segundos y las claves
+        # que apuntan a trabajos que ya no existen
+        limite = time.time() - antiguedad
+        if not os.path.isdir(self.raiz):
+            return
+        for nombre in os.listdir(self.raiz):
+            # estado() da por terminados los trabajos que ya no van a avanzar
+            estado = self.estado(nombre)
+            if estado and estado["estado"] in TERMINADOS and estado.get("actualizado", 0) < limite:
+                shutil.rmtree(os.path.join(self.raiz, nombre), ignore_errors=True)
+        # crear() hace el directorio antes de escribir la clave: una clave sin su
+        # directorio es de un trabajo borrado
+        claves = os.path.join(self.raiz, "claves")
+        for clave in os.listdir(claves) if os.path.isdir(claves) else ():
+            try:
+                with open(self._ruta_clave(clave), "r", encoding="utf-8") as f:
+                    id_trabajo = f.read().strip()
+                if not id_trabajo or not os.path.isdir(self.directorio(id_trabajo)):
+                    os.remove(self._ruta_clave(clave))
+            except OSError:
+                pass
+
+# ----- Tareas de la aplicación -----
+#
+# Funciones de nivel de módulo (el pool las importa por nombre). Devuelven un
+# resumen JSON; los datos grandes quedan como archivos en avance.directorio.
+
+BLOQUE_MONTECARLO = 1_000_000
+# Celdas circuito × temperatura entre dos avisos de avance
+BLOQUE_TEMPERATURA = 4_000_000
+
+def tarea_montecarlo(avance, config, valores, n, tolerancia, disp_beta, disp_vbe):
+    import numpy as np
+    from nucleo import ESTADOS, conteo_estados, histograma, muestrear_montecarlo
+    inicio = time.perf_counter()
+    conteos = np.zeros(len(ESTADOS), dtype=np.int64)
+    Ic, Vce = [], []
+    for hechos in range(0, n, BLOQUE_MONTECARLO):
+        m = min(BLOQUE_MONTECARLO, n - hechos)
+        res = muestrear_montecarlo(config, valores, m, tolerancia, disp_beta, disp_vbe)
+        conteos += conteo_estados(res["estado"])
+        Ic.append(res["Ic"].astype(np.float32))
+        Vce.append(res["Vce"].astype(np.float32))
+        avance(hechos + m, n)
+    histogramas = {}
+    for clave, datos in (("Ic", Ic), ("Vce", Vce)):
+        cuentas, bordes = histograma(np.concatenate(datos))
+        histogramas[clave] = {"conteos": cuentas.tolist(), "bordes": bordes.tolist()}
+    return {"n": n, "conteos": conteos.tolist(), "histogramas": histogramas,
+            "segundos": time.perf_counter() - inicio}
+
+def tarea_temperatura_historial(avance, configs, valores, t_min, t_max, paso):
+    # Límites de ACTIVA de cada circuito; quedan en temperatura.npz junto con las entradas
+    import numpy as np
+    from nucleo import PARAMETROS, salidas_temperatura, temperaturas
+    T = temperaturas(t_min, t_max, paso)
+    inicio = time.perf_counter()
+    n = len(configs)
+    configs = np.asarray(configs, dtype=object)
+    valores = {p: np.asarray(valores[p], dtype=np.float64) for p in PARAMETROS}
+    T_baja, T_alta, activa_ref = np.empty(n), np.empty(n), np.empty(n, dtype=bool)
+    bloque = max(BLOQUE_TEMPERATURA // len(T), 1)
+    for i in range(0, n, bloque):
+        tramo = slice(i, i + bloque)
+        T_baja[tramo], T_alta[tramo], activa_ref[tramo] = salidas_temperatura(
+            configs[tramo], {p: valores[p][tramo] for p in PARAMETROS}, T
+        )
+        avance(min(i + bloque, n), n)
+    with open(avance.ruta("temperatura.npz"), "wb") as f:
+        np.savez(f, configs=configs.astype(str), T_baja=T_baja, T_alta=T_alta, activa_ref=activa_ref,
+                 **{f"valor_{i}": valores[p] for i, p in enumerate(PARAMETROS)})
+    return {"circuitos": n, "temperaturas": len(T), "segundos": time.perf_counter() - inicio}
+
+def tarea_lote(avance, nombre, config):
+    from lotes import procesar_archivo
+    with open(avance.ruta("entrada"), "rb") as f:
+        contenido = f.read()
+    inicio = time.perf_counter()
+    resumen = procesar_archivo(nombre, contenido, avance.ruta("resultado.csv"), config, progreso=avance)
+    resumen["segundos"] = time.perf_counter() - inicio
+    os.remove(avance.ruta("entrada"))
+    return resumen
+
+def tarea_reporte(avance, formato, circuitos):
+    from reportes import reporte_multiple
+    archivo = f"reporte.{formato}"
+    _escribir_atomico(avance.ruta(archivo), reporte_multiple(formato, circuitos, progreso=avance))
+    return {"archivo": archivo, "circuitos": len(circuitos)}
@@ -0,0 +1,84 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+# ----- Notación de ingeniería -----
+
+# Prefijos SI, distinguiendo mayúsculas: "M" es mega y "m" es mili.
+# "K" se acepta como kilo y "u"/"μ" como micro por ser habituales en listas de materiales.
+PREFIJOS = {
+    "E": 1e18, "P": 1e15, "T": 1e12, "G": 1e9, "M": 1e6, "k": 1e3, "K": 1e3,
+    "h": 1e2, "da": 1e1, "d": 1e-1, "c": 1e-2, "m": 1e-3,
+    "u": 1e-6, "µ": 1e-6, "μ": 1e-6, "n": 1e-9, "p": 1e-12, "f": 1e-15, "a": 1e-18
+}
+
+_NUMERO = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+_PREFIJO = "da|[" + "".join(p for p in PREFIJOS if len(p) == 1) + "]"
+_UNIDAD = r"(?:V|A|W|Ω|[oO]hms?)?"
+
+# "2.2k", "100µ", "1e3", "12V", "2.2 kΩ"
+_VALOR = re.compile(rf"\s*({_NUMERO})\s*({_PREFIJO})?\s*{_UNIDAD}\s*")
+# Notación RKM: el prefijo hace de punto decimal ("4k7" = 4.7k, "4R7" = 4.7)
+_RKM = re.compile(rf"\s*([+-]?\d+)({_PREFIJO}|R)(\d+)\s*{_UNIDAD}\s*")
+
+
+@lru_cache(maxsize=4096)
+def _interpretar_texto(texto):
+    m = _VALOR.fullmatch(texto)
+    if m:
+        numero, prefijo = m.groups()
+        return float(numero) * PREFIJOS.get(prefijo, 1.0)
+    m = _RKM.fullmatch(texto)
+    if m:
+        entero, prefijo, decimales = m.groups()
+        return float(f"{entero}.{decimales}") * PREFIJOS.get(prefijo, 1.0)
+    raise ValueError(f"Valor no reconocido: {texto!r}")
+
+def interpretar_valor(valor_str):
+    # Devuelve None para un campo vacío y lanza ValueError si no se reconoce
+    if valor_str is None:
+        return None
+    if isinstance(valor_str, (int, float)):
+        return float(valor_str)
+    valor_str = valor_str.strip()
+    if not valor_str:
+        return None
+    return _interpretar_texto(valor_str)
+
+def _interpretar_numero(texto):
+    # Sin prefijos, como float(); se usa para β
+    texto = texto.strip()
+    return float(texto) if texto else None
+
+def interpretar_columna(valores, prefijos=True):
+    # Versión masiva para listas, arrays o pandas.Series.
+    # Devuelve (float64, máscara de válidos); los inválidos o vacíos quedan en NaN.
+    # Con prefijos=False cada texto se lee como float() (así se interpreta β).
+    interpretar = interpretar_valor if prefijos else _interpretar_numero
+    arr = np.asarray(valores)
+    if arr.dtype.kind in "biuf":
+        resultado = arr.astype(np.float64)
+        return resultado, np.isfinite(resultado)
+    # Ruta rápida: columnas de números planos se convierten sin pasar por Python
+    try:
+        resultado = arr.astype(np.float64)
+    except (TypeError, ValueError):
+        # Se interpreta cada texto distinto una sola vez y se reparte al resto
+        textos, inversa = np.unique(arr.astype(str), return_inverse=True)
+        unicos = np.empty(len(textos))
+        for i, texto in enumerate(textos):
+            try:
+                valor = interpretar(texto)
+            except ValueError:
+                valor = None
+            unicos[i] = np.nan if valor is None else valor
+        resultado = unicos[inversa.reshape(arr.shape)]
+    return resultado, np.isfinite(resultado)
+
+def formatear_resistencia(valor):
+    # Inversa de interpretar_valor para resistencias: 4700 -> "4.7k", 1e6 -> "1M"
+    for factor, prefijo in ((1e6, "M"), (1e3, "k")):
+        if abs(valor) >= factor:
+            return f"{valor / factor:.3g}{prefijo}"
+    return f"{valor:.3g}"